@@ -6,19 +6,40 @@ from typing import Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from app.dependencies import get_settings
-from app.services.analytics import indicators as svc_indicators, spp_plus as svc_spp_plus
+from app.services.analytics import (
+    indicator_series as svc_indicator_series,
+    indicators as svc_indicators,
+    spp_plus as svc_spp_plus,
+    spp_plus_grid as svc_spp_plus_grid,
+)
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
+# Upper bound on lead times x horizons per /spp_plus/grid call
+MAX_SPP_GRID_CELLS = 10_000
+
 
 @router.get("/indicators")
 def get_indicators(
     type_id: int = Query(...),
     region_id: int = Query(...),
     window: int = Query(5, ge=2, le=365),
+    history: int = Query(
+        0, ge=0, le=5000, description="Include the last N points of rolling series for charting"
+    ),
 ):
     res = svc_indicators(type_id=type_id, region_id=region_id, window=window)
-    return {"ma": res.ma, "bollinger": res.bollinger.__dict__, "volatility": res.volatility, "depth": res.depth.__dict__}
+    body = {
+        "ma": res.ma,
+        "bollinger": res.bollinger.__dict__,
+        "volatility": res.volatility,
+        "depth": res.depth.__dict__,
+    }
+    if history:
+        body["history"] = svc_indicator_series(
+            type_id=type_id, region_id=region_id, window=window, points=history
+        )
+    return body
 
 
 @router.post("/spp_plus")
@@ -39,3 +60,40 @@ def post_spp_plus(payload: dict[str, Any]):
         batch_options=batch_options,
     )
     return result
+
+
+@router.post("/spp_plus/grid")
+def post_spp_plus_grid(payload: dict[str, Any]):
+    """Evaluate SPP⁺ over every lead time x horizon pair in one call (heatmaps)."""
+
+    try:
+        type_id = int(payload["type_id"])
+        region_id = int(payload["region_id"])
+        leads = [Decimal(str(x)) for x in payload["lead_time_days"]]
+        horizons = [Decimal(str(x)) for x in payload["horizon_days"]]
+        batch_options = [int(x) for x in payload.get("batch_options", [1, 2, 3])]
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid payload"
+        ) from exc
+    if not leads or not horizons or not batch_options:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="lead_time_days, horizon_days and batch_options must not be empty",
+        )
+    if not all(v.is_finite() for v in leads + horizons):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid payload"
+        )
+    if len(leads) * len(horizons) > MAX_SPP_GRID_CELLS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Grid exceeds {MAX_SPP_GRID_CELLS} cells",
+        )
+    return svc_spp_plus_grid(
+        type_id=type_id,
+        region_id=region_id,
+        lead_time_days=leads,
+        horizon_days=horizons,
+        batch_options=batch_options,
+    )
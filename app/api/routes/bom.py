@@ -1,11 +1,32 @@
 from __future__ import annotations
 
+import json
+import logging
+
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 
 from app.services import bom as bom_service
 from app.services import costing_service
 
 router = APIRouter(prefix="/bom", tags=["bom"])
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_ITEMS = 1000
+_NO_BLUEPRINT = "Blueprint not found for product"
+
+
+def _summary_payload(res) -> dict:  # noqa: ANN001
+    return {
+        "product_id": res.product_id,
+        "runs": res.runs,
+        "total_cost": res.total_cost,
+        "lines": [
+            {"type_id": ln.type_id, "qty": ln.qty, "unit_price": ln.unit_price, "cost": ln.cost}
+            for ln in res.lines
+        ],
+    }
 
 
 @router.get("/search")
@@ -51,11 +72,49 @@ def bom_cost(payload: dict):
     res = costing_service.cost_product(product_id, **cost_kwargs)
     if not res:
         raise HTTPException(status_code=404, detail="Blueprint not found for product")
-    return {
-        "product_id": res.product_id,
-        "runs": res.runs,
-        "total_cost": res.total_cost,
-        "lines": [
-            {"type_id": l.type_id, "qty": l.qty, "unit_price": l.unit_price, "cost": l.cost} for l in res.lines
-        ],
-    }
+    return _summary_payload(res)
+
+
+@router.post("/cost/batch")
+def bom_cost_batch(payload: dict):
+    """Cost many products in one pass; streams one NDJSON object per item, in request order.
+
+    BOM expansion, pricing and the inventory read happen before the response starts,
+    so their failures return a normal error status. Items without a blueprint, or whose
+    costing fails, yield `{"product_id": ..., "error": ...}` instead of failing the
+    whole batch.
+    """
+    try:
+        region_id = int(payload.get("region_id", 10000002))
+        owner_scope = payload.get("owner_scope")
+        items = [
+            costing_service.CostRequest(
+                product_id=int(item["product_id"]),
+                runs=int(item.get("runs", 1)),
+                me_bonus=float(item.get("me_bonus", 0.0)),
+            )
+            for item in payload.get("items") or []
+        ]
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=422, detail="Invalid payload") from exc
+    if not items:
+        raise HTTPException(status_code=422, detail="items must be a non-empty list")
+    if len(items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_BATCH_ITEMS} items per batch")
+    batch = costing_service.prepare_cost_batch(items, region_id=region_id, owner_scope=owner_scope)
+
+    def stream():
+        for index, req in enumerate(batch.requests):
+            try:
+                res = batch.summarize(index)
+                if res is None:
+                    body = {"product_id": req.product_id, "error": _NO_BLUEPRINT}
+                else:
+                    body = _summary_payload(res)
+                line = json.dumps(jsonable_encoder(body))
+            except Exception:  # noqa: BLE001
+                logger.exception("Batch costing failed for product_id=%s", req.product_id)
+                line = json.dumps({"product_id": req.product_id, "error": "Costing failed"})
+            yield line + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
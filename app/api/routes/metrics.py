@@ -2,12 +2,20 @@ from __future__ import annotations
 
 from fastapi import APIRouter
 
+from app.cache_local import cache_metrics
+from app.db import pool_metrics
 from app.rate_limit import limiter_metrics
+from app.redis_pool import redis_pool_metrics
 
 router = APIRouter(tags=["metrics"])
 
 
 @router.get("/metrics")
 def get_metrics():
-    return {"rate_limiter": limiter_metrics()}
+    return {
+        "rate_limiter": limiter_metrics(),
+        "db_pool": pool_metrics(),
+        "redis_pool": redis_pool_metrics(),
+        "cache": cache_metrics(),
+    }
 
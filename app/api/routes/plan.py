@@ -2,13 +2,15 @@ from __future__ import annotations
 
 from typing import Any
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Response, status
 
 from app.services import plan as plan_service
 from indy_math.planner import PlanningError
 
 router = APIRouter(prefix="/plan", tags=["plan"])
 
+_UNKNOWN_PLAN = "Unknown or expired plan_id"
+
 
 @router.post("/next-window")
 def post_next_window(payload: dict[str, Any]):
@@ -18,10 +20,56 @@ def post_next_window(payload: dict[str, Any]):
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
 
 
+@router.post("/sessions")
+def post_plan_session(payload: dict[str, Any]):
+    """Start an incremental planning session and return its `plan_id`.
+
+    Sessions are held in the memory of the worker process that created them.
+    With several workers, route a client's session calls to one worker (sticky
+    sessions); a call that lands elsewhere gets 404 and must start over.
+    """
+    try:
+        return plan_service.create_session(payload)
+    except PlanningError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)
+        ) from exc
+
+
+@router.get("/sessions/{plan_id}")
+def get_plan_session(plan_id: str):
+    try:
+        return plan_service.get_session(plan_id)
+    except plan_service.PlanSessionNotFound as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=_UNKNOWN_PLAN) from exc
+
+
+@router.patch("/sessions/{plan_id}")
+def patch_plan_session(plan_id: str, payload: dict[str, Any]):
+    try:
+        return plan_service.update_session(plan_id, payload)
+    except plan_service.PlanSessionNotFound as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=_UNKNOWN_PLAN) from exc
+    except PlanningError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)
+        ) from exc
+
+
+@router.delete(
+    "/sessions/{plan_id}", status_code=status.HTTP_204_NO_CONTENT, response_class=Response
+)
+def delete_plan_session(plan_id: str):
+    try:
+        plan_service.delete_session(plan_id)
+    except plan_service.PlanSessionNotFound as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=_UNKNOWN_PLAN) from exc
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
 @router.post("/recommend")
 def post_recommend(payload: dict[str, Any]):
     try:
         return plan_service.recommend(payload)
     except PlanningError as exc:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
-
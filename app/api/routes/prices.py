@@ -3,11 +3,10 @@ from __future__ import annotations
 from typing import Any
 
 from fastapi import APIRouter, HTTPException, status
+from sqlalchemy import text
 
+from app.db import get_engine
 from app.services import prices as prices_service
-from sqlalchemy import text
-import sqlalchemy as sa
-from app.config import Settings
 
 router = APIRouter(prefix="/prices", tags=["prices"])
 
@@ -44,7 +43,7 @@ def post_quotes(payload: dict[str, Any]):
 
 @router.get("/history")
 def get_history(type_id: int, region_id: int, days: int = 7):
-    engine = sa.create_engine(Settings().database_url)
+    engine = get_engine()
     sql = text(
         """
         with latest as (
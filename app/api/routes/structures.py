@@ -3,17 +3,15 @@ from __future__ import annotations
 from typing import Any, Dict, List
 
 from fastapi import APIRouter, Query
-import sqlalchemy as sa
 from sqlalchemy import text
 
-from app.config import Settings
-
+from app.db import get_engine
 
 router = APIRouter(prefix="/structures", tags=["structures"])
 
 
 def _engine():
-    return sa.create_engine(Settings().database_url)
+    return get_engine()
 
 
 FALLBACK_RIGS = [
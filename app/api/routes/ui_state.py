@@ -1,17 +1,16 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException
-import sqlalchemy as sa
 from sqlalchemy import text
 
-from app.config import Settings
+from app.db import get_engine
 
 router = APIRouter(prefix="/state", tags=["ui"])
 
 
 @router.get("/ui")
 def get_ui_state(id: str = "default"):
-    engine = sa.create_engine(Settings().database_url)
+    engine = get_engine()
     row = None
     with engine.connect() as conn:
         row = conn.execute(text("select state from ui_state where id=:id"), {"id": id}).fetchone()
@@ -20,7 +19,7 @@ def get_ui_state(id: str = "default"):
 
 @router.post("/ui")
 def post_ui_state(payload: dict, id: str = "default"):
-    engine = sa.create_engine(Settings().database_url)
+    engine = get_engine()
     with engine.begin() as conn:
         conn.execute(text("""
             INSERT INTO ui_state(id, state) VALUES (:id, :state)
@@ -2,12 +2,18 @@
 
 from __future__ import annotations
 
-import json
+import uuid
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Any, Callable, Mapping
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping, Sequence, Tuple, TypeVar
 
 from redis import Redis
+from redis.exceptions import WatchError
+
+from app.cache_codec import CacheSerializer, Envelope, loads_any, serializer_for
+from app.cache_local import INVALIDATION_CHANNEL, STATS, CacheStats, LocalCache, encode_invalidation
+
+K = TypeVar("K", bound=Hashable)
 
 
 @dataclass(frozen=True)
@@ -24,6 +30,11 @@ class CacheRecord:
     value: Mapping[str, Any]
     stale: bool
     age_seconds: int
+    ttl: int = 0
+
+    def expires_within(self, fraction: float) -> bool:
+        """True once the record is in the last `fraction` of its TTL (or past it)."""
+        return self.stale or (self.ttl > 0 and self.age_seconds >= self.ttl * (1 - fraction))
 
 
 class CacheClient:
@@ -32,10 +43,18 @@ class CacheClient:
         redis_client: Redis,
         policy: CachePolicy | None = None,
         clock: Callable[[], datetime] | None = None,
+        serializer: CacheSerializer | None = None,
+        local: LocalCache | None = None,
+        stats: CacheStats | None = None,
     ) -> None:
         self._redis = redis_client
         self._policy = policy or CachePolicy()
         self._clock = clock or (lambda: datetime.now(timezone.utc))
+        # Writer format; reads accept every format regardless (see app.cache_codec)
+        self._serializer = serializer or serializer_for(redis_client)
+        # Optional in-process tier (see app.cache_local); writes publish invalidations when set
+        self._local = local
+        self._stats = stats or STATS
 
     # Price -----------------------------------------------------------------
     def set_price(self, provider: str, region_id: int, type_id: int, payload: Mapping[str, Any]) -> None:
@@ -46,6 +65,18 @@ class CacheClient:
         key = f"price:{provider}:{region_id}:{type_id}"
         return self._get_value(key)
 
+    def set_prices(
+        self, provider: str, region_id: int, payloads: Mapping[int, Mapping[str, Any]]
+    ) -> None:
+        keyed = {f"price:{provider}:{region_id}:{t}": p for t, p in payloads.items()}
+        self._set_many(keyed, self._policy.price_ttl)
+
+    def get_prices(
+        self, provider: str, region_id: int, type_ids: Iterable[int]
+    ) -> Dict[int, CacheRecord]:
+        """Fetch many prices in one round trip; misses (no value, no last-good) are omitted."""
+        return self._get_many({t: f"price:{provider}:{region_id}:{t}" for t in type_ids})
+
     # Indices ---------------------------------------------------------------
     def set_index(self, system_id: int, activity: str, payload: Mapping[str, Any]) -> None:
         key = f"index:{system_id}:{activity}"
@@ -55,15 +86,41 @@ class CacheClient:
         key = f"index:{system_id}:{activity}"
         return self._get_value(key)
 
+    def set_indices(self, payloads: Mapping[Tuple[int, str], Mapping[str, Any]]) -> None:
+        keyed = {f"index:{sid}:{activity}": p for (sid, activity), p in payloads.items()}
+        self._set_many(keyed, self._policy.index_ttl)
+
+    def get_indices(self, keys: Iterable[Tuple[int, str]]) -> Dict[Tuple[int, str], CacheRecord]:
+        return self._get_many(
+            {(sid, activity): f"index:{sid}:{activity}" for sid, activity in keys}
+        )
+
     # Indicators ------------------------------------------------------------
-    def set_indicator(self, region_id: int, type_id: int, payload: Mapping[str, Any]) -> None:
-        key = f"indicator:{region_id}:{type_id}"
+    # Keyed by window too: MA/Bollinger/volatility differ per trailing window
+    def set_indicator(
+        self, region_id: int, type_id: int, window: int, payload: Mapping[str, Any]
+    ) -> None:
+        key = f"indicator:{region_id}:{type_id}:{window}"
         self._set_value(key, payload, self._policy.indicator_ttl)
 
-    def get_indicator(self, region_id: int, type_id: int) -> CacheRecord | None:
-        key = f"indicator:{region_id}:{type_id}"
+    def get_indicator(self, region_id: int, type_id: int, window: int) -> CacheRecord | None:
+        key = f"indicator:{region_id}:{type_id}:{window}"
         return self._get_value(key)
 
+    def set_indicators(
+        self, payloads: Mapping[Tuple[int, int], Mapping[str, Any]], window: int
+    ) -> None:
+        keyed = {
+            f"indicator:{region_id}:{type_id}:{window}": p
+            for (region_id, type_id), p in payloads.items()
+        }
+        self._set_many(keyed, self._policy.indicator_ttl)
+
+    def get_indicators(
+        self, keys: Iterable[Tuple[int, int]], window: int
+    ) -> Dict[Tuple[int, int], CacheRecord]:
+        return self._get_many({(r, t): f"indicator:{r}:{t}:{window}" for r, t in keys})
+
     # SPP -------------------------------------------------------------------
     def set_spp(self, type_id: int, region_id: int, params_hash: str, payload: Mapping[str, Any]) -> None:
         key = f"spp:{type_id}:{region_id}:{params_hash}"
@@ -73,29 +130,105 @@ class CacheClient:
         key = f"spp:{type_id}:{region_id}:{params_hash}"
         return self._get_value(key)
 
+    # Fill locks ------------------------------------------------------------
+    def try_fill_lock(self, key: str, ttl_ms: int) -> str | None:
+        """Claim the cross-process right to recompute `key`; returns a token or None if held."""
+        token = uuid.uuid4().hex
+        return token if self._redis.set(f"{key}:fill_lock", token, nx=True, px=ttl_ms) else None
+
+    def release_fill_lock(self, key: str, token: str) -> None:
+        # Compare-and-delete under WATCH so an expired lock re-taken by a peer is left alone
+        name = f"{key}:fill_lock"
+        with self._redis.pipeline() as pipe:
+            try:
+                pipe.watch(name)
+                held = pipe.get(name)
+                if isinstance(held, bytes):
+                    held = held.decode()
+                if held == token:
+                    pipe.multi()
+                    pipe.delete(name)
+                    pipe.execute()
+                else:
+                    pipe.unwatch()
+            except WatchError:
+                pass
+
+    def fill_locked(self, key: str) -> bool:
+        return bool(self._redis.exists(f"{key}:fill_lock"))
+
     # Internal helpers ------------------------------------------------------
+    def _envelope(self, payload: Mapping[str, Any], ttl: int) -> bytes | str:
+        return self._serializer.dumps(Envelope(stored_at=self._clock(), ttl=ttl, value=payload))
+
     def _set_value(self, key: str, payload: Mapping[str, Any], ttl: int) -> None:
-        now = self._clock()
-        envelope = {
-            "stored_at": now.isoformat(),
-            "ttl": ttl,
-            "value": payload,
-        }
-        serialized = json.dumps(envelope, default=str)
-        self._redis.setex(name=key, time=ttl, value=serialized)
-        self._redis.setex(name=f"{key}:last_good", time=self._policy.last_good_ttl, value=serialized)
+        self._set_many({key: payload}, ttl)
+
+    def _set_many(self, payloads: Mapping[str, Mapping[str, Any]], ttl: int) -> None:
+        # Primary and :last_good keys for every entry go out in one pipelined round trip
+        if not payloads:
+            return
+        pipe = self._redis.pipeline(transaction=False)
+        for key, payload in payloads.items():
+            serialized = self._envelope(payload, ttl)
+            pipe.setex(name=key, time=ttl, value=serialized)
+            pipe.setex(name=f"{key}:last_good", time=self._policy.last_good_ttl, value=serialized)
+        if self._local is not None:
+            # Readers repopulate from Redis; peers drop their copies via pub/sub
+            self._local.invalidate(payloads)
+            pipe.publish(INVALIDATION_CHANNEL, encode_invalidation(payloads))
+        pipe.execute()
 
     def _get_value(self, key: str) -> CacheRecord | None:
-        raw = self._redis.get(key)
-        source_key = key
-        if raw is None:
-            raw = self._redis.get(f"{key}:last_good")
-            source_key = f"{key}:last_good"
-            if raw is None:
-                return None
-        envelope = json.loads(raw)
-        stored_at = datetime.fromisoformat(envelope["stored_at"])
-        ttl = envelope["ttl"]
-        age = int((self._clock() - stored_at).total_seconds())
-        stale = age > ttl or source_key.endswith(":last_good")
-        return CacheRecord(value=envelope["value"], stale=stale, age_seconds=age)
+        return self._get_many({key: key}).get(key)
+
+    def _get_many(self, keys: Mapping[K, str]) -> Dict[K, CacheRecord]:
+        # Fresh local entries first; one MGET covers the rest and their :last_good fallbacks
+        if not keys:
+            return {}
+        out: Dict[K, CacheRecord] = {}
+        pending: Dict[K, str] = {}
+        for ident, key in keys.items():
+            record = self._local_get(key)
+            if record is not None:
+                self._stats.record(key, "local_hits")
+                out[ident] = record
+            else:
+                pending[ident] = key
+        if not pending:
+            return out
+        names: List[str] = []
+        for key in pending.values():
+            names.extend((key, f"{key}:last_good"))
+        raws: Sequence[Any] = self._redis.mget(names)
+        for i, (ident, key) in enumerate(pending.items()):
+            primary, last_good = raws[2 * i], raws[2 * i + 1]
+            if primary is not None:
+                envelope = loads_any(primary)
+                out[ident] = self._record(envelope, from_last_good=False)
+                self._stats.record(key, "redis_hits")
+                if self._local is not None and not out[ident].stale:
+                    self._local.put(key, envelope, envelope.ttl - out[ident].age_seconds)
+            elif last_good is not None:
+                out[ident] = self._decode(last_good, from_last_good=True)
+                self._stats.record(key, "stale_hits")
+            else:
+                self._stats.record(key, "misses")
+        return out
+
+    def _local_get(self, key: str) -> CacheRecord | None:
+        if self._local is None:
+            return None
+        envelope = self._local.get(key)
+        if envelope is None:
+            return None
+        record = self._record(envelope, from_last_good=False)
+        return None if record.stale else record
+
+    def _decode(self, raw: Any, *, from_last_good: bool) -> CacheRecord:
+        return self._record(loads_any(raw), from_last_good=from_last_good)
+
+    def _record(self, envelope: Envelope, *, from_last_good: bool) -> CacheRecord:
+        age = int((self._clock() - envelope.stored_at).total_seconds())
+        stale = age > envelope.ttl or from_last_good
+        return CacheRecord(value=envelope.value, stale=stale, age_seconds=age, ttl=envelope.ttl)
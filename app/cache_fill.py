@@ -0,0 +1,312 @@
+"""Single-flight coalescing of cache fills.
+
+When a hot key expires, concurrent callers would otherwise all miss and
+recompute. `coalesced_fill` lets exactly one caller per key compute:
+
+* in-process, callers for the same key share one `Future`;
+* across processes, the computing caller holds a short Redis lock
+  (`<key>:fill_lock`, see `CacheClient.try_fill_lock`).
+
+Callers that lose the race get the stale (`:last_good`) value when one is
+available, otherwise they wait for the winner's write and read it back.
+If the lock holder disappears or the wait times out (in-process waits are
+bounded by the lock TTL too), they compute themselves rather than fail.
+
+`read_through` adds stale-while-revalidate on top: stale records (and fresh
+ones in the last `refresh_ahead` fraction of their TTL) are served at once
+while a deduplicated refresh runs on the `Revalidator` thread pool.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Mapping, Set
+
+from redis.exceptions import RedisError
+
+from app.cache import CacheClient, CacheRecord
+
+logger = logging.getLogger(__name__)
+
+Payload = Mapping[str, Any]
+
+
+class SingleFlight:
+    """Per-key in-process coalescing: concurrent callers share one `Future`."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+
+    def join(self, key: str) -> tuple[Future, bool]:
+        """Return the key's in-flight future and whether the caller must compute it."""
+
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = self._inflight[key] = Future()
+            return future, True
+
+    def finish(self, key: str) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+
+_FLIGHTS = SingleFlight()
+
+
+def coalesced_fill(
+    cache: CacheClient | None,
+    key: str,
+    *,
+    compute: Callable[[], Payload],
+    read: Callable[[], CacheRecord | None],
+    write: Callable[[Payload], None],
+    stale: CacheRecord | None = None,
+    lock_ttl: float = 10.0,
+    wait_timeout: float = 5.0,
+    poll_interval: float = 0.05,
+    flights: SingleFlight | None = None,
+) -> Payload:
+    """Return a fresh payload for `key`, computing it at most once across callers.
+
+    `read`/`write` are the caller's (error-tolerant) cache accessors and
+    `stale` the record it may serve instead of waiting, if any. Without a
+    cache this is plain in-process single-flight.
+    """
+
+    flights = flights or _FLIGHTS
+    future, leader = flights.join(key)
+    if not leader:
+        if stale is not None:
+            return stale.value
+        try:
+            return future.result(timeout=lock_ttl)
+        except FutureTimeout:
+            # The in-process leader outlived its lock: stop waiting and fill ourselves
+            payload = compute()
+            write(payload)
+            return payload
+    try:
+        payload = _fill(
+            cache, key, compute, read, write, stale, lock_ttl, wait_timeout, poll_interval
+        )
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(payload)
+        return payload
+    finally:
+        flights.finish(key)
+
+
+def _fill(
+    cache: CacheClient | None,
+    key: str,
+    compute: Callable[[], Payload],
+    read: Callable[[], CacheRecord | None],
+    write: Callable[[Payload], None],
+    stale: CacheRecord | None,
+    lock_ttl: float,
+    wait_timeout: float,
+    poll_interval: float,
+) -> Payload:
+    token = None
+    if cache is not None:
+        try:
+            token = cache.try_fill_lock(key, int(lock_ttl * 1000))
+        except (RedisError, OSError):
+            cache = None  # Redis is unavailable: compute without coordination
+    if cache is not None and token is None:
+        if stale is not None:
+            return stale.value
+        waited = _wait_for_peer(cache, key, read, wait_timeout, poll_interval)
+        if waited is not None:
+            return waited
+    try:
+        payload = compute()
+        write(payload)
+        return payload
+    finally:
+        if cache is not None and token is not None:
+            try:
+                cache.release_fill_lock(key, token)
+            except (RedisError, OSError):
+                pass  # expires on its own after lock_ttl
+
+
+def _wait_for_peer(
+    cache: CacheClient,
+    key: str,
+    read: Callable[[], CacheRecord | None],
+    timeout: float,
+    poll_interval: float,
+) -> Payload | None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        record = read()
+        if record is not None and not record.stale:
+            return record.value
+        try:
+            if not cache.fill_locked(key):
+                # Holder finished without a usable write (or died); one last look
+                record = read()
+                return record.value if record is not None and not record.stale else None
+        except (RedisError, OSError):
+            return None
+    return None
+
+
+class Revalidator:
+    """Background refreshes on a small thread pool, at most one queued per key."""
+
+    def __init__(self, max_workers: int = 4) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="cache-refresh"
+        )
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set()
+        self._futures: Set[Future] = set()
+
+    def submit(self, key: str, fn: Callable[[], Any]) -> bool:
+        """Queue `fn` unless a refresh for `key` is already pending; returns whether queued."""
+
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+        try:
+            future = self._executor.submit(self._run, key, fn)
+        except RuntimeError:  # executor shut down
+            with self._lock:
+                self._pending.discard(key)
+            return False
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._forget)
+        return True
+
+    def _run(self, key: str, fn: Callable[[], Any]) -> None:
+        try:
+            fn()
+        except Exception:
+            logger.warning("Background refresh of %s failed", key, exc_info=True)
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def _forget(self, future: Future) -> None:
+        with self._lock:
+            self._futures.discard(future)
+
+    def drain(self, timeout: float | None = None) -> None:
+        """Wait for queued refreshes to finish."""
+
+        with self._lock:
+            futures = list(self._futures)
+        wait(futures, timeout=timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+_REVALIDATOR: Revalidator | None = None
+_REVALIDATOR_LOCK = threading.Lock()
+
+
+def get_revalidator() -> Revalidator | None:
+    """Process-wide refresh pool, or None when `cache_refresh_workers` is 0."""
+
+    global _REVALIDATOR
+    if _REVALIDATOR is not None:
+        return _REVALIDATOR
+    from app.dependencies import get_settings
+
+    workers = get_settings().cache_refresh_workers
+    if workers <= 0:
+        return None
+    with _REVALIDATOR_LOCK:
+        if _REVALIDATOR is None:
+            _REVALIDATOR = Revalidator(max_workers=workers)
+    return _REVALIDATOR
+
+
+def stop_revalidator(wait: bool = True) -> None:
+    global _REVALIDATOR
+    with _REVALIDATOR_LOCK:
+        revalidator, _REVALIDATOR = _REVALIDATOR, None
+    if revalidator is not None:
+        revalidator.shutdown(wait=wait)
+
+
+def read_through(
+    cache: CacheClient | None,
+    key: str,
+    cached: CacheRecord | None,
+    *,
+    compute: Callable[[], Payload],
+    read: Callable[[], CacheRecord | None],
+    write: Callable[[Payload], None],
+    refresh_ahead: float = 0.1,
+    serve_stale_for: float = 3600.0,
+    lock_ttl: float = 10.0,
+    wait_timeout: float = 5.0,
+    revalidator: Revalidator | None = None,
+) -> Payload:
+    """Serve `cached` for `key`, refreshing in the background when it is due.
+
+    Fresh records outside the refresh window are returned as is. Records in
+    the last `refresh_ahead` of their TTL, or stale by at most
+    `serve_stale_for` seconds past it, are returned immediately and a refresh
+    is queued on `revalidator`. Anything else (a miss, a very old stale
+    record, or no revalidator) falls back to a synchronous `coalesced_fill`.
+    """
+
+    if cached is not None and not cached.expires_within(refresh_ahead):
+        return cached.value
+    servable = cached is not None and cached.age_seconds - cached.ttl <= serve_stale_for
+    if servable and revalidator is not None:
+        revalidator.submit(
+            key,
+            lambda: coalesced_fill(
+                cache,
+                key,
+                compute=compute,
+                read=read,
+                write=write,
+                stale=cached,
+                lock_ttl=lock_ttl,
+                wait_timeout=wait_timeout,
+            ),
+        )
+        return cached.value
+    if cached is not None and not cached.stale:
+        return cached.value  # near expiry but nothing to refresh with; still valid
+    return coalesced_fill(
+        cache,
+        key,
+        compute=compute,
+        read=read,
+        write=write,
+        # Callers that lose the fill race may serve the old value only inside the window
+        stale=cached if servable else None,
+        lock_ttl=lock_ttl,
+        wait_timeout=wait_timeout,
+    )
+
+
+__all__ = [
+    "Revalidator",
+    "SingleFlight",
+    "coalesced_fill",
+    "get_revalidator",
+    "read_through",
+    "stop_revalidator",
+]
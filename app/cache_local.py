@@ -0,0 +1,264 @@
+"""In-process tier in front of the Redis cache.
+
+`LocalCache` is a bounded LRU of decoded cache envelopes. An entry lives at
+most until its `CachePolicy` TTL runs out (or `max_age`, whichever is
+sooner), so a fresh local hit is exactly as fresh as the Redis primary key.
+Writes through any `CacheClient` publish the touched keys on
+`INVALIDATION_CHANNEL`; every process runs a listener that drops those keys
+from its own tier. `CacheStats` counts local hits, Redis hits and misses per
+key namespace (`indicator`, `spp`, `systems`, ...).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+from redis.exceptions import RedisError
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+_BOOT_ID = uuid.uuid4().hex
+
+
+def origin_id() -> str:
+    # Includes the pid so forked workers do not mistake each other for themselves
+    return f"{_BOOT_ID}:{os.getpid()}"
+
+
+def namespace_of(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters per key namespace."""
+
+    OUTCOMES = ("local_hits", "redis_hits", "stale_hits", "misses")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, key: str, outcome: str) -> None:
+        ns = namespace_of(key)
+        with self._lock:
+            counts = self._counts.get(ns)
+            if counts is None:
+                counts = self._counts[ns] = dict.fromkeys(self.OUTCOMES, 0)
+            counts[outcome] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {ns: dict(counts) for ns, counts in self._counts.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+class LocalCache:
+    """Bounded LRU with per-entry expiry (monotonic clock)."""
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        max_age: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= self._clock():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any, ttl_remaining: float) -> None:
+        lifetime = min(ttl_remaining, self.max_age)
+        if lifetime <= 0:
+            return
+        with self._lock:
+            self._data[key] = (self._clock() + lifetime, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                if self._data.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def metrics(self) -> dict:
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+def encode_invalidation(keys: Iterable[str]) -> str:
+    return "\n".join((origin_id(), *keys))
+
+
+def decode_invalidation(message: str | bytes) -> Tuple[str, list[str]]:
+    text = message.decode("utf-8") if isinstance(message, bytes) else message
+    origin, *keys = text.split("\n")
+    return origin, keys
+
+
+class InvalidationListener:
+    """Background thread applying peer invalidations to a `LocalCache`.
+
+    On (re)subscribe the local tier is cleared, since messages may have been
+    missed while disconnected.
+    """
+
+    def __init__(
+        self, redis_factory: Callable[[], Any], local: LocalCache, poll_timeout: float = 1.0
+    ) -> None:
+        self._redis_factory = redis_factory
+        self._local = local
+        self._poll_timeout = poll_timeout
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="cache-invalidation", daemon=True)
+
+    def start(self) -> "InvalidationListener":
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def handle(self, data: str | bytes) -> None:
+        origin, keys = decode_invalidation(data)
+        if origin != origin_id():
+            self._local.invalidate(keys)
+
+    def _run(self) -> None:
+        backoff = 0.5
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self._redis_factory().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                self._local.clear()
+                backoff = 0.5
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=self._poll_timeout)
+                    if message and message.get("type") == "message":
+                        self.handle(message["data"])
+            except (RedisError, OSError):
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except (RedisError, OSError):
+                        pass
+
+
+STATS = CacheStats()
+_LOCAL: LocalCache | None = None
+_LISTENER: InvalidationListener | None = None
+_LOCK = threading.Lock()
+
+
+def get_local_cache() -> LocalCache | None:
+    """Return the process-wide local tier, or None when disabled by settings."""
+
+    global _LOCAL
+    if _LOCAL is not None:
+        return _LOCAL
+    from app.dependencies import get_settings
+
+    settings = get_settings()
+    if settings.cache_local_max_entries <= 0:
+        return None
+    with _LOCK:
+        if _LOCAL is None:
+            _LOCAL = LocalCache(
+                max_entries=settings.cache_local_max_entries, max_age=settings.cache_local_max_age
+            )
+    return _LOCAL
+
+
+def start_invalidation_listener() -> None:
+    """Subscribe this process to peer invalidations (idempotent)."""
+
+    global _LISTENER
+    local = get_local_cache()
+    if local is None:
+        return
+    from app.redis_pool import get_redis
+
+    with _LOCK:
+        if _LISTENER is None:
+            _LISTENER = InvalidationListener(get_redis, local).start()
+
+
+def stop_invalidation_listener() -> None:
+    global _LISTENER
+    with _LOCK:
+        listener, _LISTENER = _LISTENER, None
+    if listener is not None:
+        listener.stop()
+
+
+def reset_local_cache() -> None:
+    """Drop the process-wide tier and counters (tests, forked workers)."""
+
+    global _LOCAL
+    with _LOCK:
+        _LOCAL = None
+    STATS.reset()
+
+
+def cache_metrics() -> dict:
+    return {
+        "namespaces": STATS.snapshot(),
+        "local": _LOCAL.metrics() if _LOCAL is not None else None,
+    }
+
+
+__all__ = [
+    "INVALIDATION_CHANNEL",
+    "CacheStats",
+    "InvalidationListener",
+    "LocalCache",
+    "STATS",
+    "cache_metrics",
+    "get_local_cache",
+    "reset_local_cache",
+    "start_invalidation_listener",
+    "stop_invalidation_listener",
+]
@@ -23,13 +23,87 @@ class Settings(BaseSettings):
         default="redis://localhost:6379/0", description="Redis connection URL for caches/queues."
     )
 
+    # Database connection pool (shared engine per process)
+    db_pool_size: int = Field(default=5, description="Persistent connections kept in the pool")
+    db_max_overflow: int = Field(default=10, description="Extra connections above pool size")
+    db_pool_timeout: float = Field(default=30.0, description="Seconds to wait for a connection")
+    db_pool_recycle: int = Field(default=1800, description="Recycle connections after N seconds")
+    db_pool_pre_ping: bool = Field(default=True, description="Validate connections on checkout")
+
+    # Redis connection pool (shared client per process)
+    redis_max_connections: int = Field(
+        default=50, description="Max pooled Redis connections per process"
+    )
+    redis_socket_timeout: float = Field(
+        default=2.0, description="Seconds to wait on a Redis command"
+    )
+    redis_socket_connect_timeout: float = Field(
+        default=1.0, description="Seconds to wait for Redis connect"
+    )
+    redis_health_check_interval: int = Field(
+        default=30, description="PING idle pooled connections older than N seconds before reuse"
+    )
+
+    # In-process cache tier in front of Redis (app.cache_local); 0 entries disables it
+    cache_local_max_entries: int = Field(
+        default=10_000, description="Max entries in the per-process LRU"
+    )
+    cache_local_max_age: float = Field(
+        default=300.0, description="Upper bound in seconds on how long an entry is served locally"
+    )
+
+    # Single-flight and stale-while-revalidate cache fills (app.cache_fill)
+    cache_fill_lock_ttl: float = Field(
+        default=10.0, description="Seconds a worker may hold the single-flight fill lock"
+    )
+    cache_fill_wait_timeout: float = Field(
+        default=5.0, description="Seconds a coalesced caller waits for another worker's fill"
+    )
+    cache_refresh_workers: int = Field(
+        default=4, description="Background refresh threads for stale-while-revalidate (0 disables)"
+    )
+    cache_refresh_ahead: float = Field(
+        default=0.1, description="Refresh fresh entries in the last fraction of their TTL"
+    )
+    cache_serve_stale_for: float = Field(
+        default=3600.0, description="Seconds past expiry a stale entry may be served"
+    )
+
+    # Indicator precompute (tasks.indicators)
+    indicators_window: int = Field(default=5, description="Trailing window for cached indicators")
+    indicators_lookback_days: int = Field(
+        default=30, description="Only snapshots this recent are considered by the precompute"
+    )
+
+    # SDE manifest watched by the process-resident blueprint graph (app.services.blueprint_graph)
+    sde_manifest_path: str = Field(
+        default="data/sde/manifest.json",
+        description="Manifest rewritten by every SDE load; a change reloads the blueprint graph",
+    )
+    sde_manifest_check_seconds: float = Field(
+        default=1.0, description="Minimum seconds between manifest checks per process"
+    )
+
+    # Incremental planning sessions (/plan/sessions), held in process memory
+    plan_session_max: int = Field(default=256, description="Plan sessions kept per process (LRU)")
+    plan_session_ttl: float = Field(default=1800.0, description="Seconds an idle session is kept")
+
     # Provider rate limits (token bucket): capacity (tokens) and refill rate (tokens/sec)
+    rate_limit_backend: str = Field(
+        default="local", description="Token bucket store: 'local' (per process) or 'redis' (shared)"
+    )
     esi_capacity: float = Field(default=10.0, description="ESI token bucket capacity")
     esi_refill_rate: float = Field(default=2.0, description="ESI tokens per second")
+    esi_page_concurrency: int = Field(
+        default=4, description="Concurrent page fetches for X-Pages routes"
+    )
     adam4eve_capacity: float = Field(default=1.0, description="Adam4EVE polite capacity")
     adam4eve_refill_rate: float = Field(default=0.1, description="Adam4EVE tokens per sec (~10s)")
     fuzzwork_capacity: float = Field(default=1.0, description="Fuzzwork capacity")
     fuzzwork_refill_rate: float = Field(default=0.2, description="Fuzzwork tokens per sec (~5s)")
+    price_fetch_concurrency: int = Field(
+        default=8, description="Max in-flight price requests per provider during refresh"
+    )
 
     model_config = SettingsConfigDict(
         env_file=".env",
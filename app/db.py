@@ -0,0 +1,81 @@
+"""Process-wide SQLAlchemy engine registry.
+
+Engines (and therefore connection pools) are created once per `database_url`
+and shared by every service, route, and Celery task in the process.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict
+
+import sqlalchemy as sa
+from sqlalchemy.engine import make_url
+
+from app.config import Settings
+from app.dependencies import get_settings
+
+# Registry of engines keyed by database URL
+_ENGINES: Dict[str, sa.Engine] = {}
+_LOCK = threading.Lock()
+
+
+def _engine_kwargs(settings: Settings) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+    # SQLite (tests/dev) uses single-connection pools that reject sizing args
+    if make_url(settings.database_url).get_backend_name() != "sqlite":
+        kwargs.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+        )
+    return kwargs
+
+
+def get_engine(settings: Settings | None = None) -> sa.Engine:
+    """Return the shared engine for `settings.database_url`, creating it on first use."""
+
+    settings = settings or get_settings()
+    url = settings.database_url
+    engine = _ENGINES.get(url)
+    if engine is not None:
+        return engine
+    with _LOCK:
+        engine = _ENGINES.get(url)
+        if engine is None:
+            engine = sa.create_engine(url, **_engine_kwargs(settings))
+            _ENGINES[url] = engine
+    return engine
+
+
+def dispose_engines(close: bool = True) -> None:
+    """Dispose every registered engine.
+
+    `close=False` drops pooled connections without closing them, which is the
+    correct behavior in a freshly forked child process (e.g. Celery prefork).
+    """
+
+    with _LOCK:
+        engines = list(_ENGINES.values())
+        _ENGINES.clear()
+    for engine in engines:
+        engine.dispose(close=close)
+
+
+def pool_metrics() -> dict:
+    out: dict[str, dict] = {}
+    for url, engine in list(_ENGINES.items()):
+        pool = engine.pool
+        stats: dict[str, Any] = {"status": pool.status()}
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            fn = getattr(pool, name, None)
+            if callable(fn):
+                stats[name] = fn()
+        out[make_url(url).render_as_string(hide_password=True)] = stats
+    return out
+
+
+__all__ = ["dispose_engines", "get_engine", "pool_metrics"]
@@ -4,10 +4,14 @@ from __future__ import annotations
 
 from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
-from .sde_autoload import schedule_autoload
 
 from .api import router as api_router
+from .cache_fill import stop_revalidator
+from .cache_local import start_invalidation_listener, stop_invalidation_listener
+from .db import dispose_engines
 from .dependencies import get_settings
+from .redis_pool import close_redis_pools
+from .sde_autoload import schedule_autoload
 
 app = FastAPI(title="EVEINDY API", version="0.1.0")
 app.include_router(api_router)
@@ -33,6 +37,18 @@ def load_settings_cache() -> None:
     except Exception:
         # Do not crash the app if scheduler fails to start
         pass
+    # Drop local cache entries other processes overwrite
+    start_invalidation_listener()
+
+
+@app.on_event("shutdown")
+def close_db_pools() -> None:
+    """Release pooled database and Redis connections on shutdown."""
+
+    stop_invalidation_listener()
+    stop_revalidator(wait=False)
+    dispose_engines()
+    close_redis_pools()
 
 
 @app.get("/health/live", status_code=status.HTTP_200_OK, include_in_schema=False)
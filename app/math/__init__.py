@@ -5,37 +5,51 @@ from __future__ import annotations
 from indy_math import (
     BollingerBands,
     CostContext,
+    CostEvaluator,
     CostResult,
     DepthForecast,
     DepthPoint,
     DepthSummary,
     PricePolicy,
+    RollingIndicators,
     SPPDiagnostics,
+    SPPGrid,
     SPPResult,
     bollinger_bands,
     cost_item,
+    cost_items,
     moving_average,
     recommend_batch_size,
+    rolling_indicators,
+    rolling_indicators_many,
     shallow_depth_metrics,
     simple_volatility,
+    spp_grid,
     spp_lead_time_aware,
 )
 
 __all__ = [
     "BollingerBands",
     "CostContext",
+    "CostEvaluator",
     "CostResult",
     "DepthForecast",
     "DepthPoint",
     "DepthSummary",
     "PricePolicy",
+    "RollingIndicators",
     "SPPDiagnostics",
+    "SPPGrid",
     "SPPResult",
     "bollinger_bands",
     "cost_item",
+    "cost_items",
     "moving_average",
     "recommend_batch_size",
+    "rolling_indicators",
+    "rolling_indicators_many",
     "shallow_depth_metrics",
     "simple_volatility",
+    "spp_grid",
     "spp_lead_time_aware",
 ]
@@ -1,15 +1,21 @@
 """External data provider interfaces."""
 
-from .adam4eve import Adam4EVEProvider
-from .base import CircuitBreakerOpen, PriceProvider, PriceQuote
+from .adam4eve import Adam4EVEProvider, AsyncAdam4EVEProvider
+from .base import AsyncPriceProvider, CircuitBreakerOpen, PriceProvider, PriceQuote
 from .esi import ESIClient
-from .fuzzwork import FuzzworkProvider
+from .esi_cache import MemoryESICache, RedisESICache
+from .fuzzwork import AsyncFuzzworkProvider, FuzzworkProvider
 
 __all__ = [
     "Adam4EVEProvider",
+    "AsyncAdam4EVEProvider",
+    "AsyncFuzzworkProvider",
+    "AsyncPriceProvider",
     "CircuitBreakerOpen",
     "PriceProvider",
     "PriceQuote",
     "ESIClient",
+    "MemoryESICache",
+    "RedisESICache",
     "FuzzworkProvider",
 ]
@@ -8,9 +8,16 @@ from decimal import Decimal
 import httpx
 from pydantic import BaseModel, Field
 
-from .base import CircuitBreaker, CircuitBreakerOpen, PriceProvider, PriceQuote, execute_with_retry
 from core.ratelimiter import RateLimiter
 
+from .base import (
+    AsyncHTTPPriceProvider,
+    CircuitBreaker,
+    PriceProvider,
+    PriceQuote,
+    execute_with_retry,
+)
+
 
 class _DepthPayload(BaseModel):
     qty_1pct: Decimal = Field(alias="qty_1pct")
@@ -25,6 +32,28 @@ class _PricePayload(BaseModel):
     timestamp: datetime = Field(alias="updated")
 
 
+def _to_quote(data: object, type_id: int, region_id: int) -> PriceQuote:
+    payload = _PricePayload.model_validate(data)
+    ts = (
+        payload.timestamp.replace(tzinfo=timezone.utc)
+        if payload.timestamp.tzinfo is None
+        else payload.timestamp.astimezone(timezone.utc)
+    )
+    mid = (payload.bid + payload.ask) / Decimal("2")
+    return PriceQuote(
+        type_id=type_id,
+        region_id=region_id,
+        bid=payload.bid,
+        ask=payload.ask,
+        mid=mid,
+        depth_qty_1pct=payload.depth.qty_1pct,
+        depth_qty_5pct=payload.depth.qty_5pct,
+        volatility=payload.volatility,
+        ts=ts,
+        provider="adam4eve",
+    )
+
+
 class Adam4EVEProvider(PriceProvider):
     def __init__(
         self,
@@ -52,25 +81,7 @@ class Adam4EVEProvider(PriceProvider):
                 timeout=self._timeout,
             )
             response.raise_for_status()
-            payload = _PricePayload.model_validate(response.json())
-            ts = (
-                payload.timestamp.replace(tzinfo=timezone.utc)
-                if payload.timestamp.tzinfo is None
-                else payload.timestamp.astimezone(timezone.utc)
-            )
-            mid = (payload.bid + payload.ask) / Decimal("2")
-            return PriceQuote(
-                type_id=type_id,
-                region_id=region_id,
-                bid=payload.bid,
-                ask=payload.ask,
-                mid=mid,
-                depth_qty_1pct=payload.depth.qty_1pct,
-                depth_qty_5pct=payload.depth.qty_5pct,
-                volatility=payload.volatility,
-                ts=ts,
-                provider="adam4eve",
-            )
+            return _to_quote(response.json(), type_id, region_id)
 
         try:
             quote = execute_with_retry(_call)
@@ -80,3 +91,16 @@ class Adam4EVEProvider(PriceProvider):
         else:
             self._breaker.success()
             return quote
+
+
+class AsyncAdam4EVEProvider(AsyncHTTPPriceProvider):
+    """`httpx.AsyncClient` variant of `Adam4EVEProvider` for concurrent fan-out."""
+
+    name = "adam4eve"
+    limit_key = "adam4eve:/market/type"
+
+    def _path(self, type_id: int, region_id: int) -> str:
+        return f"/market/type/{type_id}/region/{region_id}"
+
+    def _parse(self, data: object, type_id: int, region_id: int) -> PriceQuote:
+        return _to_quote(data, type_id, region_id)
@@ -2,13 +2,20 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import abc
+import asyncio
+import threading
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Any, Callable, Mapping, Protocol
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable, List, Protocol, Tuple
 
+import httpx
 from pydantic import BaseModel, Field
-from tenacity import Retrying, RetryError, stop_after_attempt, wait_random_exponential
+from tenacity import AsyncRetrying, Retrying, stop_after_attempt, wait_random_exponential
+
+if TYPE_CHECKING:
+    from core.ratelimiter import RateLimiter
 
 
 class CircuitBreakerOpen(RuntimeError):
@@ -19,16 +26,23 @@ class CircuitBreakerOpen(RuntimeError):
 class CircuitBreaker:
     max_failures: int = 3
     failure_count: int = 0
+    # Clients share one breaker across threads (e.g. concurrent ESI page fetches)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
 
     def check(self) -> None:
-        if self.failure_count >= self.max_failures:
-            raise CircuitBreakerOpen("provider circuit open; skip call")
+        with self._lock:
+            if self.failure_count >= self.max_failures:
+                raise CircuitBreakerOpen("provider circuit open; skip call")
 
     def success(self) -> None:
-        self.failure_count = 0
+        with self._lock:
+            self.failure_count = 0
 
     def failure(self) -> None:
-        self.failure_count += 1
+        with self._lock:
+            self.failure_count += 1
 
 
 class PriceQuote(BaseModel):
@@ -51,7 +65,18 @@ class PriceProvider(Protocol):
         ...
 
 
+class AsyncPriceProvider(Protocol):
+    """Protocol for asyncio price providers that can fan out many lookups."""
+
+    async def get(self, type_id: int, region_id: int) -> PriceQuote:
+        ...
+
+    async def get_many(self, pairs: Iterable[Tuple[int, int]]) -> List[PriceQuote | Exception]:
+        ...
+
+
 RetryCallable = Callable[[], PriceQuote]
+AsyncRetryCallable = Callable[[], Awaitable[PriceQuote]]
 
 
 def execute_with_retry(callable_: RetryCallable, max_attempts: int = 5) -> PriceQuote:
@@ -66,6 +91,112 @@ def execute_with_retry(callable_: RetryCallable, max_attempts: int = 5) -> Price
     raise RuntimeError("Retry loop exhausted")
 
 
+async def execute_with_retry_async(
+    callable_: AsyncRetryCallable, max_attempts: int = 5
+) -> PriceQuote:
+    retry = AsyncRetrying(
+        stop=stop_after_attempt(max_attempts),
+        wait=wait_random_exponential(min=1, max=5),
+        reraise=True,
+    )
+    async for attempt in retry:
+        with attempt:
+            return await callable_()
+    raise RuntimeError("Retry loop exhausted")
+
+
+class AsyncHTTPPriceProvider(abc.ABC):
+    """Shared plumbing for `httpx.AsyncClient` price providers.
+
+    At most `max_concurrency` requests are in flight per provider; each one
+    still takes a token from the (shared) rate limiter before it is sent, so
+    fan-out never exceeds the configured token-bucket budget. Subclasses
+    supply the request path and response parsing.
+    """
+
+    name: str = ""
+    limit_key: str = ""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        base_url: str,
+        breaker: CircuitBreaker | None = None,
+        timeout: float = 10.0,
+        rate_limiter: "RateLimiter | None" = None,
+        max_concurrency: int = 8,
+        max_attempts: int = 5,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self._client = client
+        self._base_url = base_url.rstrip("/")
+        self._breaker = breaker or CircuitBreaker()
+        self._timeout = timeout
+        self._rl = rate_limiter
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._max_attempts = max_attempts
+
+    @abc.abstractmethod
+    def _path(self, type_id: int, region_id: int) -> str:
+        """Request path (appended to `base_url`) for one quote."""
+
+    @abc.abstractmethod
+    def _parse(self, data: Any, type_id: int, region_id: int) -> PriceQuote:
+        """Build a `PriceQuote` from the decoded JSON response."""
+
+    async def get(self, type_id: int, region_id: int) -> PriceQuote:
+        self._breaker.check()
+        try:
+            quote = await self._fetch(type_id, region_id)
+        except Exception:  # noqa: BLE001
+            self._breaker.failure()
+            raise
+        self._breaker.success()
+        return quote
+
+    async def _fetch(self, type_id: int, region_id: int) -> PriceQuote:
+        """One rate-limited, retried request; the caller updates the breaker."""
+
+        async def _call() -> PriceQuote:
+            if self._rl:
+                await self._rl.acquire(self.limit_key)
+            response = await self._client.get(
+                f"{self._base_url}{self._path(type_id, region_id)}",
+                timeout=self._timeout,
+            )
+            response.raise_for_status()
+            return self._parse(response.json(), type_id, region_id)
+
+        async with self._semaphore:
+            return await execute_with_retry_async(_call, self._max_attempts)
+
+    async def get_many(self, pairs: Iterable[Tuple[int, int]]) -> List[PriceQuote | Exception]:
+        """Fetch quotes for `(type_id, region_id)` pairs concurrently.
+
+        Results are returned in input order; failed lookups are returned as the
+        raised exception instead of cancelling the rest of the batch. The
+        breaker sees the batch as one call: any failed lookup counts as a
+        single failure, and only a batch without failures resets it.
+        """
+
+        pairs = list(pairs)
+        try:
+            self._breaker.check()
+        except CircuitBreakerOpen as exc:
+            return [CircuitBreakerOpen(str(exc)) for _ in pairs]
+        tasks = [self._fetch(type_id, region_id) for type_id, region_id in pairs]
+        results = list(await asyncio.gather(*tasks, return_exceptions=True))
+        if any(isinstance(result, BaseException) for result in results):
+            self._breaker.failure()
+        elif results:
+            self._breaker.success()
+        return results
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
 def parse_decimal(value: Any, *, field: str) -> Decimal:
     try:
         return Decimal(str(value))
@@ -1,19 +1,24 @@
-"""ESI client wrapper with retry, validation, and circuit breaker."""
+"""ESI client wrapper with retry, validation, HTTP caching, and circuit breaker."""
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Callable, Generic, List, Mapping, Sequence, Tuple, TypeVar
+from typing import Callable, Dict, Generic, Iterator, List, Mapping, Sequence, Tuple, TypeVar
+from urllib.parse import urlencode
 
 import httpx
 from pydantic import BaseModel, Field
 from tenacity import Retrying, stop_after_attempt, wait_random_exponential
 
-from .base import CircuitBreaker
 from core.ratelimiter import RateLimiter
 
+from .base import CircuitBreaker
+from .esi_cache import ESICacheEntry, ESIHTTPCache, MemoryESICache
+
 T = TypeVar("T", bound=BaseModel)
 
 
@@ -64,6 +69,9 @@ class ESIClient:
         breaker: CircuitBreaker | None = None,
         timeout: float = 15.0,
         rate_limiter: RateLimiter | None = None,
+        http_cache: ESIHTTPCache | None = None,
+        clock: Callable[[], datetime] | None = None,
+        page_concurrency: int = 4,
     ) -> None:
         self._client = client
         self._base_url = base_url.rstrip("/")
@@ -71,28 +79,36 @@ class ESIClient:
         self._breaker = breaker or CircuitBreaker(max_failures=5)
         self._timeout = timeout
         self._rl = rate_limiter
+        # Always cache: without a shared store, keep entries for this client's lifetime
+        self._http_cache: ESIHTTPCache = http_cache if http_cache is not None else MemoryESICache()
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+        # (cache key, model) -> (body hash, validated models)
+        self._validated: Dict[Tuple[str, type], Tuple[str, List[BaseModel]]] = {}
+        self._page_concurrency = max(1, page_concurrency)
 
     def list_industry_jobs(self, owner_scope: str) -> ESIResponse[IndustryJob]:
-        data, expires = self._request(
+        return self._paged_models(
+            IndustryJob,
+            f"/industry/jobs/{owner_scope}",
+            params={"include_completed": "true"},
+        )
+
+    def iter_industry_jobs(self, owner_scope: str) -> Iterator[IndustryJob]:
+        """Stream jobs from every page as pages arrive (page order not guaranteed)."""
+        return self._iter_models(
+            IndustryJob,
             f"/industry/jobs/{owner_scope}",
             params={"include_completed": "true"},
         )
-        return ESIResponse(data=[IndustryJob.model_validate(item) for item in data], expires=expires)
 
     def list_assets(self, owner_scope: str) -> ESIResponse[Asset]:
-        data, expires = self._request(f"/assets/{owner_scope}")
-        return ESIResponse(data=[Asset.model_validate(item) for item in data], expires=expires)
+        return self._paged_models(Asset, f"/assets/{owner_scope}")
 
     def get_system_cost_indices(self, system_id: int) -> ESIResponse[CostIndex]:
-        data, expires = self._request(f"/industry/systems/{system_id}")
-        return ESIResponse(data=[CostIndex.model_validate(item) for item in data], expires=expires)
+        return self._models(CostIndex, f"/industry/systems/{system_id}")
 
     def get_character_skills(self, character_id: int) -> ESIResponse[CharacterSkills]:
-        data, expires = self._request(f"/skills/{character_id}")
-        if not data:
-            return ESIResponse(data=[], expires=expires)
-        payload = CharacterSkills.model_validate(data[0])
-        return ESIResponse(data=[payload], expires=expires)
+        return self._models(CharacterSkills, f"/skills/{character_id}", first_only=True)
 
     def _auth_header(self) -> Mapping[str, str]:
         if not self._token_provider:
@@ -100,33 +116,138 @@ class ESIClient:
         token = self._token_provider()
         return {"Authorization": f"Bearer {token}"}
 
+    def _models(
+        self,
+        model: type[T],
+        path: str,
+        params: Mapping[str, str] | None = None,
+        first_only: bool = False,
+    ) -> ESIResponse[T]:
+        entry = self._fetch(path, params)
+        return ESIResponse(
+            data=self._validate(model, _cache_key(path, params), entry, first_only),
+            expires=entry.expires,
+        )
+
+    def _paged_models(
+        self, model: type[T], path: str, params: Mapping[str, str] | None = None
+    ) -> ESIResponse[T]:
+        by_page: Dict[int, List[T]] = {}
+        expires = None
+        for page, key, entry in self._pages(path, params):
+            by_page[page] = self._validate(model, key, entry)
+            if page == 1:
+                expires = entry.expires
+        if len(by_page) == 1:
+            data = by_page[1]
+        else:
+            data = [m for page in sorted(by_page) for m in by_page[page]]
+        return ESIResponse(data=data, expires=expires)
+
+    def _iter_models(
+        self, model: type[T], path: str, params: Mapping[str, str] | None = None
+    ) -> Iterator[T]:
+        for _, key, entry in self._pages(path, params):
+            yield from self._validate(model, key, entry)
+
+    def _validate(
+        self, model: type[T], key: str, entry: ESICacheEntry, first_only: bool = False
+    ) -> List[T]:
+        # Validation is skipped when the body is byte-identical to the last one validated
+        memo = self._validated.get((key, model))
+        if memo is not None and memo[0] == entry.body_hash:
+            return memo[1]  # type: ignore[return-value]
+        items = entry.data[:1] if first_only else entry.data
+        models = [model.model_validate(item) for item in items]
+        self._validated[(key, model)] = (entry.body_hash, models)
+        return models
+
+    def _pages(
+        self, path: str, params: Mapping[str, str] | None = None
+    ) -> Iterator[Tuple[int, str, ESICacheEntry]]:
+        """Yield `(page, cache key, entry)` for page 1, then the rest as they complete.
+
+        Page 1 carries `X-Pages`; pages 2..N are fetched concurrently on up to
+        `page_concurrency` threads, each still passing through the rate
+        limiter, breaker and HTTP cache. Closing the iterator early cancels
+        pages not yet started.
+        """
+
+        first = self._fetch(path, params)
+        yield 1, _cache_key(path, params), first
+        total = first.pages
+        if total <= 1:
+            return
+        pool = ThreadPoolExecutor(
+            max_workers=min(self._page_concurrency, total - 1), thread_name_prefix="esi-pages"
+        )
+        futures = {}
+        for page in range(2, total + 1):
+            page_params = {**(params or {}), "page": str(page)}
+            key = _cache_key(path, page_params)
+            futures[pool.submit(self._fetch, path, page_params)] = (page, key)
+        try:
+            for future in as_completed(futures):
+                page, key = futures[future]
+                yield page, key, future.result()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
     def _request(
         self,
         path: str,
         params: Mapping[str, str] | None = None,
     ) -> Tuple[Sequence[Mapping[str, object]], datetime | None]:
+        entry = self._fetch(path, params)
+        return entry.data, entry.expires
+
+    def _fetch(self, path: str, params: Mapping[str, str] | None = None) -> ESICacheEntry:
+        key = _cache_key(path, params)
+        cached = self._http_cache.get(key)
+        fresh_until = cached.fresh_until if cached is not None else None
+        if fresh_until is not None and self._clock() < fresh_until:
+            return cached  # ESI would serve the same body until Expires; spend no budget
+
         self._breaker.check()
 
-        def _call() -> Tuple[Sequence[Mapping[str, object]], datetime | None]:
+        def _call() -> ESICacheEntry:
             if self._rl:
                 self._rl.block_until_allowed(f"esi:{path}")
+            headers = dict(self._auth_header())
+            if cached is not None and cached.etag:
+                headers["If-None-Match"] = cached.etag
             response = self._client.get(
                 f"{self._base_url}{path}",
-                headers=self._auth_header(),
+                headers=headers,
                 params=params,
                 timeout=self._timeout,
             )
+            if response.status_code == 304 and cached is not None:
+                expires, fresh_until = self._expiry(response)
+                return replace(
+                    cached,
+                    etag=response.headers.get("ETag", cached.etag),
+                    expires=expires or cached.expires,
+                    fresh_until=fresh_until,
+                    pages=_page_count(response, cached.pages),
+                )
             response.raise_for_status()
-            expires = response.headers.get("Expires")
-            expires_at = None
-            if expires:
-                expires_at = datetime.strptime(expires, "%a, %d %b %Y %H:%M:%S %Z").replace(tzinfo=timezone.utc)
+            expires, fresh_until = self._expiry(response)
             payload = response.json()
             if isinstance(payload, dict):
-                return [payload], expires_at
-            if isinstance(payload, list):
-                return payload, expires_at
-            raise ValueError("Unexpected payload type from ESI")
+                data = [payload]
+            elif isinstance(payload, list):
+                data = payload
+            else:
+                raise ValueError("Unexpected payload type from ESI")
+            return ESICacheEntry(
+                data=data,
+                body_hash=hashlib.sha256(response.content).hexdigest(),
+                etag=response.headers.get("ETag"),
+                expires=expires,
+                fresh_until=fresh_until,
+                pages=_page_count(response, 1),
+            )
 
         retry = Retrying(
             stop=stop_after_attempt(5),
@@ -139,9 +260,44 @@ class ESIClient:
                 with attempt:
                     result = _call()
                     self._breaker.success()
+                    self._http_cache.set(key, result)
                     return result
         except Exception:  # noqa: BLE001
             self._breaker.failure()
             raise
 
         raise RuntimeError("Retry loop exhausted")
+
+    def _expiry(self, response: httpx.Response) -> Tuple[datetime | None, datetime | None]:
+        """Return (`Expires` as sent, the same instant on our clock).
+
+        The local deadline is `now + (Expires - Date)` so clock skew against
+        ESI neither serves stale data nor wastes calls.
+        """
+
+        expires_at = _http_date(response.headers.get("Expires"))
+        if expires_at is None:
+            return None, None
+        server_now = _http_date(response.headers.get("Date"))
+        if server_now is None:
+            return expires_at, expires_at
+        return expires_at, self._clock() + (expires_at - server_now)
+
+
+def _http_date(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    return datetime.strptime(value, "%a, %d %b %Y %H:%M:%S %Z").replace(tzinfo=timezone.utc)
+
+
+def _page_count(response: httpx.Response, default: int) -> int:
+    try:
+        return max(1, int(response.headers["X-Pages"]))
+    except (KeyError, ValueError):
+        return default
+
+
+def _cache_key(path: str, params: Mapping[str, str] | None) -> str:
+    if not params:
+        return path
+    return f"{path}?{urlencode(sorted(params.items()))}"
@@ -0,0 +1,110 @@
+"""HTTP response cache for `ESIClient`.
+
+ESI publishes `Expires` and `ETag` on every cacheable route. Entries keep the
+decoded body together with its ETag, a SHA-256 of the raw bytes and the local
+time until which it is fresh, so the client can:
+
+* skip the request entirely before `Expires`;
+* send `If-None-Match` afterwards and reuse the stored body on 304;
+* reuse already validated models whenever the body hash is unchanged.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Mapping, Protocol, Sequence
+
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ESICacheEntry:
+    data: Sequence[Mapping[str, Any]]
+    body_hash: str
+    etag: str | None
+    expires: datetime | None  # as published by ESI
+    fresh_until: datetime | None  # `expires` translated to the local clock
+    pages: int = 1  # `X-Pages` of the paginated route this entry belongs to
+
+
+class ESIHTTPCache(Protocol):
+    def get(self, key: str) -> ESICacheEntry | None:
+        ...
+
+    def set(self, key: str, entry: ESICacheEntry) -> None:
+        ...
+
+
+class MemoryESICache:
+    """Per-process cache; fine for scripts and tests."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, ESICacheEntry] = {}
+
+    def get(self, key: str) -> ESICacheEntry | None:
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key: str, entry: ESICacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+
+
+class RedisESICache:
+    """Shared cache under `{prefix}:{key}`, kept `retain_seconds` for revalidation.
+
+    Errors are logged and treated as misses so ESI calls never fail on the cache.
+    """
+
+    def __init__(
+        self, redis_client: Any, prefix: str = "esi:http", retain_seconds: int = 86_400
+    ) -> None:
+        self._redis = redis_client
+        self._prefix = prefix
+        self._retain = retain_seconds
+
+    def get(self, key: str) -> ESICacheEntry | None:
+        try:
+            raw = self._redis.get(f"{self._prefix}:{key}")
+        except RedisError:
+            logger.warning("ESI cache read failed for %s", key, exc_info=True)
+            return None
+        if raw is None:
+            return None
+        doc = json.loads(raw)
+        return ESICacheEntry(
+            data=doc["data"],
+            body_hash=doc["body_hash"],
+            etag=doc.get("etag"),
+            expires=_parse_dt(doc.get("expires")),
+            fresh_until=_parse_dt(doc.get("fresh_until")),
+            pages=doc.get("pages", 1),
+        )
+
+    def set(self, key: str, entry: ESICacheEntry) -> None:
+        doc = {
+            "data": entry.data,
+            "body_hash": entry.body_hash,
+            "etag": entry.etag,
+            "expires": entry.expires.isoformat() if entry.expires else None,
+            "fresh_until": entry.fresh_until.isoformat() if entry.fresh_until else None,
+            "pages": entry.pages,
+        }
+        try:
+            self._redis.setex(f"{self._prefix}:{key}", self._retain, json.dumps(doc))
+        except RedisError:
+            logger.warning("ESI cache write failed for %s", key, exc_info=True)
+
+
+def _parse_dt(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+__all__ = ["ESICacheEntry", "ESIHTTPCache", "MemoryESICache", "RedisESICache"]
@@ -9,15 +9,26 @@ import httpx
 
 from app.config import Settings
 from app.rate_limit import limiter_for_provider
-from .adam4eve import Adam4EVEProvider
-from .fuzzwork import FuzzworkProvider
+from app.redis_pool import get_redis
+
+from .adam4eve import Adam4EVEProvider, AsyncAdam4EVEProvider
+from .base import AsyncHTTPPriceProvider
 from .esi import ESIClient
+from .esi_cache import RedisESICache
+from .fuzzwork import AsyncFuzzworkProvider, FuzzworkProvider
 
 
 def build_http_client(timeout: float = 10.0) -> httpx.Client:
     return httpx.Client(timeout=timeout)
 
 
+def build_async_http_client(timeout: float = 10.0, max_connections: int = 10) -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=max_connections, max_keepalive_connections=max_connections
+    )
+    return httpx.AsyncClient(timeout=timeout, limits=limits)
+
+
 def make_price_provider(name: str, settings: Settings) -> object:
     client = build_http_client()
     lname = name.lower()
@@ -36,11 +47,33 @@ def make_price_provider(name: str, settings: Settings) -> object:
     raise ValueError(f"Unknown provider: {name}")
 
 
+def make_async_price_provider(name: str, settings: Settings) -> AsyncHTTPPriceProvider:
+    concurrency = settings.price_fetch_concurrency
+    client = build_async_http_client(max_connections=concurrency)
+    lname = name.lower()
+    if lname == "adam4eve":
+        return AsyncAdam4EVEProvider(
+            client=client,
+            base_url=getattr(settings, "adam4eve_base_url", "https://api.adam4eve.eu"),
+            rate_limiter=limiter_for_provider("adam4eve", settings),
+            max_concurrency=concurrency,
+        )
+    if lname == "fuzzwork":
+        return AsyncFuzzworkProvider(
+            client=client,
+            base_url=getattr(settings, "fuzzwork_base_url", "https://market.fuzzwork.co.uk"),
+            rate_limiter=limiter_for_provider("fuzzwork", settings),
+            max_concurrency=concurrency,
+        )
+    raise ValueError(f"Unknown provider: {name}")
+
+
 def make_esi(settings: Settings, token_provider=None) -> ESIClient:
     return ESIClient(
         client=build_http_client(timeout=15.0),
         base_url="https://esi.evetech.net/latest",
         token_provider=token_provider,
         rate_limiter=limiter_for_provider("esi", settings),
+        http_cache=RedisESICache(get_redis(settings)),
+        page_concurrency=settings.esi_page_concurrency,
     )
-
@@ -8,9 +8,16 @@ from decimal import Decimal
 import httpx
 from pydantic import BaseModel, Field
 
-from .base import CircuitBreaker, PriceProvider, PriceQuote, execute_with_retry
 from core.ratelimiter import RateLimiter
 
+from .base import (
+    AsyncHTTPPriceProvider,
+    CircuitBreaker,
+    PriceProvider,
+    PriceQuote,
+    execute_with_retry,
+)
+
 
 class _Edge(BaseModel):
     price: Decimal
@@ -30,6 +37,30 @@ class _Payload(BaseModel):
     volatility: Decimal = Field(default=Decimal("0.1"))
 
 
+def _to_quote(data: object, type_id: int, region_id: int) -> PriceQuote:
+    payload = _Payload.model_validate(data)
+    ts = (
+        payload.generated.replace(tzinfo=timezone.utc)
+        if payload.generated.tzinfo is None
+        else payload.generated.astimezone(timezone.utc)
+    )
+    bid = payload.buy.price
+    ask = payload.sell.price
+    mid = (bid + ask) / Decimal("2")
+    return PriceQuote(
+        type_id=type_id,
+        region_id=region_id,
+        bid=bid,
+        ask=ask,
+        mid=mid,
+        depth_qty_1pct=payload.depth.qty_1pct,
+        depth_qty_5pct=payload.depth.qty_5pct,
+        volatility=payload.volatility,
+        ts=ts,
+        provider="fuzzwork",
+    )
+
+
 class FuzzworkProvider(PriceProvider):
     def __init__(
         self,
@@ -56,27 +87,7 @@ class FuzzworkProvider(PriceProvider):
                 timeout=self._timeout,
             )
             response.raise_for_status()
-            payload = _Payload.model_validate(response.json())
-            ts = (
-                payload.generated.replace(tzinfo=timezone.utc)
-                if payload.generated.tzinfo is None
-                else payload.generated.astimezone(timezone.utc)
-            )
-            bid = payload.buy.price
-            ask = payload.sell.price
-            mid = (bid + ask) / Decimal("2")
-            return PriceQuote(
-                type_id=type_id,
-                region_id=region_id,
-                bid=bid,
-                ask=ask,
-                mid=mid,
-                depth_qty_1pct=payload.depth.qty_1pct,
-                depth_qty_5pct=payload.depth.qty_5pct,
-                volatility=payload.volatility,
-                ts=ts,
-                provider="fuzzwork",
-            )
+            return _to_quote(response.json(), type_id, region_id)
 
         try:
             quote = execute_with_retry(_call)
@@ -86,3 +97,16 @@ class FuzzworkProvider(PriceProvider):
         else:
             self._breaker.success()
             return quote
+
+
+class AsyncFuzzworkProvider(AsyncHTTPPriceProvider):
+    """`httpx.AsyncClient` variant of `FuzzworkProvider` for concurrent fan-out."""
+
+    name = "fuzzwork"
+    limit_key = "fuzzwork:/orders/type"
+
+    def _path(self, type_id: int, region_id: int) -> str:
+        return f"/orders/type/{type_id}/region/{region_id}"
+
+    def _parse(self, data: object, type_id: int, region_id: int) -> PriceQuote:
+        return _to_quote(data, type_id, region_id)
@@ -3,43 +3,69 @@
 from __future__ import annotations
 
 import time
-from typing import Callable
+from typing import Callable, Union
 
-from core.ratelimiter import RateLimiter
+from core.ratelimiter import RateLimiter, RedisRateLimiter
+
+Limiter = Union[RateLimiter, RedisRateLimiter]
 
 # Simple registry for limiter instances by provider name
-_REGISTRY: dict[str, RateLimiter] = {}
+_REGISTRY: dict[str, Limiter] = {}
 
 
 def build_limiter(capacity: float, refill_rate: float, now: Callable[[], float] | None = None) -> RateLimiter:
     return RateLimiter(capacity=capacity, refill_rate_per_sec=refill_rate, now=now or time.time)
 
 
-def limiter_for_provider(provider: str, settings) -> RateLimiter:
-    p = provider.lower()
-    if p == "esi":
-        lim = build_limiter(settings.esi_capacity, settings.esi_refill_rate)
-        _REGISTRY.setdefault("esi", lim)
-        return lim
-    if p == "adam4eve":
-        lim = build_limiter(settings.adam4eve_capacity, settings.adam4eve_refill_rate)
-        _REGISTRY.setdefault("adam4eve", lim)
-        return lim
-    if p == "fuzzwork":
-        lim = build_limiter(settings.fuzzwork_capacity, settings.fuzzwork_refill_rate)
-        _REGISTRY.setdefault("fuzzwork", lim)
-        return lim
+def build_redis_limiter(capacity: float, refill_rate: float, settings) -> RedisRateLimiter:
+    from app.redis_pool import get_redis
+
+    # Wall clock: buckets are shared by processes on different hosts
+    return RedisRateLimiter(
+        redis=get_redis(settings),
+        capacity=capacity,
+        refill_rate_per_sec=refill_rate,
+        now=time.time,
+    )
+
+
+def _budget(provider: str, settings) -> tuple[float, float]:
+    if provider == "esi":
+        return settings.esi_capacity, settings.esi_refill_rate
+    if provider == "adam4eve":
+        return settings.adam4eve_capacity, settings.adam4eve_refill_rate
+    if provider == "fuzzwork":
+        return settings.fuzzwork_capacity, settings.fuzzwork_refill_rate
     # Default conservative limiter
-    lim = build_limiter(1.0, 0.1)
-    _REGISTRY.setdefault(p, lim)
+    return 1.0, 0.1
+
+
+def _shape(lim: Limiter) -> tuple[str, float, float]:
+    backend = "redis" if isinstance(lim, RedisRateLimiter) else "local"
+    return backend, lim.capacity, lim.refill_rate_per_sec
+
+
+def limiter_for_provider(provider: str, settings) -> Limiter:
+    """Return the limiter for `provider`, built once per process.
+
+    With `rate_limit_backend="redis"` the bucket lives in Redis and its budget
+    is shared by every API and worker process.
+    """
+
+    p = provider.lower()
+    capacity, refill_rate = _budget(p, settings)
+    backend = settings.rate_limit_backend
+    lim = _REGISTRY.get(p)
+    # Rebuild only when settings changed (e.g. tests passing a different Settings)
+    if lim is None or _shape(lim) != (backend, capacity, refill_rate):
+        if backend == "redis":
+            lim = build_redis_limiter(capacity, refill_rate, settings)
+        else:
+            lim = build_limiter(capacity, refill_rate)
+        _REGISTRY[p] = lim
     return lim
 
 
 def limiter_metrics() -> dict:
-    out: dict[str, dict] = {}
-    for name, lim in _REGISTRY.items():
-        per_key = {}
-        for key, b in lim.buckets.items():  # type: ignore[attr-defined]
-            per_key[key] = {"allowed": b.allowed, "denied": b.denied, "delayed": b.delayed}
-        out[name] = per_key
-    return out
+    # Redis-backed limiters report cluster-wide counters
+    return {name: lim.metrics_by_key() for name, lim in _REGISTRY.items()}
@@ -0,0 +1,92 @@
+"""Process-wide Redis connection pools.
+
+One `redis.ConnectionPool` is created per `redis_url` and shared by every
+service, route, and Celery task in the process, so cached reads reuse warm
+connections instead of paying connection setup per request.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Tuple
+
+import redis
+
+from app.config import Settings
+from app.dependencies import get_settings
+
+# Registry of pools keyed by (Redis URL, decode_responses)
+_POOLS: Dict[Tuple[str, bool], redis.ConnectionPool] = {}
+_LOCK = threading.Lock()
+
+
+def _pool_for(settings: Settings, decode_responses: bool = True) -> redis.ConnectionPool:
+    key = (settings.redis_url, decode_responses)
+    pool = _POOLS.get(key)
+    if pool is not None:
+        return pool
+    with _LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = redis.ConnectionPool.from_url(
+                settings.redis_url,
+                decode_responses=decode_responses,
+                max_connections=settings.redis_max_connections,
+                socket_timeout=settings.redis_socket_timeout,
+                socket_connect_timeout=settings.redis_socket_connect_timeout,
+                health_check_interval=settings.redis_health_check_interval,
+            )
+            _POOLS[key] = pool
+    return pool
+
+
+def get_redis(settings: Settings | None = None, *, decode_responses: bool = True) -> redis.Redis:
+    """Return a client bound to the shared pool for `settings.redis_url`.
+
+    Clients are cheap wrappers; connections are borrowed from the pool per
+    command (or per pipeline) and returned afterwards. Pass
+    `decode_responses=False` for byte payloads (e.g. binary cache envelopes).
+    """
+
+    return redis.Redis(connection_pool=_pool_for(settings or get_settings(), decode_responses))
+
+
+def close_redis_pools(disconnect: bool = True) -> None:
+    """Forget every registered pool, disconnecting it unless `disconnect=False`.
+
+    `disconnect=False` is for freshly forked children (e.g. Celery prefork),
+    which must not touch sockets inherited from the parent.
+    """
+
+    with _LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    if disconnect:
+        for pool in pools:
+            pool.disconnect()
+
+
+def redis_pool_metrics() -> dict:
+    out: dict[str, dict] = {}
+    for (url, decode), pool in list(_POOLS.items()):
+        in_use = len(getattr(pool, "_in_use_connections", ()))
+        idle = len(getattr(pool, "_available_connections", ()))
+        out[_redact(url) + ("" if decode else " (bytes)")] = {
+            "in_use": in_use,
+            "idle": idle,
+            "created": getattr(pool, "_created_connections", in_use + idle),
+            "max": pool.max_connections,
+        }
+    return out
+
+
+def _redact(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    if "@" not in rest:
+        return url
+    creds, _, host = rest.rpartition("@")
+    user = creds.split(":", 1)[0]
+    return f"{scheme}{sep}{user}:***@{host}"
+
+
+__all__ = ["close_redis_pools", "get_redis", "redis_pool_metrics"]
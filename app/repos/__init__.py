@@ -8,11 +8,23 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
-from typing import Literal, Protocol, Sequence
-
+from typing import Final, Literal, Mapping, Protocol, Sequence
 
 JobActivity = Literal["manufacturing", "reaction", "invention", "research"]
 
+# ESI job statuses outside the `job_status` enum, mapped onto the state that is stored
+_STORED_STATUS: Final[dict[str, str]] = {
+    "ready": "active",
+    "paused": "active",
+    "reverted": "cancelled",
+}
+
+
+def stored_job_status(status: str) -> str:
+    """Return the `job_status` value persisted for an ESI job status."""
+
+    return _STORED_STATUS.get(status, status)
+
 
 @dataclass(frozen=True)
 class Job:
@@ -30,12 +42,43 @@ class Job:
     fees_isk: Decimal | None
 
 
+@dataclass(frozen=True)
+class JobState:
+    """The stored `industry_jobs` columns a sync may update; equal states need no write."""
+
+    status: str
+    runs: int
+    end_time: datetime | None
+    location_id: int | None
+    facility_id: int | None
+    fees_isk: Decimal | None
+
+
+def job_state(job: Job) -> JobState:
+    """Return the `JobState` that upserting `job` would store."""
+
+    return JobState(
+        status=stored_job_status(job.status),
+        runs=job.runs,
+        end_time=job.end_time,
+        location_id=job.location_id,
+        facility_id=job.facility_id,
+        fees_isk=job.fees_isk,
+    )
+
+
 class InventoryRepo(Protocol):
     def reserve_for_job(self, job: Job) -> None: ...
     def release_for_job(self, job: Job) -> None: ...
     def settle_job_outputs(self, job: Job) -> None: ...
+    # Set-based forms: one round trip for any number of jobs
+    def reserve_for_jobs(self, jobs: Sequence[Job]) -> None: ...
+    def release_for_jobs(self, jobs: Sequence[Job]) -> None: ...
+    def settle_outputs(self, jobs: Sequence[Job]) -> None: ...
 
 
 class JobsRepo(Protocol):
     def upsert_jobs(self, owner_scope: str, jobs: Sequence[Job]) -> None: ...
-
+    def get_job_states(
+        self, owner_scope: str, job_ids: Sequence[int]
+    ) -> Mapping[int, JobState]: ...
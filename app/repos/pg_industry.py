@@ -0,0 +1,217 @@
+"""SQLAlchemy implementations of `JobsRepo` and `InventoryRepo` for Postgres.
+
+Both repos are bound to a connection so a whole ESI sync (upsert, reserve,
+release, settle) runs in the caller's transaction:
+
+    with engine.begin() as conn:
+        sync_industry_jobs(scope, esi, PgJobsRepo(conn), PgInventoryRepo(conn))
+
+Every set-based operation is a single statement over `unnest`ed array
+parameters, whatever the number of jobs. Material demand is expanded in SQL
+from `blueprints.materials` (manufacturing and reaction jobs only).
+
+`get_job_states` takes a per-owner advisory lock and row locks on the jobs
+it reads, so the diff and the writes that follow are atomic: an overlapping
+sync for the same owner waits for this transaction to commit and then sees
+the rows it wrote.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Mapping, Sequence
+
+from sqlalchemy import text
+
+from app.repos import Job, JobState, stored_job_status
+
+_UPSERT_JOBS = text(
+    """
+    INSERT INTO industry_jobs
+    (job_id, owner_scope, char_id, type_id, activity, runs, start_time, end_time,
+     status, location_id, facility_id, fees_isk)
+    SELECT s.job_id, s.owner_scope, s.char_id, s.type_id, CAST(s.activity AS job_activity),
+           s.runs, s.start_time, s.end_time, CAST(s.status AS job_status), s.location_id,
+           s.facility_id, s.fees_isk
+    FROM unnest(
+        CAST(:job_id AS bigint[]), CAST(:owner_scope AS text[]), CAST(:char_id AS bigint[]),
+        CAST(:type_id AS integer[]), CAST(:activity AS text[]), CAST(:runs AS integer[]),
+        CAST(:start_time AS timestamptz[]), CAST(:end_time AS timestamptz[]),
+        CAST(:status AS text[]), CAST(:location_id AS bigint[]), CAST(:facility_id AS bigint[]),
+        CAST(:fees_isk AS numeric[])
+    ) AS s(job_id, owner_scope, char_id, type_id, activity, runs, start_time, end_time,
+           status, location_id, facility_id, fees_isk)
+    ON CONFLICT (job_id) DO UPDATE SET
+        runs = EXCLUDED.runs,
+        end_time = EXCLUDED.end_time,
+        status = EXCLUDED.status,
+        location_id = EXCLUDED.location_id,
+        facility_id = EXCLUDED.facility_id,
+        fees_isk = EXCLUDED.fees_isk
+    """
+)
+
+# Row locks alone cannot cover jobs that do not exist yet: serialize syncs per owner
+_LOCK_OWNER = text("SELECT pg_advisory_xact_lock(hashtext(:owner))")
+
+_JOB_STATES = text(
+    """
+    SELECT job_id, CAST(status AS text), runs, end_time, location_id, facility_id, fees_isk
+    FROM industry_jobs
+    WHERE owner_scope = :owner AND job_id = any(:ids)
+    FOR UPDATE
+    """
+)
+
+# Aggregated material demand per (owner, material, location) for the jobs passed in
+_DEMAND = """
+    SELECT j.owner_scope,
+           CAST(coalesce(m->>'type_id', m->>'typeID') AS integer) AS type_id,
+           j.location_id,
+           sum(CAST(coalesce(m->>'qty', m->>'quantity', '0') AS numeric) * j.runs) AS qty
+    FROM unnest(
+        CAST(:owner_scope AS text[]), CAST(:type_id AS integer[]), CAST(:activity AS text[]),
+        CAST(:runs AS integer[]), CAST(:location_id AS bigint[])
+    ) AS j(owner_scope, bp_type_id, activity, runs, location_id)
+    JOIN blueprints b ON b.type_id = j.bp_type_id AND b.activity = j.activity
+    CROSS JOIN LATERAL json_array_elements(b.materials) AS m
+    GROUP BY 1, 2, 3
+"""
+
+_RESERVE = text(
+    f"""
+    INSERT INTO inventory_by_loc (owner_scope, type_id, location_id, qty_reserved)
+    SELECT d.owner_scope, d.type_id, d.location_id, d.qty FROM ({_DEMAND}) AS d
+    ON CONFLICT (owner_scope, type_id, location_id)
+    DO UPDATE SET qty_reserved = inventory_by_loc.qty_reserved + EXCLUDED.qty_reserved
+    """
+)
+
+_RELEASE = text(
+    f"""
+    UPDATE inventory_by_loc AS i
+    SET qty_reserved = greatest(0, i.qty_reserved - d.qty)
+    FROM ({_DEMAND}) AS d
+    WHERE i.owner_scope = d.owner_scope AND i.type_id = d.type_id AND i.location_id = d.location_id
+    """
+)
+
+# Products delivered per (owner, product, location): runs * blueprint output_qty
+_OUTPUTS = """
+    SELECT j.owner_scope, b.product_id AS type_id, j.location_id,
+           sum(j.runs * coalesce(b.output_qty, 1)) AS qty
+    FROM unnest(
+        CAST(:owner_scope AS text[]), CAST(:type_id AS integer[]), CAST(:activity AS text[]),
+        CAST(:runs AS integer[]), CAST(:location_id AS bigint[])
+    ) AS j(owner_scope, bp_type_id, activity, runs, location_id)
+    JOIN blueprints b ON b.type_id = j.bp_type_id AND b.activity = j.activity
+    GROUP BY 1, 2, 3
+"""
+
+# Outputs enter at the existing rolling-average cost (new rows start at 0)
+_SETTLE_INVENTORY = text(
+    f"""
+    INSERT INTO inventory (owner_scope, type_id, qty_on_hand)
+    SELECT o.owner_scope, o.type_id, sum(o.qty) FROM ({_OUTPUTS}) AS o GROUP BY 1, 2
+    ON CONFLICT (owner_scope, type_id)
+    DO UPDATE SET qty_on_hand = inventory.qty_on_hand + EXCLUDED.qty_on_hand
+    """
+)
+
+_SETTLE_BY_LOCATION = text(
+    f"""
+    INSERT INTO inventory_by_loc (owner_scope, type_id, location_id, qty_on_hand)
+    SELECT o.owner_scope, o.type_id, o.location_id, o.qty FROM ({_OUTPUTS}) AS o
+    ON CONFLICT (owner_scope, type_id, location_id)
+    DO UPDATE SET qty_on_hand = inventory_by_loc.qty_on_hand + EXCLUDED.qty_on_hand
+    """
+)
+
+
+def _job_params(jobs: Sequence[Job]) -> Dict[str, List]:
+    # Jobs without a location cannot hold stock in inventory_by_loc
+    located = [j for j in jobs if j.location_id is not None]
+    return {
+        "owner_scope": [j.owner_scope for j in located],
+        "type_id": [j.type_id for j in located],
+        "activity": [j.activity for j in located],
+        "runs": [j.runs for j in located],
+        "location_id": [j.location_id for j in located],
+    }
+
+
+class PgJobsRepo:
+    def __init__(self, conn) -> None:  # noqa: ANN001
+        self._conn = conn
+
+    def upsert_jobs(self, owner_scope: str, jobs: Sequence[Job]) -> None:
+        if not jobs:
+            return
+        self._conn.execute(
+            _UPSERT_JOBS,
+            {
+                "job_id": [j.job_id for j in jobs],
+                "owner_scope": [owner_scope for _ in jobs],
+                "char_id": [j.char_id for j in jobs],
+                "type_id": [j.type_id for j in jobs],
+                "activity": [j.activity for j in jobs],
+                "runs": [j.runs for j in jobs],
+                "start_time": [j.start_time for j in jobs],
+                "end_time": [j.end_time for j in jobs],
+                "status": [stored_job_status(j.status) for j in jobs],
+                "location_id": [j.location_id for j in jobs],
+                "facility_id": [j.facility_id for j in jobs],
+                "fees_isk": [j.fees_isk for j in jobs],
+            },
+        )
+
+    def get_job_states(self, owner_scope: str, job_ids: Sequence[int]) -> Mapping[int, JobState]:
+        if not job_ids:
+            return {}
+        self._conn.execute(_LOCK_OWNER, {"owner": owner_scope})
+        rows = self._conn.execute(
+            _JOB_STATES, {"owner": owner_scope, "ids": list(job_ids)}
+        ).fetchall()
+        return {
+            int(job_id): JobState(
+                status=str(status),
+                runs=int(runs),
+                end_time=end_time,
+                location_id=location_id,
+                facility_id=facility_id,
+                fees_isk=fees_isk,
+            )
+            for job_id, status, runs, end_time, location_id, facility_id, fees_isk in rows
+        }
+
+
+class PgInventoryRepo:
+    def __init__(self, conn) -> None:  # noqa: ANN001
+        self._conn = conn
+
+    def reserve_for_jobs(self, jobs: Sequence[Job]) -> None:
+        self._run(_RESERVE, jobs)
+
+    def release_for_jobs(self, jobs: Sequence[Job]) -> None:
+        self._run(_RELEASE, jobs)
+
+    def settle_outputs(self, jobs: Sequence[Job]) -> None:
+        self._run(_SETTLE_INVENTORY, jobs)
+        self._run(_SETTLE_BY_LOCATION, jobs)
+
+    # Single-job forms of the protocol
+    def reserve_for_job(self, job: Job) -> None:
+        self.reserve_for_jobs([job])
+
+    def release_for_job(self, job: Job) -> None:
+        self.release_for_jobs([job])
+
+    def settle_job_outputs(self, job: Job) -> None:
+        self.settle_outputs([job])
+
+    def _run(self, statement, jobs: Sequence[Job]) -> None:  # noqa: ANN001
+        params = _job_params(jobs)
+        if params["type_id"]:
+            self._conn.execute(statement, params)
+
+
+__all__ = ["PgInventoryRepo", "PgJobsRepo"]
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from decimal import Decimal
+from datetime import datetime, timedelta, timezone
+from decimal import ROUND_HALF_UP, Decimal
 import hashlib
+import math
 from typing import Any, Mapping, Sequence
 
 import redis
@@ -10,9 +12,28 @@ from redis.exceptions import RedisError
 import sqlalchemy as sa
 from sqlalchemy import text
 
-from app.config import Settings
 from app.cache import CacheClient, CacheRecord
-from app.math import BollingerBands, DepthPoint, DepthSummary, bollinger_bands, moving_average, shallow_depth_metrics, simple_volatility, spp_lead_time_aware, PricePolicy
+from app.cache_fill import get_revalidator, read_through
+from app.cache_local import get_local_cache
+from app.config import Settings
+from app.db import get_engine
+from app.dependencies import get_settings
+from app.math import (
+    BollingerBands,
+    DepthForecast,
+    DepthPoint,
+    DepthSummary,
+    PricePolicy,
+    bollinger_bands,
+    moving_average,
+    rolling_indicators,
+    rolling_indicators_many,
+    shallow_depth_metrics,
+    simple_volatility,
+    spp_grid,
+    spp_lead_time_aware,
+)
+from app.redis_pool import get_redis
 
 
 @dataclass(frozen=True)
@@ -24,11 +45,12 @@ class IndicatorResult:
 
 
 def _get_engine(settings: Settings) -> sa.Engine:
-    return sa.create_engine(settings.database_url)
+    return get_engine(settings)
 
 
 def _get_redis(settings: Settings) -> redis.Redis:
-    return redis.from_url(settings.redis_url, decode_responses=True)
+    # Raw-bytes client so CacheClient writes the compact binary envelope
+    return get_redis(settings, decode_responses=False)
 
 
 def _fetch_price_series(conn, region_id: int, type_id: int, limit: int) -> Sequence[Decimal]:
@@ -48,56 +70,106 @@ def _fetch_price_series(conn, region_id: int, type_id: int, limit: int) -> Seque
     return [Decimal(str(r[0])) for r in reversed(rows)]
 
 
+def _synthetic_depth(last_price: Decimal) -> DepthSummary:
+    return shallow_depth_metrics(
+        [
+            DepthPoint(price=last_price, quantity=Decimal("10")),
+            DepthPoint(price=last_price * Decimal("1.005"), quantity=Decimal("5")),
+        ]
+    )
+
+
+def _indicator_payload(result: IndicatorResult) -> dict[str, Any]:
+    # Decimals stay native: the binary envelope keeps them, JSON stringifies them
+    bands = result.bollinger
+    return {
+        "ma": result.ma,
+        "bollinger": {"middle": bands.middle, "upper": bands.upper, "lower": bands.lower},
+        "volatility": result.volatility,
+        "depth": {
+            "total_quantity": result.depth.total_quantity,
+            "volume_weighted_price": result.depth.volume_weighted_price,
+        },
+    }
+
+
+def _as_decimal(value: Any) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
 def _safe_cache() -> CacheClient | None:
-    settings = Settings()
+    settings = get_settings()
     try:
         rc = _get_redis(settings)
     except RedisError:
         return None
     except OSError:
         return None
-    return CacheClient(rc)
+    return CacheClient(rc, local=get_local_cache())
+
+
+def _read_through(
+    settings: Settings,
+    cache: CacheClient | None,
+    key: str,
+    cached: CacheRecord | None,
+    **accessors: Any,
+) -> Mapping[str, Any]:
+    # Stale-while-revalidate plus single-flight fills (see app.cache_fill)
+    return read_through(
+        cache,
+        key,
+        cached,
+        refresh_ahead=settings.cache_refresh_ahead,
+        serve_stale_for=settings.cache_serve_stale_for,
+        lock_ttl=settings.cache_fill_lock_ttl,
+        wait_timeout=settings.cache_fill_wait_timeout,
+        revalidator=get_revalidator(),
+        **accessors,
+    )
 
 
-def _cache_get_indicator(cache: CacheClient | None, region_id: int, type_id: int) -> CacheRecord | None:
+def _cache_get_indicator(
+    cache: CacheClient | None, region_id: int, type_id: int, window: int
+) -> CacheRecord | None:
     if cache is None:
         return None
     try:
-        return cache.get_indicator(region_id, type_id)
+        return cache.get_indicator(region_id, type_id, window)
     except (RedisError, OSError):
         return None
 
 
-def _cache_set_indicator(cache: CacheClient | None, region_id: int, type_id: int, payload: Mapping[str, Any]) -> None:
+def _cache_set_indicator(
+    cache: CacheClient | None, region_id: int, type_id: int, window: int, payload: Mapping[str, Any]
+) -> None:
     if cache is None:
         return
     try:
-        cache.set_indicator(region_id, type_id, payload)
+        cache.set_indicator(region_id, type_id, window, payload)
     except (RedisError, OSError):
         return
 
 
-def indicators(type_id: int, region_id: int, window: int) -> IndicatorResult:
-    settings = Settings()
-    cache = _safe_cache()
-    # Try cache first
-    cached = _cache_get_indicator(cache, region_id, type_id)
-    if cached and not cached.stale:
-        v = cached.value
-        return IndicatorResult(
-            ma=Decimal(str(v["ma"])),
-            bollinger=BollingerBands(
-                middle=Decimal(str(v["bollinger"]["middle"])),
-                upper=Decimal(str(v["bollinger"]["upper"])),
-                lower=Decimal(str(v["bollinger"]["lower"])),
-            ),
-            volatility=Decimal(str(v["volatility"])),
-            depth=DepthSummary(
-                total_quantity=Decimal(str(v["depth"]["total_quantity"])),
-                volume_weighted_price=Decimal(str(v["depth"]["volume_weighted_price"])),
-            ),
-        )
+def _indicator_from_payload(v: Mapping[str, Any]) -> IndicatorResult:
+    return IndicatorResult(
+        ma=_as_decimal(v["ma"]),
+        bollinger=BollingerBands(
+            middle=_as_decimal(v["bollinger"]["middle"]),
+            upper=_as_decimal(v["bollinger"]["upper"]),
+            lower=_as_decimal(v["bollinger"]["lower"]),
+        ),
+        volatility=_as_decimal(v["volatility"]),
+        depth=DepthSummary(
+            total_quantity=_as_decimal(v["depth"]["total_quantity"]),
+            volume_weighted_price=_as_decimal(v["depth"]["volume_weighted_price"]),
+        ),
+    )
+
 
+def _compute_indicator(
+    settings: Settings, type_id: int, region_id: int, window: int
+) -> IndicatorResult:
     try:
         engine = _get_engine(settings)
         with engine.connect() as conn:
@@ -108,29 +180,181 @@ def indicators(type_id: int, region_id: int, window: int) -> IndicatorResult:
     if not series:
         # Fallback: synthetic
         series = [Decimal("100"), Decimal("101"), Decimal("102"), Decimal("101"), Decimal("103")]
+    return _indicator_from_series(series, window)
+
+
+def _indicator_from_series(series: Sequence[Decimal], window: int) -> IndicatorResult:
     w = min(window, len(series))
     ma = moving_average(series, w)
     vol = simple_volatility(series, w)
     bands = bollinger_bands(series, w, k=Decimal("2"))
-    depth = shallow_depth_metrics(
-        [DepthPoint(price=series[-1], quantity=Decimal("10")), DepthPoint(price=series[-1] * Decimal("1.005"), quantity=Decimal("5"))]
-    )
-    # Write to cache
-    _cache_set_indicator(
+    depth = _synthetic_depth(series[-1])
+    return IndicatorResult(ma=ma, bollinger=bands, volatility=vol, depth=depth)
+
+
+def indicators(type_id: int, region_id: int, window: int) -> IndicatorResult:
+    settings = get_settings()
+    cache = _safe_cache()
+    # Try cache first
+    cached = _cache_get_indicator(cache, region_id, type_id, window)
+    payload = _read_through(
+        settings,
         cache,
-        region_id,
-        type_id,
-        {
-            "ma": str(ma),
-            "bollinger": {"middle": str(bands.middle), "upper": str(bands.upper), "lower": str(bands.lower)},
-            "volatility": str(vol),
-            "depth": {
-                "total_quantity": str(depth.total_quantity),
-                "volume_weighted_price": str(depth.volume_weighted_price),
-            },
-        },
+        f"indicator:{region_id}:{type_id}:{window}",
+        cached,
+        compute=lambda: _indicator_payload(
+            _compute_indicator(settings, type_id, region_id, window)
+        ),
+        read=lambda: _cache_get_indicator(cache, region_id, type_id, window),
+        write=lambda p: _cache_set_indicator(cache, region_id, type_id, window, p),
     )
-    return IndicatorResult(ma=ma, bollinger=bands, volatility=vol, depth=depth)
+    return _indicator_from_payload(payload)
+
+
+def _fetch_recent_series(
+    conn, limit: int, since: datetime
+) -> dict[tuple[int, int], list[Decimal]]:
+    """Return the latest `limit` ask prices for every (region_id, type_id), chronologically.
+
+    Only snapshots taken at or after `since` are ranked, so the window
+    function never scans the whole history.
+    """
+
+    rows = conn.execute(
+        text(
+            """
+            SELECT region_id, type_id, best_px
+            FROM (
+                SELECT region_id, type_id, ts, best_px,
+                       row_number() OVER (PARTITION BY region_id, type_id ORDER BY ts DESC) AS rn
+                FROM orderbook_snapshots
+                WHERE side = 'ask' AND ts >= :since
+            ) recent
+            WHERE rn <= :lim
+            ORDER BY region_id, type_id, ts
+            """
+        ),
+        {"lim": limit, "since": since},
+    )
+    out: dict[tuple[int, int], list[Decimal]] = {}
+    for region_id, type_id, px in rows:
+        out.setdefault((int(region_id), int(type_id)), []).append(Decimal(str(px)))
+    return out
+
+
+def _quantized(value: float) -> Decimal:
+    return Decimal(repr(float(value))).quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP)
+
+
+def _near_rounding_tie(*values: float) -> bool:
+    """True when float error could flip ROUND_HALF_UP at 0.0001 for any value.
+
+    The tolerance grows with magnitude, so large ISK prices whose float form
+    cannot resolve four places always count as ties.
+    """
+
+    for value in values:
+        scaled = abs(float(value)) * 10_000
+        if abs(scaled - math.floor(scaled) - 0.5) <= 1e-6 + scaled * 1e-12:
+            return True
+    return False
+
+
+def compute_indicators_bulk(
+    series_by_key: Mapping[tuple[int, int], Sequence[Decimal]], window: int
+) -> dict[tuple[int, int], IndicatorResult]:
+    """Latest-value indicators for many series via the NumPy rolling engine.
+
+    Mirrors `indicators()`: series shorter than `window` use their full length;
+    series with fewer than two points are skipped. Values within float error
+    of a rounding tie are recomputed with the Decimal functions, so cached
+    entries always equal what `indicators()` computes on a miss.
+    """
+
+    groups: dict[int, dict[tuple[int, int], Sequence[Decimal]]] = {}
+    for key, series in series_by_key.items():
+        w = min(window, len(series))
+        if w >= 2:
+            groups.setdefault(w, {})[key] = series
+    out: dict[tuple[int, int], IndicatorResult] = {}
+    for w, group in groups.items():
+        for key, rolled in rolling_indicators_many(group, w, k=2.0).items():
+            if _near_rounding_tie(rolled.ma[-1], rolled.stdev[-1]):
+                out[key] = _indicator_from_series(group[key], w)
+                continue
+            ma = _quantized(rolled.ma[-1])
+            vol = _quantized(rolled.stdev[-1])
+            # Bands follow `bollinger_bands`: derived from the rounded middle/stdev
+            band = vol * Decimal("2")
+            out[key] = IndicatorResult(
+                ma=ma,
+                bollinger=BollingerBands(
+                    middle=ma,
+                    upper=(ma + band).quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP),
+                    lower=(ma - band).quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP),
+                ),
+                volatility=vol,
+                depth=_synthetic_depth(group[key][-1]),
+            )
+    return out
+
+
+def precompute_indicators(window: int | None = None, chunk_size: int = 500) -> int:
+    """Recompute indicators for every tracked (region_id, type_id) into the cache.
+
+    Entries are keyed by `window`, so only API reads with the same window are
+    served from the precompute; other windows fill their own keys on demand.
+
+    One windowed query loads all recent series, indicators are computed in batch,
+    and cache writes go out in pipelined chunks via `CacheClient.set_indicators`.
+    Returns the number of series written.
+    """
+
+    settings = get_settings()
+    window = window or settings.indicators_window
+    since = datetime.now(timezone.utc) - timedelta(days=settings.indicators_lookback_days)
+    engine = _get_engine(settings)
+    with engine.connect() as conn:
+        series_by_key = _fetch_recent_series(conn, window, since)
+    results = compute_indicators_bulk(series_by_key, window)
+    if not results:
+        return 0
+    cache = CacheClient(_get_redis(settings), local=get_local_cache())
+    items = list(results.items())
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start : start + chunk_size]
+        cache.set_indicators({key: _indicator_payload(result) for key, result in chunk}, window)
+    return len(results)
+
+
+def _float_or_none(values) -> list[float | None]:  # noqa: ANN001
+    return [None if math.isnan(v) else float(v) for v in values]
+
+
+def indicator_series(
+    type_id: int, region_id: int, window: int, points: int
+) -> dict[str, list[float | None]]:
+    """Return the last `points` ask prices with rolling MA/stdev/Bollinger series for charting.
+
+    Computed in one pass by the NumPy rolling engine; warm-up positions are None.
+    """
+
+    settings = get_settings()
+    try:
+        engine = _get_engine(settings)
+        with engine.connect() as conn:
+            series = _fetch_price_series(conn, region_id, type_id, points + window - 1)
+    except Exception:
+        series = []
+    rolled = rolling_indicators(series, window, k=2.0)
+    tail = slice(max(0, len(series) - points), None)
+    return {
+        "price": [float(v) for v in series[tail]],
+        "ma": _float_or_none(rolled.ma[tail]),
+        "stdev": _float_or_none(rolled.stdev[tail]),
+        "upper": _float_or_none(rolled.upper[tail]),
+        "lower": _float_or_none(rolled.lower[tail]),
+    }
 
 
 def spp_plus(
@@ -140,21 +364,63 @@ def spp_plus(
     horizon_days: Decimal,
     batch_options: Sequence[int] | None = None,
 ) -> dict:
-    settings = Settings()
+    settings = get_settings()
     cache = _safe_cache()
     batch_options_seq = tuple(int(opt) for opt in (batch_options or (1, 2, 3)))
     batch_hash = hashlib.sha256(",".join(map(str, batch_options_seq)).encode()).hexdigest()
     # Key params hash (simple)
     key_hash = f"{type_id}:{region_id}:{lead_time_days}:{horizon_days}:{batch_hash}"
-    cached = None
-    if cache is not None:
-        try:
-            cached = cache.get_spp(type_id, region_id, key_hash)
-        except (RedisError, OSError):
-            cached = None
-    if cached and not cached.stale:
-        return cached.value  # already JSON-serializable strings
+    cached = _cache_get_spp(cache, type_id, region_id, key_hash)
+    # Cached payloads are already JSON-serializable strings
+    return dict(
+        _read_through(
+            settings,
+            cache,
+            f"spp:{type_id}:{region_id}:{key_hash}",
+            cached,
+            compute=lambda: _compute_spp(
+                settings, type_id, region_id, lead_time_days, horizon_days, batch_options_seq
+            ),
+            read=lambda: _cache_get_spp(cache, type_id, region_id, key_hash),
+            write=lambda p: _cache_set_spp(cache, type_id, region_id, key_hash, p),
+        )
+    )
+
+
+def _cache_get_spp(
+    cache: CacheClient | None, type_id: int, region_id: int, key_hash: str
+) -> CacheRecord | None:
+    if cache is None:
+        return None
+    try:
+        return cache.get_spp(type_id, region_id, key_hash)
+    except (RedisError, OSError):
+        return None
 
+
+def _cache_set_spp(
+    cache: CacheClient | None,
+    type_id: int,
+    region_id: int,
+    key_hash: str,
+    payload: Mapping[str, Any],
+) -> None:
+    if cache is None:
+        return
+    try:
+        cache.set_spp(type_id, region_id, key_hash, payload)
+    except (RedisError, OSError):
+        return
+
+
+def _compute_spp(
+    settings: Settings,
+    type_id: int,
+    region_id: int,
+    lead_time_days: Decimal,
+    horizon_days: Decimal,
+    batch_options_seq: tuple[int, ...],
+) -> dict:
     series: list[Decimal] = []
     try:
         engine = _get_engine(settings)
@@ -165,28 +431,112 @@ def spp_plus(
     if not series:
         series = [Decimal("100"), Decimal("101"), Decimal("102"), Decimal("101"), Decimal("103")]
 
-    def dv_forecast_fn(_now):
-        from indy_math.spp import DepthForecast
-
-        # crude deterministic placeholders
-        return DepthForecast(expected_daily_demand=Decimal("10"), expected_new_listings=Decimal("2"))
-
     result = spp_lead_time_aware(
         depth_ahead_now=0,
-        dv_forecast_fn=dv_forecast_fn,
+        dv_forecast_fn=_spp_forecast,
         lead_time_days=lead_time_days,
         horizon_days=horizon_days,
         price_best_now=series[-1],
-        drift_rate=Decimal("0"),
-        price_policy=PricePolicy(listing_markup=Decimal("0.02"), minimum_spread=Decimal("0.03")),
-        spread_at_list=Decimal("0.03"),
-        vol_stdev_at_list=Decimal("0.05"),
         batch_options=batch_options_seq,
+        **_SPP_MARKET,
     )
-    out = {"spp": str(result.spp), "recommended_batch": result.recommended_batch, "diagnostics": result.diagnostics.__dict__}
-    if cache is not None:
-        try:
-            cache.set_spp(type_id, region_id, key_hash, out)
-        except (RedisError, OSError):
-            pass
-    return out
+    return {
+        "spp": str(result.spp),
+        "recommended_batch": result.recommended_batch,
+        "diagnostics": result.diagnostics.__dict__,
+    }
+
+
+def _spp_forecast(_now):  # noqa: ANN001
+    # crude deterministic placeholders
+    return DepthForecast(expected_daily_demand=Decimal("10"), expected_new_listings=Decimal("2"))
+
+
+# Market assumptions shared by the single and grid SPP⁺ endpoints
+_SPP_MARKET: dict[str, Any] = {
+    "drift_rate": Decimal("0"),
+    "price_policy": PricePolicy(listing_markup=Decimal("0.02"), minimum_spread=Decimal("0.03")),
+    "spread_at_list": Decimal("0.03"),
+    "vol_stdev_at_list": Decimal("0.05"),
+}
+
+
+def spp_plus_grid(
+    type_id: int,
+    region_id: int,
+    lead_time_days: Sequence[Decimal],
+    horizon_days: Sequence[Decimal],
+    batch_options: Sequence[int] | None = None,
+) -> dict:
+    """SPP⁺ for every lead time x horizon pair, cached as one entry per grid.
+
+    Matrices are indexed `[lead][horizon]` in the order the axes were given.
+    """
+
+    settings = get_settings()
+    cache = _safe_cache()
+    # Canonical axes, so `1` and `1.0` share one cache entry and one echoed label
+    lead_time_days = [_as_decimal(v).normalize() for v in lead_time_days]
+    horizon_days = [_as_decimal(v).normalize() for v in horizon_days]
+    batch_options_seq = tuple(int(opt) for opt in (batch_options or (1, 2, 3)))
+    params = "|".join(
+        (
+            ",".join(map(_axis_label, lead_time_days)),
+            ",".join(map(_axis_label, horizon_days)),
+            ",".join(map(str, batch_options_seq)),
+        )
+    )
+    key_hash = f"grid:{hashlib.sha256(params.encode()).hexdigest()}"
+    cached = _cache_get_spp(cache, type_id, region_id, key_hash)
+    return dict(
+        _read_through(
+            settings,
+            cache,
+            f"spp:{type_id}:{region_id}:{key_hash}",
+            cached,
+            compute=lambda: _compute_spp_grid(lead_time_days, horizon_days, batch_options_seq),
+            read=lambda: _cache_get_spp(cache, type_id, region_id, key_hash),
+            write=lambda p: _cache_set_spp(cache, type_id, region_id, key_hash, p),
+        )
+    )
+
+
+def _axis_label(value: Decimal) -> str:
+    # Fixed-point so normalized values like 1E+1 still read as 10
+    return format(value, "f")
+
+
+def _compute_spp_grid(
+    lead_time_days: Sequence[Decimal],
+    horizon_days: Sequence[Decimal],
+    batch_options_seq: tuple[int, ...],
+) -> dict:
+    grid = spp_grid(
+        depth_ahead_now=0,
+        dv_forecast_fn=_spp_forecast,
+        lead_time_days=lead_time_days,
+        horizon_days=horizon_days,
+        batch_options=batch_options_seq,
+        **_SPP_MARKET,
+    )
+
+    def fixed(values) -> list[list[str]]:  # noqa: ANN001
+        return [[f"{v:.4f}" for v in row] for row in values.tolist()]
+
+    return {
+        "lead_time_days": [_axis_label(v) for v in lead_time_days],
+        "horizon_days": [_axis_label(v) for v in horizon_days],
+        "batch_options": list(batch_options_seq),
+        "spp": fixed(grid.spp),
+        "recommended_batch": grid.recommended_batch.tolist(),
+        "diagnostics": {
+            name: fixed(getattr(grid, name))
+            for name in (
+                "queue_at_listing",
+                "demand_over_horizon",
+                "drift_adjustment",
+                "spread_adjustment",
+                "volatility_adjustment",
+            )
+        },
+    }
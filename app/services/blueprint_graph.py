@@ -0,0 +1,190 @@
+"""Process-resident blueprint graph loaded once from the `blueprints` table.
+
+Blueprint data only changes when the SDE is reloaded, so BOM traversal reads
+from an immutable in-memory index instead of querying Postgres per node. The
+index is rebuilt lazily whenever an SDE load rewrites the manifest at
+`settings.sde_manifest_path` (detected via its mtime/size, checked at most every
+`sde_manifest_check_seconds`) or after an explicit `invalidate_blueprint_graph()`.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from array import array
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, Mapping, Tuple
+
+from sqlalchemy import text
+
+from app.db import get_engine
+from app.dependencies import get_settings
+
+
+class BlueprintRecord:
+    """Compact blueprint entry; material ids/quantities are parallel int arrays."""
+
+    __slots__ = ("type_id", "product_id", "activity", "output_qty", "material_ids", "material_qtys")
+
+    def __init__(
+        self,
+        type_id: int,
+        product_id: int,
+        activity: str,
+        output_qty: int,
+        material_ids: Iterable[int],
+        material_qtys: Iterable[int],
+    ) -> None:
+        self.type_id = type_id
+        self.product_id = product_id
+        self.activity = activity
+        self.output_qty = output_qty
+        self.material_ids = array("q", material_ids)
+        self.material_qtys = array("q", material_qtys)
+
+    @classmethod
+    def from_row(  # noqa: ANN001
+        cls, type_id, product_id, activity, materials, output_qty
+    ) -> "BlueprintRecord":
+        ids: List[int] = []
+        qtys: List[int] = []
+        for m in materials or []:
+            mid = m.get("type_id") or m.get("typeID")
+            if not mid:
+                continue
+            ids.append(int(mid))
+            qtys.append(int(m.get("qty") or m.get("quantity") or 0))
+        return cls(
+            type_id=int(type_id),
+            product_id=int(product_id),
+            activity=str(activity),
+            output_qty=int(output_qty or 1),
+            material_ids=ids,
+            material_qtys=qtys,
+        )
+
+    def iter_materials(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.material_ids, self.material_qtys, strict=False)
+
+    @property
+    def materials(self) -> List[dict]:
+        return [{"type_id": t, "qty": q} for t, q in self.iter_materials()]
+
+
+class BlueprintGraph:
+    """Immutable product_id -> BlueprintRecord index with a topological order.
+
+    `topo_order` lists product_ids so that every buildable material appears
+    before the products that consume it. Products caught in a cycle (bad SDE
+    data) are appended at the end in product_id order.
+    """
+
+    __slots__ = ("_records", "topo_order", "signature")
+
+    def __init__(self, records: Iterable[BlueprintRecord], signature: object = None) -> None:
+        by_product: Dict[int, BlueprintRecord] = {}
+        for rec in records:
+            by_product.setdefault(rec.product_id, rec)
+        self._records: Mapping[int, BlueprintRecord] = MappingProxyType(by_product)
+        self.topo_order: Tuple[int, ...] = _topological_order(by_product)
+        self.signature = signature
+
+    def get(self, product_id: int) -> BlueprintRecord | None:
+        return self._records.get(product_id)
+
+    def __contains__(self, product_id: object) -> bool:
+        return product_id in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+def _topological_order(records: Mapping[int, BlueprintRecord]) -> Tuple[int, ...]:
+    # Kahn's algorithm over product -> buildable-material edges
+    pending: Dict[int, int] = {}
+    consumers: Dict[int, List[int]] = {}
+    for pid in sorted(records):
+        deps = {m for m in records[pid].material_ids if m in records and m != pid}
+        pending[pid] = len(deps)
+        for dep in deps:
+            consumers.setdefault(dep, []).append(pid)
+    ready = [pid for pid, n in pending.items() if n == 0]
+    order: List[int] = []
+    while ready:
+        pid = ready.pop()
+        order.append(pid)
+        for consumer in consumers.get(pid, ()):
+            pending[consumer] -= 1
+            if pending[consumer] == 0:
+                ready.append(consumer)
+    if len(order) < len(records):
+        seen = set(order)
+        order.extend(pid for pid in sorted(records) if pid not in seen)
+    return tuple(order)
+
+
+def _engine():
+    return get_engine()
+
+
+def _manifest_signature(path: str) -> Tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def load_blueprint_graph(conn, signature: object = None) -> BlueprintGraph:  # noqa: ANN001
+    rows = conn.execute(
+        text(
+            """
+            select distinct on (product_id)
+                type_id, product_id, activity, materials, coalesce(output_qty, 1)
+            from blueprints
+            order by product_id, type_id
+            """
+        )
+    )
+    return BlueprintGraph((BlueprintRecord.from_row(*row) for row in rows), signature=signature)
+
+
+_GRAPH: BlueprintGraph | None = None
+_CHECKED_AT = 0.0
+_LOCK = threading.Lock()
+
+
+def get_blueprint_graph() -> BlueprintGraph:
+    """Return the shared graph, reloading it if the SDE manifest changed."""
+
+    global _GRAPH, _CHECKED_AT
+    settings = get_settings()
+    now = time.monotonic()
+    graph = _GRAPH
+    if graph is not None and now - _CHECKED_AT < settings.sde_manifest_check_seconds:
+        return graph
+    signature = _manifest_signature(settings.sde_manifest_path)
+    _CHECKED_AT = now
+    if graph is not None and graph.signature == signature:
+        return graph
+    with _LOCK:
+        if _GRAPH is None or _GRAPH.signature != signature:
+            with _engine().connect() as conn:
+                _GRAPH = load_blueprint_graph(conn, signature=signature)
+        return _GRAPH
+
+
+def invalidate_blueprint_graph() -> None:
+    global _GRAPH
+    with _LOCK:
+        _GRAPH = None
+
+
+__all__ = [
+    "BlueprintGraph",
+    "BlueprintRecord",
+    "get_blueprint_graph",
+    "invalidate_blueprint_graph",
+    "load_blueprint_graph",
+]
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import List
 
-import sqlalchemy as sa
 from sqlalchemy import text
 
-from app.config import Settings
+from app.db import get_engine
+from app.services.blueprint_graph import get_blueprint_graph
 
 
 @dataclass
@@ -19,7 +19,7 @@ class BOMNode:
 
 
 def _engine():
-    return sa.create_engine(Settings().database_url)
+    return get_engine()
 
 
 def search_products(query: str, limit: int = 20) -> List[dict]:
@@ -29,38 +29,29 @@ def search_products(query: str, limit: int = 20) -> List[dict]:
     return [{"type_id": int(r[0]), "name": r[1]} for r in rows]
 
 
-def _blueprint_for_product(conn, product_id: int) -> dict | None:
-    row = conn.execute(text("select type_id, product_id, activity, materials from blueprints where product_id=:p limit 1"), {"p": product_id}).fetchone()
-    if not row:
-        return None
-    return {"type_id": int(row[0]), "product_id": int(row[1]), "activity": row[2], "materials": row[3]}
-
-
 def build_bom_tree(product_id: int, max_depth: int = 4) -> BOMNode | None:
-    with _engine().connect() as conn:
-        bp = _blueprint_for_product(conn, product_id)
-        if not bp:
-            return None
-
-        def rec(pid: int, depth: int) -> BOMNode | None:
-            data = _blueprint_for_product(conn, pid)
-            if not data:
-                return None
-            children: List[BOMNode] = []
-            if depth < max_depth:
-                for m in data["materials"]:
-                    mid = int(m.get("type_id") or 0)
-                    if mid:
-                        child = rec(mid, depth + 1)
-                        if child:
-                            children.append(child)
-            return BOMNode(
-                type_id=int(data["type_id"]),
-                product_id=int(data["product_id"]),
-                activity=str(data["activity"]),
-                materials=list(data["materials"]),
-                children=children,
-            )
+    """Build the BOM tree for a product from the in-memory blueprint graph."""
 
-        return rec(product_id, 0)
+    graph = get_blueprint_graph()
+    if product_id not in graph:
+        return None
 
+    def rec(pid: int, depth: int) -> BOMNode | None:
+        data = graph.get(pid)
+        if not data:
+            return None
+        children: List[BOMNode] = []
+        if depth < max_depth:
+            for mid in data.material_ids:
+                child = rec(mid, depth + 1)
+                if child:
+                    children.append(child)
+        return BOMNode(
+            type_id=data.type_id,
+            product_id=data.product_id,
+            activity=data.activity,
+            materials=data.materials,
+            children=children,
+        )
+
+    return rec(product_id, 0)
@@ -3,18 +3,19 @@ from __future__ import annotations
 from dataclasses import dataclass
 from decimal import Decimal
 from math import ceil
-from typing import List, Tuple
+from typing import Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
 
-import sqlalchemy as sa
 from sqlalchemy import text
 
-from app.config import Settings
-from app.services.bom import build_bom_tree
+from app.db import get_engine
+from app.services.blueprint_graph import BlueprintGraph, get_blueprint_graph
 from app.services.inventory import get_on_hand
 
+MAX_DEPTH = 4
+
 
 def _engine():
-    return sa.create_engine(Settings().database_url)
+    return get_engine()
 
 
 def _to_decimal(value: object) -> Decimal | None:
@@ -25,32 +26,36 @@ def _to_decimal(value: object) -> Decimal | None:
     return Decimal(str(value))
 
 
-def _latest_mid(conn, region_id: int, type_id: int) -> Decimal | None:
-    row = conn.execute(
+def _latest_mids(conn, region_id: int, type_ids: Iterable[int]) -> Dict[int, Decimal]:
+    """Return latest (bid+ask)/2 per type_id using a single `distinct on` query.
+
+    Types without both a latest bid and ask are omitted.
+    """
+
+    ids = sorted({int(t) for t in type_ids})
+    if not ids:
+        return {}
+    rows = conn.execute(
         text(
             """
-            with latest as (
-                select distinct on (type_id, side) type_id, side, ts, best_px
-                from orderbook_snapshots
-                where region_id=:r and type_id=:t
-                order by type_id, side, ts desc
-            )
-            select (select best_px from latest where side='bid') as bid,
-                   (select best_px from latest where side='ask') as ask
+            select distinct on (type_id, side) type_id, side, best_px
+            from orderbook_snapshots
+            where region_id = :r and type_id = any(:ids)
+            order by type_id, side, ts desc
             """
         ),
-        {"r": region_id, "t": type_id},
-    ).fetchone()
-    if not row:
-        return None
-    bid, ask = row
-    if bid is None or ask is None:
-        return None
-    bid_dec = _to_decimal(bid)
-    ask_dec = _to_decimal(ask)
-    if bid_dec is None or ask_dec is None:
-        return None
-    return (bid_dec + ask_dec) / Decimal(2)
+        {"r": region_id, "ids": ids},
+    ).fetchall()
+    sides: Dict[int, Dict[str, Decimal | None]] = {}
+    for type_id, side, best_px in rows:
+        sides.setdefault(int(type_id), {})[str(side)] = _to_decimal(best_px)
+    out: Dict[int, Decimal] = {}
+    for type_id, px in sides.items():
+        bid, ask = px.get("bid"), px.get("ask")
+        if bid is None or ask is None:
+            continue
+        out[type_id] = (bid + ask) / Decimal(2)
+    return out
 
 
 @dataclass
@@ -69,93 +74,200 @@ class CostSummary:
     total_cost: Decimal
 
 
+@dataclass(frozen=True)
+class CostRequest:
+    product_id: int
+    runs: int = 1
+    me_bonus: float = 0.0
+
+
+LeafDemand = Tuple[int, int]
+
+
+def _leaf_demands(
+    graph: BlueprintGraph,
+    type_id: int,
+    qty: int,
+    depth: int,
+    me: float,
+    memo: Dict[tuple, Tuple[LeafDemand, ...]],
+) -> Tuple[LeafDemand, ...]:
+    """Expand one material into its purchasable leaves, in depth-first order.
+
+    `memo` is keyed by (type_id, qty, depth, me) so identical sub-assemblies are
+    expanded once, whether they repeat within one BOM or across a batch.
+    """
+
+    key = (type_id, qty, depth, me)
+    cached = memo.get(key)
+    if cached is not None:
+        return cached
+    bp = graph.get(type_id) if depth < MAX_DEPTH else None
+    if bp is None:
+        out: Tuple[LeafDemand, ...] = ((type_id, qty),)
+    else:
+        runs_required = max(1, ceil(qty / max(1, bp.output_qty)))
+        parts: List[LeafDemand] = []
+        for mid, mqty in bp.iter_materials():
+            adj = ceil(mqty * (1 - me))
+            parts.extend(_leaf_demands(graph, mid, adj * runs_required, depth + 1, me, memo))
+        out = tuple(parts)
+    memo[key] = out
+    return out
+
+
+def _product_leaves(
+    graph: BlueprintGraph,
+    product_id: int,
+    runs: int,
+    me_bonus: float,
+    memo: Dict[tuple, Tuple[LeafDemand, ...]],
+) -> List[LeafDemand] | None:
+    root = graph.get(product_id)
+    if root is None:
+        return None
+    me = max(0.0, min(0.5, me_bonus))
+    leaves: List[LeafDemand] = []
+    for mid, mqty in root.iter_materials():
+        adj = ceil(mqty * (1 - me))
+        leaves.extend(_leaf_demands(graph, mid, adj * runs, 0, me, memo))
+    return leaves
+
+
+def _leaf_lines(
+    t_id: int,
+    qty: int,
+    prices: Mapping[int, Decimal],
+    on_hand: Mapping[int, Mapping[str, Decimal]],
+    on_hand_left: Dict[int, Decimal] | None,
+) -> List[CostLine]:
+    # Policy: use RA for on-hand up to available; price only deficits via spot.
+    # `on_hand_left` tracks what earlier leaves of the same product consumed.
+    lines: List[CostLine] = []
+    remaining = qty
+    if on_hand_left is not None and t_id in on_hand:
+        available_qty = on_hand_left.get(t_id, on_hand[t_id]["qty"])
+        if available_qty > 0:
+            use = min(int(available_qty), remaining)
+            if use > 0:
+                ra = on_hand[t_id]["avg_cost"]
+                use_dec = Decimal(use)
+                lines.append(CostLine(type_id=t_id, qty=use, unit_price=ra, cost=ra * use_dec))
+                remaining -= use
+                on_hand_left[t_id] = available_qty - use_dec
+    if remaining > 0:
+        price = prices.get(t_id) or Decimal("0")
+        remaining_dec = Decimal(remaining)
+        lines.append(
+            CostLine(type_id=t_id, qty=remaining, unit_price=price, cost=price * remaining_dec)
+        )
+    return lines
+
+
+def _summarize(
+    product_id: int,
+    runs: int,
+    leaves: Sequence[LeafDemand],
+    prices: Mapping[int, Decimal],
+    on_hand: Mapping[int, Mapping[str, Decimal]],
+    use_inventory: bool,
+) -> CostSummary:
+    on_hand_left: Dict[int, Decimal] | None = {} if use_inventory else None
+    lines: List[CostLine] = []
+    for t_id, qty in leaves:
+        lines.extend(_leaf_lines(t_id, qty, prices, on_hand, on_hand_left))
+    total = sum((line.cost for line in lines), Decimal("0"))
+    return CostSummary(product_id=product_id, runs=runs, lines=lines, total_cost=total)
+
+
 def cost_product(product_id: int, *, region_id: int, runs: int = 1, me_bonus: float = 0.0, owner_scope: str | None = None) -> CostSummary | None:
     """Compute a simple material cost for a product using latest mid prices and ME bonus.
 
     This is a pragmatic costing that multiplies material quantities by (1 - me_bonus),
     applies ceil per-run integers, and sums using latest mid from orderbook_snapshots.
+
+    The BOM is expanded against the in-memory blueprint graph and all leaves are
+    priced with a single quote query.
     """
-    tree = build_bom_tree(product_id, max_depth=1)  # seed for top-level materials
-    if not tree:
+    graph = get_blueprint_graph()
+    leaves = _product_leaves(graph, product_id, runs, me_bonus, {})
+    if leaves is None:
         return None
-    me = max(0.0, min(0.5, me_bonus))
-    engine = _engine()
-    lines: List[CostLine] = []
-    def _blueprint_for_product(conn, pid: int):
-        row = conn.execute(text("select type_id, product_id, activity, materials, coalesce(output_qty,1) from blueprints where product_id=:p limit 1"), {"p": pid}).fetchone()
-        if not row:
-            return None
-        return {"type_id": int(row[0]), "product_id": int(row[1]), "activity": row[2], "materials": row[3], "output_qty": int(row[4] or 1)}
+    with _engine().connect() as conn:
+        prices = _latest_mids(conn, region_id, {t_id for t_id, _ in leaves})
 
     # Preload on-hand valuation if owner_scope provided (policy: RA for holdings; spot for shortfalls)
     on_hand = get_on_hand(owner_scope, None) if owner_scope else {}
+    return _summarize(product_id, runs, leaves, prices, on_hand, bool(owner_scope))
 
-    def cost_material(
-        conn,
-        t_id: int,
-        qty_needed: int,
-        depth: int = 0,
-        max_depth: int = 4,
-    ) -> Tuple[Decimal, List[CostLine]]:
-        bp = _blueprint_for_product(conn, t_id)
-        if not bp or depth >= max_depth:
-            # Apply policy: use RA for on-hand upto available; price only deficits via spot
-            total_cost = Decimal("0")
-            lines: List[CostLine] = []
-            remaining = qty_needed
-            if owner_scope and t_id in on_hand and on_hand[t_id]["qty"] > 0:
-                available_qty = on_hand[t_id]["qty"]
-                avail = int(available_qty)
-                use = min(avail, remaining)
-                if use > 0:
-                    ra = on_hand[t_id]["avg_cost"]
-                    use_dec = Decimal(use)
-                    total_cost += ra * use_dec
-                    lines.append(
-                        CostLine(
-                            type_id=t_id,
-                            qty=use,
-                            unit_price=ra,
-                            cost=ra * use_dec,
-                        )
-                    )
-                    remaining -= use
-                    on_hand[t_id]["qty"] = available_qty - use_dec  # reduce available for subsequent calls
-            if remaining > 0:
-                price = _latest_mid(conn, region_id, t_id) or Decimal("0")
-                remaining_dec = Decimal(remaining)
-                total_cost += price * remaining_dec
-                lines.append(
-                    CostLine(
-                        type_id=t_id,
-                        qty=remaining,
-                        unit_price=price,
-                        cost=price * remaining_dec,
-                    )
-                )
-            return total_cost, lines
-        subtotal = Decimal("0")
-        out_lines: List[CostLine] = []
-        # Calculate required runs using output quantity
-        output_qty = int(bp.get("output_qty") or 1)
-        runs_required = max(1, ceil(qty_needed / max(1, output_qty)))
-        for mat in bp["materials"]:
-            mid = int(mat.get("type_id"))
-            mqty = int(mat.get("qty") or mat.get("quantity") or 0)
-            adj = ceil(mqty * (1 - me))
-            child_cost, child_lines = cost_material(conn, mid, adj * runs_required, depth + 1, max_depth)
-            subtotal += child_cost
-            out_lines.extend(child_lines)
-        return subtotal, out_lines
-
-    with engine.connect() as conn:
-        total_cost = Decimal("0")
-        for m in tree.materials:
-            mid = int(m.get("type_id"))
-            qty_per_run = int(m.get("qty") or m.get("quantity") or 0)
-            adj = ceil(qty_per_run * (1 - me))
-            c, ls = cost_material(conn, mid, adj * runs)
-            total_cost += c
-            lines.extend(ls)
-    total = sum((l.cost for l in lines), Decimal("0"))
-    return CostSummary(product_id=product_id, runs=runs, lines=lines, total_cost=total)
+
+@dataclass(frozen=True)
+class CostBatch:
+    """Shared inputs for costing many products, prepared up front by `prepare_cost_batch`.
+
+    `leaves[i]` is the expanded BOM of `requests[i]` (None when it has no blueprint);
+    `summarize(i)` only does in-memory work.
+    """
+
+    requests: Tuple[CostRequest, ...]
+    leaves: Tuple[List[LeafDemand] | None, ...]
+    prices: Mapping[int, Decimal]
+    on_hand: Mapping[int, Mapping[str, Decimal]]
+    use_inventory: bool
+
+    def __len__(self) -> int:
+        return len(self.requests)
+
+    def summarize(self, index: int) -> CostSummary | None:
+        req, leaves = self.requests[index], self.leaves[index]
+        if leaves is None:
+            return None
+        return _summarize(
+            req.product_id, req.runs, leaves, self.prices, self.on_hand, self.use_inventory
+        )
+
+
+def prepare_cost_batch(
+    requests: Iterable[CostRequest],
+    *,
+    region_id: int,
+    owner_scope: str | None = None,
+) -> CostBatch:
+    """Expand every BOM (sharing one memo), run one quote query and read one
+    inventory snapshot, so all I/O happens before any product is summarized."""
+
+    reqs = tuple(requests)
+    graph = get_blueprint_graph()
+    memo: Dict[tuple, Tuple[LeafDemand, ...]] = {}
+    leaves = tuple(
+        _product_leaves(graph, req.product_id, req.runs, req.me_bonus, memo) for req in reqs
+    )
+    leaf_ids = {t_id for product in leaves if product for t_id, _ in product}
+    with _engine().connect() as conn:
+        prices = _latest_mids(conn, region_id, leaf_ids)
+    on_hand = get_on_hand(owner_scope, None) if owner_scope else {}
+    return CostBatch(
+        requests=reqs,
+        leaves=leaves,
+        prices=prices,
+        on_hand=on_hand,
+        use_inventory=bool(owner_scope),
+    )
+
+
+def cost_products(
+    requests: Iterable[CostRequest],
+    *,
+    region_id: int,
+    owner_scope: str | None = None,
+) -> Iterator[Tuple[CostRequest, CostSummary | None]]:
+    """Cost many products with one inventory snapshot, one shared BOM expansion and
+    one quote query, yielding `(request, summary)` as each product is finished.
+
+    Each product sees the full on-hand snapshot (as if costed on its own via
+    `cost_product`); `summary` is None when the product has no blueprint.
+    """
+
+    batch = prepare_cost_batch(requests, region_id=region_id, owner_scope=owner_scope)
+    for index, req in enumerate(batch.requests):
+        yield req, batch.summarize(index)
@@ -3,14 +3,13 @@ from __future__ import annotations
 from decimal import Decimal
 from typing import Dict, Iterable, Mapping, Optional
 
-import sqlalchemy as sa
 from sqlalchemy import text
 
-from app.config import Settings
+from app.db import get_engine
 
 
 def _engine():
-    return sa.create_engine(Settings().database_url)
+    return get_engine()
 
 
 def _to_decimal(value: object, *, default: Decimal | None = None) -> Decimal:
@@ -1,20 +1,32 @@
 from __future__ import annotations
 
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Any, Dict, Iterable, List, Mapping
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Tuple
 
 from indy_math.planner import (
     Assignment,
     Character,
     Facility,
+    IncrementalPlanner,
     Job,
-    PlanResult,
+    PlanMetrics,
     PlanningError,
+    PlanResult,
+    optimize_window,
     plan_window,
     recommend_assignments,
 )
 
+_MODES = ("greedy", "optimize")
+_DEFAULT_TIME_BUDGET_MS = 200
+_MAX_TIME_BUDGET_MS = 2000
+
 
 def _parse_decimal(value: Any, default: str = "0") -> Decimal:
     if value is None:
@@ -201,7 +213,28 @@ def _serialize_plan(result: PlanResult) -> Dict[str, Any]:
     }
 
 
-def schedule_window(payload: Mapping[str, Any]) -> Dict[str, Any]:
+def _serialize_metrics(metrics: PlanMetrics) -> Dict[str, Any]:
+    return {
+        "runs": metrics.runs,
+        "overflow_runs": metrics.overflow_runs,
+        "busy_minutes": str(metrics.busy_minutes),
+        "capacity_minutes": str(metrics.capacity_minutes),
+        "utilization": str(metrics.utilization),
+        "makespan_minutes": str(metrics.makespan_minutes),
+    }
+
+
+def _parse_time_budget(payload: Mapping[str, Any]) -> int:
+    try:
+        budget_ms = int(payload.get("time_budget_ms", _DEFAULT_TIME_BUDGET_MS))
+    except Exception as exc:  # noqa: BLE001
+        raise PlanningError("time_budget_ms must be an integer") from exc
+    if not 0 <= budget_ms <= _MAX_TIME_BUDGET_MS:
+        raise PlanningError(f"time_budget_ms must be between 0 and {_MAX_TIME_BUDGET_MS}")
+    return budget_ms
+
+
+def _parse_window(payload: Mapping[str, Any]) -> Tuple[datetime, int]:
     try:
         start = datetime.fromisoformat(str(payload["start"]))
         duration_hours = int(payload.get("duration_hours", 168))
@@ -209,14 +242,10 @@ def schedule_window(payload: Mapping[str, Any]) -> Dict[str, Any]:
         raise PlanningError("Invalid start or duration_hours") from exc
     if duration_hours <= 0:
         raise PlanningError("duration_hours must be positive")
+    return start, duration_hours
 
-    characters = _parse_characters(payload.get("characters", []))
-    facilities = _parse_facilities(payload.get("structures", []))
-    jobs = _parse_jobs(payload.get("jobs", []))
-    end = start + timedelta(hours=duration_hours)
 
-    result = plan_window(start, end, jobs, characters, facilities)
-    plan = _serialize_plan(result)
+def _with_assumptions(plan: Dict[str, Any], duration_hours: int) -> Dict[str, Any]:
     plan["assumptions"] = {
         "start": plan["start"],
         "end": plan["end"],
@@ -225,6 +254,39 @@ def schedule_window(payload: Mapping[str, Any]) -> Dict[str, Any]:
     return plan
 
 
+def schedule_window(payload: Mapping[str, Any]) -> Dict[str, Any]:
+    start, duration_hours = _parse_window(payload)
+    mode = str(payload.get("mode") or "greedy")
+    if mode not in _MODES:
+        raise PlanningError(f"mode must be one of {', '.join(_MODES)}")
+
+    characters = _parse_characters(payload.get("characters", []))
+    facilities = _parse_facilities(payload.get("structures", []))
+    jobs = _parse_jobs(payload.get("jobs", []))
+    end = start + timedelta(hours=duration_hours)
+
+    if mode == "optimize":
+        budget_ms = _parse_time_budget(payload)
+        optimized = optimize_window(
+            start, end, jobs, characters, facilities, time_budget=budget_ms / 1000
+        )
+        plan = _serialize_plan(optimized.result)
+        plan["optimization"] = {
+            "mode": mode,
+            "time_budget_ms": budget_ms,
+            "elapsed_ms": round(optimized.elapsed_seconds * 1000, 3),
+            "improved": optimized.improved,
+            "completed": optimized.completed,
+            "greedy": _serialize_metrics(optimized.greedy),
+            "optimized": _serialize_metrics(optimized.optimized),
+            "utilization_gain": str(optimized.utilization_gain),
+            "runs_gain": optimized.runs_gain,
+        }
+    else:
+        plan = _serialize_plan(plan_window(start, end, jobs, characters, facilities))
+    return _with_assumptions(plan, duration_hours)
+
+
 def recommend(payload: Mapping[str, Any]) -> Dict[str, Any]:
     characters = _parse_characters(payload.get("characters", []))
     facilities = _parse_facilities(payload.get("structures", []))
@@ -243,3 +305,159 @@ def recommend(payload: Mapping[str, Any]) -> Dict[str, Any]:
         ],
     }
 
+
+class PlanSessionNotFound(LookupError):
+    """Raised when a plan id is unknown to this process or has expired."""
+
+
+@dataclass
+class PlanSession:
+    planner: IncrementalPlanner
+    duration_hours: int
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class PlanSessionStore:
+    """Plan sessions by id: bounded LRU, dropped after `ttl` seconds idle.
+
+    Sessions live in this process only; a client whose id is not found
+    (expired, evicted or served by another worker) starts a new session.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 256,
+        ttl: float = 1800.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1")
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Tuple[float, PlanSession]]" = OrderedDict()
+
+    def create(self, session: PlanSession) -> str:
+        plan_id = uuid.uuid4().hex
+        with self._lock:
+            self._sessions[plan_id] = (self._clock() + self.ttl, session)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return plan_id
+
+    def get(self, plan_id: str) -> PlanSession:
+        with self._lock:
+            item = self._sessions.get(plan_id)
+            now = self._clock()
+            if item is None or item[0] <= now:
+                self._sessions.pop(plan_id, None)
+                raise PlanSessionNotFound(plan_id)
+            self._sessions[plan_id] = (now + self.ttl, item[1])
+            self._sessions.move_to_end(plan_id)
+            return item[1]
+
+    def delete(self, plan_id: str) -> None:
+        with self._lock:
+            if self._sessions.pop(plan_id, None) is None:
+                raise PlanSessionNotFound(plan_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+
+_SESSIONS: PlanSessionStore | None = None
+_SESSIONS_LOCK = threading.Lock()
+
+
+def get_plan_sessions() -> PlanSessionStore:
+    global _SESSIONS
+    if _SESSIONS is None:
+        from app.dependencies import get_settings
+
+        settings = get_settings()
+        with _SESSIONS_LOCK:
+            if _SESSIONS is None:
+                _SESSIONS = PlanSessionStore(
+                    max_sessions=settings.plan_session_max, ttl=settings.plan_session_ttl
+                )
+    return _SESSIONS
+
+
+def reset_plan_sessions() -> None:
+    global _SESSIONS
+    with _SESSIONS_LOCK:
+        _SESSIONS = None
+
+
+def _session_plan(plan_id: str, session: PlanSession) -> Dict[str, Any]:
+    plan = _with_assumptions(_serialize_plan(session.planner.result), session.duration_hours)
+    plan["plan_id"] = plan_id
+    return plan
+
+
+def create_session(payload: Mapping[str, Any]) -> Dict[str, Any]:
+    """Plan the window as `schedule_window` (greedy) and keep it for incremental updates."""
+
+    start, duration_hours = _parse_window(payload)
+    planner = IncrementalPlanner(
+        start,
+        start + timedelta(hours=duration_hours),
+        _parse_jobs(payload.get("jobs", [])),
+        _parse_characters(payload.get("characters", [])),
+        _parse_facilities(payload.get("structures", [])),
+    )
+    session = PlanSession(planner=planner, duration_hours=duration_hours)
+    plan_id = get_plan_sessions().create(session)
+    return _session_plan(plan_id, session)
+
+
+def get_session(plan_id: str) -> Dict[str, Any]:
+    session = get_plan_sessions().get(plan_id)
+    with session.lock:
+        return _session_plan(plan_id, session)
+
+
+def _diff_section(payload: Mapping[str, Any], name: str) -> Mapping[str, Any]:
+    section = payload.get(name) or {}
+    if not isinstance(section, Mapping):
+        raise PlanningError(f"{name} must be a mapping with 'upsert' and/or 'remove'")
+    return section
+
+
+def update_session(plan_id: str, payload: Mapping[str, Any]) -> Dict[str, Any]:
+    """Apply `{"jobs": {"upsert": [...], "remove": [...]}, "characters": {...}}`.
+
+    Only the (character, activity) timelines touched by the diff are
+    re-scheduled; they are listed under `replanned`.
+    """
+
+    jobs = _diff_section(payload, "jobs")
+    characters = _diff_section(payload, "characters")
+    upsert_jobs = _parse_jobs(jobs.get("upsert", []))
+    upsert_characters = _parse_characters(characters.get("upsert", []))
+    try:
+        remove_jobs = [str(job_id) for job_id in jobs.get("remove", [])]
+        remove_characters = [int(character_id) for character_id in characters.get("remove", [])]
+    except Exception as exc:  # noqa: BLE001
+        raise PlanningError("remove must list job ids / character ids") from exc
+
+    session = get_plan_sessions().get(plan_id)
+    with session.lock:
+        replanned = session.planner.update(
+            upsert_jobs=upsert_jobs,
+            remove_jobs=remove_jobs,
+            upsert_characters=upsert_characters,
+            remove_characters=remove_characters,
+        )
+        plan = _session_plan(plan_id, session)
+    plan["replanned"] = [
+        {"character_id": character_id, "activity": activity}
+        for character_id, activity in sorted(replanned)
+    ]
+    return plan
+
+
+def delete_session(plan_id: str) -> None:
+    get_plan_sessions().delete(plan_id)
@@ -5,10 +5,9 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Iterable, Sequence
 
-import sqlalchemy as sa
 from sqlalchemy import text
 
-from app.config import Settings
+from app.db import get_engine
 
 
 @dataclass(frozen=True)
@@ -28,7 +27,7 @@ class Quote:
 
 
 def _engine():
-    return sa.create_engine(Settings().database_url)
+    return get_engine()
 
 
 def latest_quotes(region_id: int, type_ids: Sequence[int]) -> list[Quote]:
@@ -2,20 +2,20 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 
-import sqlalchemy as sa
 from sqlalchemy import text
 
 from app.cache import CacheClient
-from app.config import Settings
-import redis
+from app.cache_local import get_local_cache
+from app.db import get_engine
+from app.redis_pool import get_redis
 
 
 def _engine():
-    return sa.create_engine(Settings().database_url)
+    return get_engine()
 
 
 def _redis():
-    return redis.from_url(Settings().redis_url, decode_responses=True)
+    return get_redis(decode_responses=False)
 
 
 def list_systems(
@@ -26,7 +26,7 @@ def list_systems(
     constellation_id: Optional[int] = None,
 ) -> Dict[str, Any]:
     key = f"systems:list:{q or ''}:{limit}:{cursor or 0}:{region_id or 0}:{constellation_id or 0}"
-    cache = CacheClient(_redis())
+    cache = CacheClient(_redis(), local=get_local_cache())
     cached = cache._get_value(key)  # use internal to reuse envelope
     if cached and not cached.stale:
         return cached.value
@@ -8,11 +8,18 @@ from __future__ import annotations
 
 from datetime import datetime
 from decimal import Decimal
-from typing import Final, Sequence
+from typing import Final, Mapping, Sequence
 
 from app.providers.esi import ESIClient, IndustryJob
-from app.repos import InventoryRepo, Job, JobActivity, JobsRepo
-
+from app.repos import (
+    InventoryRepo,
+    Job,
+    JobActivity,
+    JobsRepo,
+    JobState,
+    job_state,
+    stored_job_status,
+)
 
 _ACTIVITY_MAP: Final[dict[int, JobActivity]] = {
     1: "manufacturing",
@@ -24,6 +31,9 @@ _ACTIVITY_MAP: Final[dict[int, JobActivity]] = {
     11: "invention",
 }
 
+_HOLDING: Final[frozenset[str]] = frozenset({"active", "queued"})
+_FINISHED: Final[frozenset[str]] = frozenset({"delivered", "cancelled"})
+
 
 def _translate_activity(activity_id: int) -> JobActivity:
     try:
@@ -50,23 +60,78 @@ def _map_job(owner_scope: str, src: IndustryJob) -> Job:
 
 
 def sync_industry_jobs(owner_scope: str, esi: ESIClient, jobs_repo: JobsRepo, inv_repo: InventoryRepo) -> None:
-    """Fetch and upsert jobs, then adjust reservations based on state.
+    """Fetch jobs, persist changes, then adjust reservations in bulk.
+
+    Only jobs whose stored row differs from ESI in any updatable column (or
+    that are new) are upserted, so a steady-state sync issues one read and no
+    writes. Inventory is only touched on status transitions:
 
-    Idempotency:
-    - Upserts replace existing rows with the same `job_id`.
-    - Reservations are applied for `active` jobs and released for `delivered`/`cancelled`.
-    - Completed jobs trigger settlement of outputs exactly once (enforced by DB-level idempotency in real impl).
+    - into `active`/`queued`: reserve materials;
+    - from `active`/`queued` into `delivered`/`cancelled`: release them;
+    - into `delivered`: settle outputs.
+
+    Each action is a single set-based repo call. Run it in one transaction:
+    `PgJobsRepo.get_job_states` locks the owner's jobs, so overlapping syncs
+    cannot both act on the same transition. Repos without
+    `get_job_states` or the bulk methods fall back to the per-job protocol,
+    treating every job as changed (previous behaviour).
     """
 
-    jobs_resp = esi.list_industry_jobs(owner_scope)
-    jobs = [_map_job(owner_scope, j) for j in jobs_resp.data]
-    jobs_repo.upsert_jobs(owner_scope, jobs)
+    # Pages are mapped as they arrive rather than after the slowest one lands
+    jobs = [_map_job(owner_scope, j) for j in esi.iter_industry_jobs(owner_scope)]
+
+    get_states = getattr(jobs_repo, "get_job_states", None)
+    if get_states is None or not _has_bulk_methods(inv_repo):
+        _sync_per_job(owner_scope, jobs, jobs_repo, inv_repo)
+        return
+
+    previous: Mapping[int, JobState] = {}
+    if jobs:
+        previous = get_states(owner_scope, [job.job_id for job in jobs])
+    changed = [job for job in jobs if previous.get(job.job_id) != job_state(job)]
+    if not changed:
+        return
+    jobs_repo.upsert_jobs(owner_scope, changed)
+
+    reserve: list[Job] = []
+    release: list[Job] = []
+    settle: list[Job] = []
+    for job in changed:
+        stored = previous.get(job.job_id)
+        old = stored.status if stored else None
+        new = stored_job_status(job.status)
+        if new == old:
+            continue
+        if new in _HOLDING and old not in _HOLDING:
+            reserve.append(job)
+        elif new in _FINISHED and old in _HOLDING:
+            release.append(job)
+        if new == "delivered":
+            settle.append(job)
+
+    if reserve:
+        inv_repo.reserve_for_jobs(reserve)
+    if release:
+        inv_repo.release_for_jobs(release)
+    if settle:
+        inv_repo.settle_outputs(settle)
+
+
+def _has_bulk_methods(inv_repo: InventoryRepo) -> bool:
+    return all(
+        hasattr(inv_repo, name)
+        for name in ("reserve_for_jobs", "release_for_jobs", "settle_outputs")
+    )
+
 
+def _sync_per_job(
+    owner_scope: str, jobs: Sequence[Job], jobs_repo: JobsRepo, inv_repo: InventoryRepo
+) -> None:
+    jobs_repo.upsert_jobs(owner_scope, jobs)
     for job in jobs:
-        if job.status in {"active", "queued"}:
+        if job.status in _HOLDING:
             inv_repo.reserve_for_job(job)
-        elif job.status in {"delivered", "cancelled"}:
+        elif job.status in _FINISHED:
             inv_repo.release_for_job(job)
             if job.status == "delivered":
                 inv_repo.settle_job_outputs(job)
-
@@ -3,6 +3,7 @@ from __future__ import annotations
 import os
 
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 
 celery_app = Celery(
     "eveindy",
@@ -18,3 +19,30 @@ celery_app.conf.task_routes = {
     "tasks.alerts": {"queue": "alerts"},
 }
 
+
+@worker_process_init.connect
+def _reset_db_pools(**_kwargs) -> None:
+    # Forked children must not reuse connections inherited from the parent
+    from app.cache_fill import stop_revalidator
+    from app.cache_local import reset_local_cache, start_invalidation_listener
+    from app.db import dispose_engines
+    from app.redis_pool import close_redis_pools
+
+    dispose_engines(close=False)
+    close_redis_pools(disconnect=False)
+    reset_local_cache()
+    stop_revalidator(wait=False)
+    start_invalidation_listener()
+
+
+@worker_process_shutdown.connect
+def _close_db_pools(**_kwargs) -> None:
+    from app.cache_fill import stop_revalidator
+    from app.cache_local import stop_invalidation_listener
+    from app.db import dispose_engines
+    from app.redis_pool import close_redis_pools
+
+    stop_invalidation_listener()
+    stop_revalidator()
+    dispose_engines()
+    close_redis_pools()
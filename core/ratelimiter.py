@@ -6,17 +6,33 @@ Usage:
     rl.block_until_allowed("esi:/industry/jobs")
 
 Keep pure behavior by injecting time providers in tests.
+
+Async callers use `await rl.acquire(key)` / `await rl.acquire_many(key, n)`,
+which never block the event loop and queue fairly by priority.
+
+`RedisRateLimiter` offers the same API with buckets stored in Redis and
+updated by one atomic Lua script, so every process shares a single budget.
 """
 
 from __future__ import annotations
 
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
 from dataclasses import dataclass, field
 from time import sleep as _sleep
-from typing import Callable, Dict
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
 
 
 NowFunc = Callable[[], float]
 SleepFunc = Callable[[float], None]
+AsyncSleepFunc = Callable[[float], Awaitable[None]]
 
 
 @dataclass
@@ -38,53 +54,316 @@ class Bucket:
         self.last_refill_ts = now_ts
 
 
+# Waiter priorities for `acquire`/`acquire_many` (lower is served first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DEFAULT = 10
+PRIORITY_BACKGROUND = 20
+
+# (allowed, seconds until enough tokens) for one attempt
+TakeFunc = Callable[[], Tuple[bool, float]]
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    loop: asyncio.AbstractEventLoop = field(compare=False)
+    ready: asyncio.Event = field(compare=False)
+
+
+class _FairQueue:
+    """Per-key async waiters served by priority, FIFO within a priority.
+
+    Only the head waiter polls the bucket (sleeping until its refill ETA);
+    the rest park on an event until they reach the head. Waiters may live on
+    different event loops/threads: wake-ups go through
+    `call_soon_threadsafe`. The lock only guards the queues; `take` runs
+    outside it, on a worker thread when `offload` is set (blocking Redis
+    calls), so keys, threads and event loops never wait on another's
+    bucket round trip.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._queues: Dict[str, List[_Waiter]] = {}
+        self._seq = itertools.count()
+
+    async def acquire(
+        self,
+        key: str,
+        take: TakeFunc,
+        priority: int,
+        async_sleep: AsyncSleepFunc,
+        offload: bool = False,
+    ) -> None:
+        waiter = _Waiter(priority, next(self._seq), asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            heapq.heappush(self._queues.setdefault(key, []), waiter)
+        try:
+            while True:
+                with self._lock:
+                    head = self._queues[key][0] is waiter
+                    if not head:
+                        waiter.ready.clear()
+                if not head:
+                    await waiter.ready.wait()
+                    continue
+                allowed, wait_s = await asyncio.to_thread(take) if offload else take()
+                if allowed:
+                    return
+                await async_sleep(wait_s)
+        finally:
+            with self._lock:
+                queue = self._queues.get(key, [])
+                if queue and queue[0] is waiter:
+                    heapq.heappop(queue)
+                elif waiter in queue:  # cancelled or failed while queued
+                    queue.remove(waiter)
+                    heapq.heapify(queue)
+                self._wake_head(key, queue)
+
+    def _wake_head(self, key: str, queue: List[_Waiter]) -> None:
+        if not queue:
+            self._queues.pop(key, None)
+            return
+        head = queue[0]
+        try:
+            head.loop.call_soon_threadsafe(head.ready.set)
+        except RuntimeError:  # its loop is closed; the waiter is gone
+            pass
+
+    def waiting(self, key: str) -> int:
+        with self._lock:
+            return len(self._queues.get(key, ()))
+
+
 @dataclass
 class RateLimiter:
     capacity: float
     refill_rate_per_sec: float
     now: NowFunc
     sleep: SleepFunc = _sleep
+    async_sleep: AsyncSleepFunc = asyncio.sleep
     buckets: Dict[str, Bucket] = field(default_factory=dict)
+    # Guards `buckets`; sleeping always happens outside it
+    _lock: threading.RLock = field(
+        default_factory=threading.RLock, init=False, repr=False, compare=False
+    )
+    _waiters: _FairQueue = field(default_factory=_FairQueue, init=False, repr=False, compare=False)
 
     def register_key(self, key: str) -> None:
-        ts = self.now()
-        if key not in self.buckets:
-            self.buckets[key] = Bucket(
+        with self._lock:
+            if key not in self.buckets:
+                self.buckets[key] = Bucket(
+                    capacity=self.capacity,
+                    tokens=self.capacity,
+                    refill_rate_per_sec=self.refill_rate_per_sec,
+                    last_refill_ts=self.now(),
+                )
+
+    def _take(self, key: str, n: float, on_denied: str) -> Tuple[bool, float]:
+        with self._lock:
+            self.register_key(key)
+            bucket = self.buckets[key]
+            bucket.refill(self.now())
+            if bucket.tokens >= n:
+                bucket.tokens -= n
+                bucket.allowed += 1
+                return True, 0.0
+            setattr(bucket, on_denied, getattr(bucket, on_denied) + 1)
+            # seconds = tokens_needed / refill_rate
+            return False, max(0.0, (n - bucket.tokens) / bucket.refill_rate_per_sec)
+
+    def try_acquire(self, key: str) -> bool:
+        return self._take(key, 1.0, "denied")[0]
+
+    def block_until_allowed(self, key: str) -> None:
+        while True:
+            allowed, wait_s = self._take(key, 1.0, "delayed")
+            if allowed:
+                return
+            self.sleep(wait_s)
+
+    async def acquire(self, key: str, *, priority: int = PRIORITY_DEFAULT) -> None:
+        """Async counterpart of `block_until_allowed`; yields to the event loop while waiting."""
+        await self.acquire_many(key, 1, priority=priority)
+
+    async def acquire_many(self, key: str, n: float, *, priority: int = PRIORITY_DEFAULT) -> None:
+        """Wait for `n` tokens at once.
+
+        Waiters on a key are served in `priority` order (e.g.
+        `PRIORITY_INTERACTIVE` ahead of `PRIORITY_BACKGROUND`), FIFO within a
+        priority, so a large request is not starved by a stream of small ones.
+        """
+        _check_request(n, self.capacity)
+        await self._waiters.acquire(
+            key, lambda: self._take(key, n, "delayed"), priority, self.async_sleep
+        )
+
+    def metrics(self, key: str) -> dict:
+        with self._lock:
+            b = self.buckets.get(key)
+            if not b:
+                return {"allowed": 0, "denied": 0, "delayed": 0}
+            return {"allowed": b.allowed, "denied": b.denied, "delayed": b.delayed}
+
+    def metrics_by_key(self) -> Dict[str, dict]:
+        return {key: self.metrics(key) for key in list(self.buckets)}
+
+
+def _check_request(n: float, capacity: float) -> None:
+    if n <= 0:
+        raise ValueError("n must be positive")
+    if n > capacity:
+        raise ValueError(f"cannot acquire {n} tokens from a bucket of capacity {capacity}")
+
+
+# KEYS[1] bucket hash, KEYS[2] metrics hash, KEYS[3] set of known keys
+# ARGV: capacity, refill rate, now, tokens requested, bucket TTL, counter to bump on denial, key
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil or ts == nil then
+  tokens = capacity
+  ts = now
+end
+if now > ts then
+  tokens = math.min(capacity, tokens + (now - ts) * rate)
+  ts = now
+end
+local allowed = 0
+local wait = 0
+if tokens >= requested then
+  tokens = tokens - requested
+  allowed = 1
+  redis.call('HINCRBY', KEYS[2], 'allowed', 1)
+else
+  wait = (requested - tokens) / rate
+  redis.call('HINCRBY', KEYS[2], ARGV[6], 1)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(ts))
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[5]))
+redis.call('SADD', KEYS[3], ARGV[7])
+return {allowed, tostring(wait)}
+"""
+
+
+@dataclass
+class RedisRateLimiter:
+    """Token bucket shared across processes through Redis.
+
+    Each `try_acquire` is one EVALSHA of `_TOKEN_BUCKET_LUA`, which refills,
+    takes a token and bumps the metrics hash atomically. Keys are
+    `{prefix}:{key}` (bucket, expires once idle and full) and
+    `{prefix}:{key}:metrics` (allowed/denied/delayed counters, kept), and every
+    key seen is recorded in `{prefix}:keys` for `metrics_by_key`. If Redis
+    is unreachable the limiter degrades to an in-process bucket with the same
+    settings rather than failing the caller.
+    """
+
+    redis: Any
+    capacity: float
+    refill_rate_per_sec: float
+    now: NowFunc
+    sleep: SleepFunc = _sleep
+    async_sleep: AsyncSleepFunc = asyncio.sleep
+    prefix: str = "ratelimit"
+    fallback: RateLimiter | None = None
+    _script: Any = field(default=None, init=False, repr=False)
+    _waiters: _FairQueue = field(default_factory=_FairQueue, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._script = self.redis.register_script(_TOKEN_BUCKET_LUA)
+        if self.fallback is None:
+            self.fallback = RateLimiter(
                 capacity=self.capacity,
-                tokens=self.capacity,
                 refill_rate_per_sec=self.refill_rate_per_sec,
-                last_refill_ts=ts,
+                now=self.now,
+                sleep=self.sleep,
+                async_sleep=self.async_sleep,
             )
 
+    @property
+    def _bucket_ttl(self) -> int:
+        # Long enough to refill completely; an absent bucket reads as full
+        return max(1, int(self.capacity / self.refill_rate_per_sec) + 1)
+
+    def register_key(self, key: str) -> None:
+        try:
+            self.redis.sadd(f"{self.prefix}:keys", key)
+        except RedisError:
+            self.fallback.register_key(key)
+
+    def _take(self, key: str, on_denied: str, n: float = 1.0) -> Tuple[bool, float]:
+        allowed, wait = self._script(
+            keys=[f"{self.prefix}:{key}", f"{self.prefix}:{key}:metrics", f"{self.prefix}:keys"],
+            args=[
+                self.capacity,
+                self.refill_rate_per_sec,
+                self.now(),
+                n,
+                self._bucket_ttl,
+                on_denied,
+                key,
+            ],
+        )
+        return bool(int(allowed)), float(wait)
+
     def try_acquire(self, key: str) -> bool:
-        self.register_key(key)
-        bucket = self.buckets[key]
-        bucket.refill(self.now())
-        if bucket.tokens >= 1.0:
-            bucket.tokens -= 1.0
-            bucket.allowed += 1
-            return True
-        bucket.denied += 1
-        return False
+        try:
+            allowed, _ = self._take(key, "denied")
+        except RedisError:
+            logger.warning("Redis rate limiter unavailable; using local bucket for %s", key)
+            return self.fallback.try_acquire(key)
+        return allowed
 
     def block_until_allowed(self, key: str) -> None:
-        self.register_key(key)
-        bucket = self.buckets[key]
         while True:
-            bucket.refill(self.now())
-            if bucket.tokens >= 1.0:
-                bucket.tokens -= 1.0
-                bucket.allowed += 1
+            try:
+                allowed, wait_s = self._take(key, "delayed")
+            except RedisError:
+                logger.warning("Redis rate limiter unavailable; using local bucket for %s", key)
+                self.fallback.block_until_allowed(key)
+                return
+            if allowed:
                 return
-            needed = 1.0 - bucket.tokens
-            # seconds = tokens_needed / refill_rate
-            wait_s = max(0.0, needed / bucket.refill_rate_per_sec)
-            bucket.delayed += 1
             self.sleep(wait_s)
 
+    async def acquire(self, key: str, *, priority: int = PRIORITY_DEFAULT) -> None:
+        await self.acquire_many(key, 1, priority=priority)
+
+    async def acquire_many(self, key: str, n: float, *, priority: int = PRIORITY_DEFAULT) -> None:
+        """Wait for `n` shared tokens; priority/FIFO order holds among this process's waiters."""
+        _check_request(n, self.capacity)
+        try:
+            await self._waiters.acquire(
+                key, lambda: self._take(key, "delayed", n), priority, self.async_sleep, offload=True
+            )
+        except RedisError:
+            logger.warning("Redis rate limiter unavailable; using local bucket for %s", key)
+            await self.fallback.acquire_many(key, n, priority=priority)
+
     def metrics(self, key: str) -> dict:
-        b = self.buckets.get(key)
-        if not b:
-            return {"allowed": 0, "denied": 0, "delayed": 0}
-        return {"allowed": b.allowed, "denied": b.denied, "delayed": b.delayed}
+        try:
+            raw = self.redis.hgetall(f"{self.prefix}:{key}:metrics")
+        except RedisError:
+            return self.fallback.metrics(key)
+        counts = {(k.decode() if isinstance(k, bytes) else k): int(v) for k, v in raw.items()}
+        return {name: counts.get(name, 0) for name in ("allowed", "denied", "delayed")}
+
+    def metrics_by_key(self) -> Dict[str, dict]:
+        """Cluster-wide counters for every key any process has registered."""
 
+        try:
+            keys = sorted(
+                k.decode() if isinstance(k, bytes) else k
+                for k in self.redis.smembers(f"{self.prefix}:keys")
+            )
+        except RedisError:
+            return self.fallback.metrics_by_key()
+        return {key: self.metrics(key) for key in keys}
@@ -1,17 +1,33 @@
 """Stateless math core for EVEINDY."""
 
-from .costing import CostContext, CostResult, cost_item
-from .indicators import BollingerBands, DepthPoint, DepthSummary, moving_average, bollinger_bands, shallow_depth_metrics, simple_volatility
+from .costing import CostContext, CostEvaluator, CostResult, cost_item, cost_items
+from .indicators import (
+    BollingerBands,
+    DepthPoint,
+    DepthSummary,
+    RollingIndicators,
+    bollinger_bands,
+    moving_average,
+    rolling_indicators,
+    rolling_indicators_many,
+    shallow_depth_metrics,
+    simple_volatility,
+)
 from .planner import (
     ActivitySchedule,
     Assignment,
     Character,
     CharacterSchedule,
     Facility,
+    IncrementalPlanner,
     Job,
-    PlanResult,
+    OptimizedPlan,
+    PlanMetrics,
     PlanningError,
+    PlanResult,
     ScheduledBatch,
+    optimize_window,
+    plan_metrics,
     plan_window,
     recommend_assignments,
 )
@@ -19,20 +35,27 @@ from .spp import (
     DepthForecast,
     PricePolicy,
     SPPDiagnostics,
+    SPPGrid,
     SPPResult,
     recommend_batch_size,
+    spp_grid,
     spp_lead_time_aware,
 )
 
 __all__ = [
     "CostContext",
+    "CostEvaluator",
     "CostResult",
     "cost_item",
+    "cost_items",
     "BollingerBands",
     "DepthPoint",
     "DepthSummary",
+    "RollingIndicators",
     "moving_average",
     "bollinger_bands",
+    "rolling_indicators",
+    "rolling_indicators_many",
     "shallow_depth_metrics",
     "simple_volatility",
     "ActivitySchedule",
@@ -40,16 +63,23 @@ __all__ = [
     "Character",
     "CharacterSchedule",
     "Facility",
+    "IncrementalPlanner",
     "Job",
+    "OptimizedPlan",
+    "PlanMetrics",
     "PlanResult",
     "PlanningError",
     "ScheduledBatch",
+    "optimize_window",
+    "plan_metrics",
     "plan_window",
     "recommend_assignments",
     "DepthForecast",
     "PricePolicy",
     "SPPDiagnostics",
+    "SPPGrid",
     "SPPResult",
     "recommend_batch_size",
+    "spp_grid",
     "spp_lead_time_aware",
 ]
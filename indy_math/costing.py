@@ -122,142 +122,244 @@ def cost_item(
     qty_needed: int | float | Decimal,
     ctx: CostContext,
     _stack: Sequence[int] | None = None,
+    *,
+    memoize: bool = False,
+    trace: bool = True,
 ) -> CostResult:
-    """Calculate deterministic consume-only cost for the requested item quantity."""
-
-    required = _decimal(qty_needed)
-    if required <= ZERO:
-        raise CostingError("qty_needed must be greater than zero")
-
-    stack = tuple(_stack or ())
-    if type_id in stack:
-        raise CostingError(f"Detected recursive dependency cycle for type_id={type_id}")
-
-    remaining = required
-    consumed_cost = ZERO
-    trace_entries: list[CostTraceEntry] = []
-    excess: Dict[int, ExcessRecord] = {}
-    fees: Dict[str, Decimal] = {}
-
-    inventory_entry = ctx.inventory.get(type_id)
-    if inventory_entry:
-        available = _clamp_to_inventory(inventory_entry, remaining)
-        if available > ZERO:
-            unit_cost = _quantize(inventory_entry.avg_cost)
-            line_cost = _quantize(unit_cost * available)
-            consumed_cost += line_cost
-            remaining -= available
-            trace_entries.append(
-                CostTraceEntry(
-                    type_id=type_id,
-                    quantity=available,
-                    source="inventory",
-                    unit_cost=unit_cost,
-                    total_cost=line_cost,
-                    details={"consumed": available},
-                )
-            )
+    """Calculate deterministic consume-only cost for the requested item quantity.
+
+    A thin wrapper over `CostEvaluator`. `memoize=True` costs each
+    `(type_id, qty)` sub-assembly once and `trace=False` skips trace building;
+    results are identical either way. `_stack` lists type ids already being
+    costed by the caller and is treated as part of the recursion path.
+    """
+
+    evaluator = CostEvaluator(ctx, trace=trace, memoize=memoize)
+    for parent in _stack or ():
+        evaluator._stack.append(parent)
+        evaluator._on_stack.add(parent)
+    return evaluator.cost(type_id, qty_needed)
+
 
-    if remaining <= ZERO:
+@dataclass(frozen=True)
+class _Evaluation:
+    """Memoized sub-result; `trace` holds entries and nested evaluations unflattened."""
+
+    consumed_cost: Decimal
+    excess: Mapping[int, ExcessRecord]
+    fees: Mapping[str, Decimal]
+    trace: tuple
+    visited: frozenset[int]
+
+
+def _flatten_trace(evaluation: _Evaluation) -> list[CostTraceEntry]:
+    out: list[CostTraceEntry] = []
+    stack: list[object] = [iter(evaluation.trace)]
+    while stack:
+        part = next(stack[-1], None)  # type: ignore[call-overload]
+        if part is None:
+            stack.pop()
+        elif isinstance(part, _Evaluation):
+            stack.append(iter(part.trace))
+        else:
+            out.append(part)  # type: ignore[arg-type]
+    return out
+
+
+class CostEvaluator:
+    """Consume-only costing bound to one `CostContext`; the engine behind `cost_item`.
+
+    Sub-results are cached per `(type_id, qty)` for the lifetime of the
+    evaluator (unless `memoize=False`), so intermediates shared across a
+    tree (or across many top-level items priced against the same context)
+    are costed once. With `trace=False` no trace entries are built at all;
+    with `trace=True` the flattened `CostTrace` is produced only for the
+    requested top-level result and matches `cost_item` exactly.
+    """
+
+    def __init__(self, ctx: CostContext, *, trace: bool = True, memoize: bool = True) -> None:
+        self._ctx = ctx
+        self._trace = trace
+        self._memoize = memoize
+        self._memo: Dict[tuple[int, tuple], _Evaluation] = {}
+        self._stack: list[int] = []
+        self._on_stack: set[int] = set()
+
+    def cost(self, type_id: int, qty_needed: int | float | Decimal) -> CostResult:
+        required = _decimal(qty_needed)
+        if required <= ZERO:
+            raise CostingError("qty_needed must be greater than zero")
+        evaluation = self._evaluate(type_id, required)
         return CostResult(
-            consumed_cost=_quantize(consumed_cost),
+            consumed_cost=evaluation.consumed_cost,
             consumed_qty=required,
-            excess_to_inventory=excess,
-            fee_split=fees,
-            trace=CostTrace(trace_entries),
+            excess_to_inventory=evaluation.excess,
+            fee_split=evaluation.fees,
+            trace=CostTrace(_flatten_trace(evaluation)) if self._trace else CostTrace(),
         )
 
-    recipe = ctx.recipes.get(type_id)
-    if recipe:
-        runs = max(1, ceil((remaining / recipe.output_qty)))
-        produced_qty = Decimal(runs) * recipe.output_qty
-        next_stack = (*stack, type_id)
-
-        material_cost = ZERO
-        for requirement in recipe.materials:
-            child_qty = Decimal(runs) * requirement.quantity
-            child_result = cost_item(requirement.type_id, child_qty, ctx, next_stack)
-            material_cost += child_result.consumed_cost
-            trace_entries.extend(child_result.trace.entries)
-            _merge_excess(excess, child_result.excess_to_inventory)
-            _merge_fees(fees, child_result.fee_split)
-
-        job_fee_total = recipe.job_fee * Decimal(runs)
-
-        total_cost = material_cost + job_fee_total
-        if produced_qty <= ZERO:
-            raise CostingError("Recipe output quantity must be positive")
-        unit_cost = _quantize(total_cost / produced_qty)
-
-        deliver_qty = min(produced_qty, remaining)
-        consumed_cost += _quantize(unit_cost * deliver_qty)
-        remaining -= deliver_qty
-
-        excess_qty = produced_qty - deliver_qty
-        if excess_qty > ZERO:
-            excess_record = ExcessRecord(quantity=excess_qty, unit_cost=unit_cost)
-            _merge_excess(excess, {type_id: excess_record})
-
-        if job_fee_total > ZERO:
-            consumed_fee = _quantize(job_fee_total * (deliver_qty / produced_qty))
-            excess_fee = _quantize(job_fee_total - consumed_fee)
-            if consumed_fee > ZERO:
-                fees["consumed_fee"] = fees.get("consumed_fee", ZERO) + consumed_fee
-            if excess_qty > ZERO and excess_fee > ZERO:
-                fees["excess_fee"] = fees.get("excess_fee", ZERO) + excess_fee
-
-        trace_entries.append(
-            CostTraceEntry(
-                type_id=type_id,
-                quantity=produced_qty,
-                source="manufacture",
-                unit_cost=unit_cost,
-                total_cost=_quantize(total_cost),
-                details={
-                    "runs": Decimal(runs),
-                    "deliver_qty": deliver_qty,
-                    "excess_qty": excess_qty,
-                    "job_fee": job_fee_total,
-                },
+    def _evaluate(self, type_id: int, required: Decimal) -> _Evaluation:
+        if type_id in self._on_stack:
+            raise CostingError(f"Detected recursive dependency cycle for type_id={type_id}")
+        key = (type_id, required.as_tuple())
+        cached = self._memo.get(key) if self._memoize else None
+        if cached is not None:
+            if not cached.visited.isdisjoint(self._on_stack):
+                cycle_id = next(t for t in self._stack if t in cached.visited)
+                raise CostingError(f"Detected recursive dependency cycle for type_id={cycle_id}")
+            return cached
+        self._stack.append(type_id)
+        self._on_stack.add(type_id)
+        try:
+            evaluation = self._compute(type_id, required)
+        finally:
+            self._stack.pop()
+            self._on_stack.discard(type_id)
+        if self._memoize:
+            self._memo[key] = evaluation
+        return evaluation
+
+    def _compute(self, type_id: int, required: Decimal) -> _Evaluation:
+        ctx = self._ctx
+        tracing = self._trace
+        remaining = required
+        consumed_cost = ZERO
+        trace_parts: list[object] = []
+        excess: Dict[int, ExcessRecord] = {}
+        fees: Dict[str, Decimal] = {}
+        visited: set[int] = {type_id}
+
+        inventory_entry = ctx.inventory.get(type_id)
+        if inventory_entry:
+            available = _clamp_to_inventory(inventory_entry, remaining)
+            if available > ZERO:
+                unit_cost = _quantize(inventory_entry.avg_cost)
+                line_cost = _quantize(unit_cost * available)
+                consumed_cost += line_cost
+                remaining -= available
+                if tracing:
+                    trace_parts.append(
+                        CostTraceEntry(
+                            type_id=type_id,
+                            quantity=available,
+                            source="inventory",
+                            unit_cost=unit_cost,
+                            total_cost=line_cost,
+                            details={"consumed": available},
+                        )
+                    )
+
+        if remaining <= ZERO:
+            return _Evaluation(
+                consumed_cost=_quantize(consumed_cost),
+                excess=excess,
+                fees=fees,
+                trace=tuple(trace_parts),
+                visited=frozenset(visited),
             )
-        )
 
-    elif type_id in ctx.acquisition_costs:
-        unit_cost = _quantize(ctx.acquisition_costs[type_id])
-        line_cost = _quantize(unit_cost * remaining)
-        consumed_cost += line_cost
-        trace_entries.append(
-            CostTraceEntry(
-                type_id=type_id,
-                quantity=remaining,
-                source="acquisition",
-                unit_cost=unit_cost,
-                total_cost=line_cost,
-                details={"purchased": remaining},
+        recipe = ctx.recipes.get(type_id)
+        if recipe:
+            runs = max(1, ceil((remaining / recipe.output_qty)))
+            produced_qty = Decimal(runs) * recipe.output_qty
+
+            material_cost = ZERO
+            for requirement in recipe.materials:
+                child_qty = Decimal(runs) * requirement.quantity
+                if child_qty <= ZERO:
+                    raise CostingError("qty_needed must be greater than zero")
+                child = self._evaluate(requirement.type_id, child_qty)
+                material_cost += child.consumed_cost
+                if tracing:
+                    trace_parts.append(child)
+                visited |= child.visited
+                _merge_excess(excess, child.excess)
+                _merge_fees(fees, child.fees)
+
+            job_fee_total = recipe.job_fee * Decimal(runs)
+
+            total_cost = material_cost + job_fee_total
+            if produced_qty <= ZERO:
+                raise CostingError("Recipe output quantity must be positive")
+            unit_cost = _quantize(total_cost / produced_qty)
+
+            deliver_qty = min(produced_qty, remaining)
+            consumed_cost += _quantize(unit_cost * deliver_qty)
+            remaining -= deliver_qty
+
+            excess_qty = produced_qty - deliver_qty
+            if excess_qty > ZERO:
+                excess_record = ExcessRecord(quantity=excess_qty, unit_cost=unit_cost)
+                _merge_excess(excess, {type_id: excess_record})
+
+            if job_fee_total > ZERO:
+                consumed_fee = _quantize(job_fee_total * (deliver_qty / produced_qty))
+                excess_fee = _quantize(job_fee_total - consumed_fee)
+                if consumed_fee > ZERO:
+                    fees["consumed_fee"] = fees.get("consumed_fee", ZERO) + consumed_fee
+                if excess_qty > ZERO and excess_fee > ZERO:
+                    fees["excess_fee"] = fees.get("excess_fee", ZERO) + excess_fee
+
+            if tracing:
+                trace_parts.append(
+                    CostTraceEntry(
+                        type_id=type_id,
+                        quantity=produced_qty,
+                        source="manufacture",
+                        unit_cost=unit_cost,
+                        total_cost=_quantize(total_cost),
+                        details={
+                            "runs": Decimal(runs),
+                            "deliver_qty": deliver_qty,
+                            "excess_qty": excess_qty,
+                            "job_fee": job_fee_total,
+                        },
+                    )
+                )
+
+        elif type_id in ctx.acquisition_costs:
+            unit_cost = _quantize(ctx.acquisition_costs[type_id])
+            line_cost = _quantize(unit_cost * remaining)
+            consumed_cost += line_cost
+            if tracing:
+                trace_parts.append(
+                    CostTraceEntry(
+                        type_id=type_id,
+                        quantity=remaining,
+                        source="acquisition",
+                        unit_cost=unit_cost,
+                        total_cost=line_cost,
+                        details={"purchased": remaining},
+                    )
+                )
+            remaining = ZERO
+        else:
+            raise CostingError(f"No recipe or acquisition cost for type_id={type_id}")
+
+        if remaining > ZERO:
+            raise CostingError(
+                f"Insufficient coverage for type_id={type_id}; remaining {remaining} after costing"
             )
-        )
-        remaining = ZERO
-    else:
-        raise CostingError(f"No recipe or acquisition cost for type_id={type_id}")
 
-    if remaining > ZERO:
-        raise CostingError(
-            f"Insufficient coverage for type_id={type_id}; remaining {remaining} after costing"
+        return _Evaluation(
+            consumed_cost=_quantize(consumed_cost),
+            excess={
+                key: ExcessRecord(quantity=record.quantity, unit_cost=_quantize(record.unit_cost))
+                for key, record in excess.items()
+            },
+            fees={key: _quantize(value) for key, value in fees.items()},
+            trace=tuple(trace_parts),
+            visited=frozenset(visited),
         )
 
-    quantized_fees = {key: _quantize(value) for key, value in fees.items()}
-    normalized_excess = {
-        key: ExcessRecord(
-            quantity=record.quantity,
-            unit_cost=_quantize(record.unit_cost),
-        )
-        for key, record in excess.items()
-    }
-
-    return CostResult(
-        consumed_cost=_quantize(consumed_cost),
-        consumed_qty=required,
-        excess_to_inventory=normalized_excess,
-        fee_split=quantized_fees,
-        trace=CostTrace(trace_entries),
-    )
+
+def cost_items(
+    requests: Iterable[tuple[int, int | float | Decimal]],
+    ctx: CostContext,
+    *,
+    trace: bool = False,
+) -> list[CostResult]:
+    """Cost many `(type_id, qty)` requests against one context with a shared memo."""
+
+    evaluator = CostEvaluator(ctx, trace=trace)
+    return [evaluator.cost(type_id, qty) for type_id, qty in requests]
@@ -3,9 +3,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import ROUND_HALF_UP, Decimal
 from statistics import mean as stat_mean
-from typing import Sequence
+from typing import Hashable, Mapping, Sequence, TypeVar
+
+import numpy as np
+
+K = TypeVar("K", bound=Hashable)
 
 ZERO = Decimal("0")
 
@@ -68,6 +72,86 @@ def bollinger_bands(series: Sequence[float | Decimal], window: int, k: Decimal)
     return BollingerBands(middle=middle, upper=upper, lower=lower)
 
 
+@dataclass(frozen=True)
+class RollingIndicators:
+    """Full indicator series aligned with the input prices.
+
+    Positions before the first complete window are NaN. `stdev` is the population
+    standard deviation, matching `simple_volatility`.
+    """
+
+    ma: np.ndarray
+    stdev: np.ndarray
+    upper: np.ndarray
+    lower: np.ndarray
+
+
+def rolling_indicators_many(
+    series: Mapping[K, Sequence[float | Decimal]], window: int, k: float = 2.0
+) -> dict[K, RollingIndicators]:
+    """Compute rolling MA/stdev/Bollinger series for many price histories at once.
+
+    Histories are padded into one 2-D array and every window is derived from
+    row-wise cumulative sums, so the cost is O(total points) regardless of
+    `window`. Each row is centered on its own mean first so the running sum of
+    squares stays well conditioned for large ISK prices. The Decimal functions
+    above remain the exact reference for the latest value.
+    """
+
+    if window <= 1:
+        raise ValueError("window must be greater than one")
+    if k <= 0:
+        raise ValueError("k must be greater than zero")
+    keys = list(series)
+    if not keys:
+        return {}
+    lengths = [len(series[key]) for key in keys]
+    width = max(lengths)
+    values = np.zeros((len(keys), width), dtype=np.float64)
+    for row, key in enumerate(keys):
+        values[row, : lengths[row]] = [float(v) for v in series[key]]
+    lens = np.asarray(lengths, dtype=np.int64)
+    offsets = values.sum(axis=1) / np.maximum(lens, 1)
+    centered = values - offsets[:, None]
+    valid = np.arange(width)[None, :] < lens[:, None]
+    centered[~valid] = 0.0
+
+    c1 = np.zeros((len(keys), width + 1), dtype=np.float64)
+    c2 = np.zeros_like(c1)
+    np.cumsum(centered, axis=1, out=c1[:, 1:])
+    np.cumsum(centered * centered, axis=1, out=c2[:, 1:])
+
+    ma = np.full((len(keys), width), np.nan)
+    stdev = np.full((len(keys), width), np.nan)
+    if width >= window:
+        s1 = c1[:, window:] - c1[:, :-window]
+        s2 = c2[:, window:] - c2[:, :-window]
+        mean_c = s1 / window
+        variance = np.maximum(s2 / window - mean_c * mean_c, 0.0)
+        ma[:, window - 1 :] = mean_c + offsets[:, None]
+        stdev[:, window - 1 :] = np.sqrt(variance)
+    ma[~valid] = np.nan
+    stdev[~valid] = np.nan
+    upper = ma + k * stdev
+    lower = ma - k * stdev
+
+    return {
+        key: RollingIndicators(
+            ma=ma[row, : lengths[row]],
+            stdev=stdev[row, : lengths[row]],
+            upper=upper[row, : lengths[row]],
+            lower=lower[row, : lengths[row]],
+        )
+        for row, key in enumerate(keys)
+    }
+
+
+def rolling_indicators(
+    series: Sequence[float | Decimal], window: int, k: float = 2.0
+) -> RollingIndicators:
+    return rolling_indicators_many({0: series}, window, k)[0]
+
+
 def shallow_depth_metrics(points: Sequence[DepthPoint]) -> DepthSummary:
     if not points:
         raise ValueError("points must contain at least one depth entry")
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import heapq
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Dict, Iterable, Mapping, MutableMapping, Sequence
-
+from typing import Callable, Dict, Hashable, Iterable, Mapping, MutableMapping, Sequence
 
 ZERO = Decimal("0")
+_MINUTE_QUANTUM = Decimal("0.0001")
+_MICROS_PER_MINUTE = 60_000_000
 
 
 @dataclass(frozen=True)
@@ -114,6 +117,36 @@ class PlanResult:
     unassigned: list[Job]
 
 
+@dataclass(frozen=True)
+class PlanMetrics:
+    """How much of the window a plan uses."""
+
+    runs: int
+    overflow_runs: int
+    busy_minutes: Decimal
+    capacity_minutes: Decimal  # window length x every character slot
+    utilization: Decimal  # busy / capacity
+    makespan_minutes: Decimal  # window start to the last scheduled end
+
+
+@dataclass
+class OptimizedPlan:
+    result: PlanResult
+    greedy: PlanMetrics
+    optimized: PlanMetrics
+    improved: bool  # False when the greedy plan was at least as good and is returned
+    elapsed_seconds: float = 0.0  # wall time of the whole call, greedy pass included
+    completed: bool = True  # False when the time budget cut the search short
+
+    @property
+    def utilization_gain(self) -> Decimal:
+        return self.optimized.utilization - self.greedy.utilization
+
+    @property
+    def runs_gain(self) -> int:
+        return self.optimized.runs - self.greedy.runs
+
+
 class PlanningError(ValueError):
     """Raised when the planner cannot complete a schedule."""
 
@@ -124,6 +157,66 @@ def _as_decimal(value: int | float | Decimal) -> Decimal:
     return Decimal(str(value))
 
 
+def _facility_multiplier(facility: Facility | None) -> Decimal:
+    return facility.time_multiplier if facility else Decimal("1.0")
+
+
+def _minutes_to_micros(minutes: Decimal) -> int:
+    """Exact microseconds for a duration already quantized to `_MINUTE_QUANTUM`."""
+
+    return int(minutes * _MICROS_PER_MINUTE)
+
+
+def _micros_between(start: datetime, end: datetime) -> int:
+    delta = end - start
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+@dataclass(frozen=True)
+class _ActivityIndex:
+    """Characters able to run an activity, pre-sorted for candidate selection."""
+
+    # (character, multiplier) for characters with slots, in character_id order
+    characters: list[tuple[Character, Decimal]]
+    # (multiplier, position of its first character) by ascending multiplier
+    tiers: list[tuple[Decimal, int]]
+
+
+def _index_activity(activity: str, characters: Sequence[Character]) -> _ActivityIndex:
+    eligible = [(c, c.multiplier_for(activity)) for c in characters if c.slots_for(activity) > 0]
+    first_position: Dict[Decimal, int] = {}
+    for position, (_, multiplier) in enumerate(eligible):
+        first_position.setdefault(multiplier, position)
+    return _ActivityIndex(characters=eligible, tiers=sorted(first_position.items()))
+
+
+def _scan_candidates(
+    job: Job,
+    characters: Sequence[tuple[Character, Decimal]],
+    facility_candidates: Sequence[Facility | None],
+) -> Assignment:
+    """Score every (character, facility) pair; used when multipliers are not all positive."""
+
+    best: Assignment | None = None
+    per_run = _as_decimal(job.per_run_minutes)
+    for character, char_multiplier in characters:
+        for facility in facility_candidates:
+            facility_multiplier = _facility_multiplier(facility)
+            effective_multiplier = per_run * char_multiplier * facility_multiplier
+            if effective_multiplier <= ZERO:
+                raise PlanningError("Effective run duration must be positive")
+            if best is None or effective_multiplier < best.effective_minutes_per_run:
+                best = Assignment(
+                    job=job,
+                    character=character,
+                    facility=facility,
+                    effective_minutes_per_run=effective_multiplier,
+                    effective_multiplier=char_multiplier * facility_multiplier,
+                )
+    assert best is not None
+    return best
+
+
 def recommend_assignments(
     jobs: Sequence[Job],
     characters: Sequence[Character],
@@ -131,6 +224,11 @@ def recommend_assignments(
 ) -> tuple[list[Assignment], list[Job]]:
     """Score characters + facilities for each job and pick the fastest combination.
 
+    Ties go to the lowest `character_id`, then the facility ordered first by
+    `(time_multiplier, name)`. Per activity, eligible characters and facilities
+    are indexed once; with positive multipliers the fastest pair is found from
+    the lowest multipliers without scoring every combination.
+
     Returns a tuple of `(assignments, unassigned_jobs)`.
     """
 
@@ -140,43 +238,144 @@ def recommend_assignments(
     for bucket in facility_by_activity.values():
         bucket.sort(key=lambda f: (f.time_multiplier, f.name))
 
+    ordered_characters = sorted(characters, key=lambda c: c.character_id)
+    indexes: Dict[str, _ActivityIndex] = {}
+
     assignments: list[Assignment] = []
     unassigned: list[Job] = []
     sorted_jobs = sorted(jobs, key=lambda j: (j.priority, j.job_id))
 
     for job in sorted_jobs:
-        activity_key = job.activity.lower()
-        best: Assignment | None = None
-        for character in sorted(characters, key=lambda c: c.character_id):
-            slots = character.slots_for(job.activity)
-            if slots <= 0:
-                continue
-            char_multiplier = character.multiplier_for(job.activity)
-            facility_candidates = facility_by_activity.get(activity_key, [])
-            if not facility_candidates:
-                facility_candidates = [None]
-            for facility in facility_candidates:
-                facility_multiplier = facility.time_multiplier if facility else Decimal("1.0")
-                effective_multiplier = _as_decimal(job.per_run_minutes) * char_multiplier * facility_multiplier
-                if effective_multiplier <= ZERO:
-                    raise PlanningError("Effective run duration must be positive")
-                effective_minutes_per_run = effective_multiplier
-                candidate = Assignment(
-                    job=job,
-                    character=character,
-                    facility=facility,
-                    effective_minutes_per_run=effective_minutes_per_run,
-                    effective_multiplier=char_multiplier * facility_multiplier,
-                )
-                if best is None or candidate.effective_minutes_per_run < best.effective_minutes_per_run:
-                    best = candidate
-        if best is None:
+        index = indexes.get(job.activity)
+        if index is None:
+            index = indexes[job.activity] = _index_activity(job.activity, ordered_characters)
+        if not index.characters:
             unassigned.append(job)
-        else:
-            assignments.append(best)
+            continue
+        facility_candidates: Sequence[Facility | None] = (
+            facility_by_activity.get(job.activity.lower()) or [None]
+        )
+        fastest = facility_candidates[0]
+        facility_multiplier = _facility_multiplier(fastest)
+        per_run = _as_decimal(job.per_run_minutes)
+        if per_run <= ZERO or index.tiers[0][0] <= ZERO or facility_multiplier <= ZERO:
+            assignments.append(_scan_candidates(job, index.characters, facility_candidates))
+            continue
+
+        # Durations are monotonic in each multiplier, so the fastest facility and the
+        # lowest character tier win. Higher tiers can only tie through rounding, and
+        # an earlier character_id among tied candidates takes precedence.
+        best_minutes = per_run * index.tiers[0][0] * facility_multiplier
+        position = index.tiers[0][1]
+        for multiplier, first in index.tiers[1:]:
+            if per_run * multiplier * facility_multiplier != best_minutes:
+                break
+            position = min(position, first)
+        character, char_multiplier = index.characters[position]
+        assignments.append(
+            Assignment(
+                job=job,
+                character=character,
+                facility=fastest,
+                effective_minutes_per_run=per_run * char_multiplier * facility_multiplier,
+                effective_multiplier=char_multiplier * facility_multiplier,
+            )
+        )
     return assignments, unassigned
 
 
+def _empty_schedules(characters: Iterable[Character]) -> Dict[int, CharacterSchedule]:
+    return {
+        character.character_id: CharacterSchedule(
+            character=character,
+            activities={
+                activity: ActivitySchedule(slots=max(0, int(count)))
+                for activity, count in character.activity_slots.items()
+            },
+        )
+        for character in characters
+    }
+
+
+def _place_batches(
+    start: datetime,
+    end: datetime,
+    schedule: ActivitySchedule | None,
+    slot_heap: list[tuple[int, int]],
+    assignment: Assignment,
+) -> tuple[list[ScheduledBatch], list[ScheduledBatch]]:
+    """Place one job's batches on its (character, activity) timeline.
+
+    `slot_heap` is a min-heap of (free_at, slot_index), with times in integer
+    microseconds from `start`, so the earliest, lowest-index slot wins exactly
+    as a linear scan would; it is updated in place. Returns the batches that
+    fit in the window and those that overflow.
+    """
+
+    job = assignment.job
+    activity = job.activity
+    structure_id = assignment.facility.structure_id if assignment.facility else None
+    structure_name = assignment.facility.name if assignment.facility else None
+    if schedule is None or schedule.slots <= 0:
+        return [], [
+            ScheduledBatch(
+                job_id=job.job_id,
+                runs=job.runs,
+                start=end,
+                end=end,
+                slot_index=-1,
+                activity=activity,
+                duration_minutes=Decimal("0"),
+                type_id=job.type_id,
+                structure_id=structure_id,
+                structure_name=structure_name,
+            )
+        ]
+
+    window = _micros_between(start, end)
+    placed: list[ScheduledBatch] = []
+    overflow: list[ScheduledBatch] = []
+    # Batches of a job share a few sizes; price each size once
+    durations: Dict[int, tuple[Decimal, int]] = {}
+    for runs in job.batches():
+        timing = durations.get(runs)
+        if timing is None:
+            duration_minutes = assignment.effective_minutes_per_run * Decimal(runs)
+            duration_minutes = duration_minutes.quantize(_MINUTE_QUANTUM)
+            if duration_minutes <= ZERO:
+                raise PlanningError("Computed duration must be positive")
+            timing = durations[runs] = (duration_minutes, _minutes_to_micros(duration_minutes))
+        duration_minutes, duration = timing
+        free_at, slot_index = slot_heap[0]
+        slot_end = free_at + duration
+        batch = ScheduledBatch(
+            job_id=job.job_id,
+            runs=runs,
+            start=start + timedelta(microseconds=free_at),
+            end=start + timedelta(microseconds=slot_end),
+            slot_index=slot_index,
+            activity=activity,
+            duration_minutes=duration_minutes,
+            type_id=job.type_id,
+            structure_id=structure_id,
+            structure_name=structure_name,
+        )
+        if slot_end > window:
+            overflow.append(batch)
+        else:
+            placed.append(batch)
+            heapq.heapreplace(slot_heap, (slot_end, slot_index))
+    return placed, overflow
+
+
+def _sort_tasks(tasks: list[ScheduledBatch]) -> None:
+    tasks.sort(key=lambda t: (t.start, t.slot_index, t.job_id))
+
+
+def _free_slots(schedule: ActivitySchedule | None) -> list[tuple[int, int]]:
+    return [(0, idx) for idx in range(schedule.slots)] if schedule is not None else []
+
+
 def plan_window(
     start: datetime,
     end: datetime,
@@ -190,97 +389,644 @@ def plan_window(
         raise PlanningError("End must be after start")
     assignments, unassigned = recommend_assignments(jobs, characters, facilities)
 
-    schedules: Dict[int, CharacterSchedule] = {}
-    availability: Dict[int, Dict[str, list[datetime]]] = {}
+    schedules = _empty_schedules(characters)
+    timelines: Dict[tuple[int, str], list[tuple[int, Assignment]]] = {}
+    for position, assignment in enumerate(assignments):
+        key = (assignment.character.character_id, assignment.job.activity)
+        timelines.setdefault(key, []).append((position, assignment))
 
-    for character in characters:
-        activities: Dict[str, ActivitySchedule] = {}
-        availability[character.character_id] = {}
-        for activity, slot_count in character.activity_slots.items():
-            slots = max(0, int(slot_count))
-            activities[activity] = ActivitySchedule(slots=slots)
-            availability[character.character_id][activity] = [start for _ in range(slots)]
-        schedules[character.character_id] = CharacterSchedule(character=character, activities=activities)
+    overflow_by_position: Dict[int, list[ScheduledBatch]] = {}
+    for (character_id, activity), members in timelines.items():
+        schedule = schedules[character_id].activities.get(activity)
+        slot_heap = _free_slots(schedule)
+        for position, assignment in members:
+            placed, spilled = _place_batches(start, end, schedule, slot_heap, assignment)
+            if placed:
+                schedule.tasks.extend(placed)  # type: ignore[union-attr]
+            if spilled:
+                overflow_by_position[position] = spilled
+        if schedule is not None:
+            _sort_tasks(schedule.tasks)
+    overflow = [
+        batch
+        for position in range(len(assignments))
+        for batch in overflow_by_position.get(position, ())
+    ]
 
-    overflow: list[ScheduledBatch] = []
+    return PlanResult(
+        start=start,
+        end=end,
+        assignments=assignments,
+        characters=schedules,
+        overflow=overflow,
+        unassigned=unassigned,
+    )
 
-    for assignment in assignments:
-        character = assignment.character
-        activity = assignment.job.activity
-        char_schedule = schedules[character.character_id]
-        activity_schedule = char_schedule.activities.get(activity)
-        if activity_schedule is None or activity_schedule.slots <= 0:
-            overflow.append(
-                ScheduledBatch(
-                    job_id=assignment.job.job_id,
-                    runs=assignment.job.runs,
-                    start=end,
-                    end=end,
-                    slot_index=-1,
-                    activity=activity,
-                    duration_minutes=Decimal("0"),
-                    type_id=assignment.job.type_id,
-                    structure_id=assignment.facility.structure_id if assignment.facility else None,
-                    structure_name=assignment.facility.name if assignment.facility else None,
-                )
-            )
-            continue
 
-        slot_times = availability[character.character_id][activity]
-        for runs in assignment.job.batches():
-            if not slot_times:
-                overflow.append(
-                    ScheduledBatch(
-                        job_id=assignment.job.job_id,
-                        runs=runs,
-                        start=end,
-                        end=end,
-                        slot_index=-1,
-                        activity=activity,
-                        duration_minutes=Decimal("0"),
-                        type_id=assignment.job.type_id,
-                        structure_id=assignment.facility.structure_id if assignment.facility else None,
-                        structure_name=assignment.facility.name if assignment.facility else None,
+def plan_metrics(result: PlanResult) -> PlanMetrics:
+    """Summarize runs placed and slot time used by a plan."""
+
+    runs = 0
+    busy = ZERO
+    slots = 0
+    last = result.start
+    for plan in result.characters.values():
+        for schedule in plan.activities.values():
+            slots += schedule.slots
+            for task in schedule.tasks:
+                runs += int(task.runs)
+                busy += task.duration_minutes
+                if task.end > last:
+                    last = task.end
+    capacity = Decimal(_micros_between(result.start, result.end) * slots) / _MICROS_PER_MINUTE
+    utilization = (busy / capacity).quantize(_MINUTE_QUANTUM) if capacity > ZERO else ZERO
+    makespan = Decimal(_micros_between(result.start, last)) / _MICROS_PER_MINUTE
+    return PlanMetrics(
+        runs=runs,
+        overflow_runs=sum(int(task.runs) for task in result.overflow),
+        busy_minutes=busy,
+        capacity_minutes=capacity.quantize(_MINUTE_QUANTUM),
+        utilization=utilization,
+        makespan_minutes=makespan.quantize(_MINUTE_QUANTUM),
+    )
+
+
+@dataclass(eq=False)
+class _Unit:
+    """A batch to place, with its duration on each character able to run it."""
+
+    assignment: Assignment
+    order: int  # position of the job in assignment order
+    runs: int
+    minutes: list[Decimal]  # by character position in the activity index
+    micros: list[int]
+    tier_micros: list[int]  # by distinct character multiplier, ascending
+
+    @property
+    def rank(self) -> tuple[int, int]:
+        return self.assignment.job.priority, self.order
+
+
+class _SlotPacker:
+    """Place one activity's batches on (character, slot) machines within a window.
+
+    Batches go longest-first (within priority) to the machine where they finish
+    earliest (LPT list scheduling). Local search then moves or swaps batches
+    off the most loaded machine and re-inserts overflow into freed capacity
+    until no move helps or the deadline passes.
+    """
+
+    def __init__(self, slots_by_character: Sequence[int], window: int) -> None:
+        self.machines = [
+            (pos, slot) for pos, count in enumerate(slots_by_character) for slot in range(count)
+        ]
+        self.loads = [0] * len(self.machines)
+        self.placed: list[list[_Unit]] = [[] for _ in self.machines]
+        self.overflow: list[_Unit] = []
+        self.window = window
+        self._slots_by_character = slots_by_character
+
+    def _duration(self, unit: _Unit, machine: int) -> int:
+        return unit.micros[self.machines[machine][0]]
+
+    def _place(self, unit: _Unit, machine: int) -> None:
+        self.placed[machine].append(unit)
+        self.loads[machine] += self._duration(unit, machine)
+
+    def _remove(self, unit: _Unit, machine: int) -> None:
+        self.placed[machine].remove(unit)
+        self.loads[machine] -= self._duration(unit, machine)
+
+    def list_schedule(
+        self,
+        units: Sequence[_Unit],
+        tier_of: Sequence[int],
+        deadline: float,
+        clock: Callable[[], float],
+    ) -> bool:
+        """Place `units` longest-first; False when the deadline passed first."""
+
+        # Slots of a character are interchangeable, and so are characters sharing a
+        # time multiplier (tier): keep a heap of (load, machine) per character and
+        # of (earliest free slot, position) per tier. Machines are numbered in
+        # character order, so (finish, position) picks the lowest machine on ties.
+        slot_heaps: list[list[tuple[int, int]]] = []
+        machine = 0
+        for count in self._slots_by_character:
+            slot_heaps.append([(0, machine + slot) for slot in range(count)])
+            machine += count
+        tier_heaps: list[list[tuple[int, int]]] = [[] for _ in range(max(tier_of, default=-1) + 1)]
+        for pos, tier in enumerate(tier_of):
+            tier_heaps[tier].append((0, pos))
+        ordered = sorted(
+            units, key=lambda u: (u.assignment.job.priority, -min(u.tier_micros), u.order)
+        )
+        for unit in ordered:
+            if clock() >= deadline:
+                return False
+            best: tuple[int, int, int] | None = None
+            for tier, heap in enumerate(tier_heaps):
+                head, pos = heap[0]
+                candidate = (head + unit.tier_micros[tier], pos, tier)
+                if best is None or candidate < best:
+                    best = candidate
+            if best is None or best[0] > self.window:
+                self.overflow.append(unit)
+                continue
+            finish, pos, tier = best
+            machine = slot_heaps[pos][0][1]
+            heapq.heapreplace(slot_heaps[pos], (finish, machine))
+            heapq.heapreplace(tier_heaps[tier], (slot_heaps[pos][0][0], pos))
+            self._place(unit, machine)
+        return True
+
+    def improve(self, deadline: float, clock: Callable[[], float]) -> bool:
+        """Apply moves until none helps; False when the deadline stopped the search."""
+
+        while clock() < deadline:
+            if self._fit_overflow(deadline, clock) or self._shave_makespan(deadline, clock):
+                continue
+            # The move scans also give up at the deadline, so check it once more
+            return clock() < deadline
+        return False
+
+    def _fit_overflow(self, deadline: float, clock: Callable[[], float]) -> bool:
+        for unit in sorted(self.overflow, key=lambda u: u.rank):
+            if clock() >= deadline:
+                return False
+            fits = [
+                m
+                for m in range(len(self.machines))
+                if self.loads[m] + self._duration(unit, m) <= self.window
+            ]
+            if fits:
+                machine = min(fits, key=lambda m: (self.loads[m] + self._duration(unit, m), m))
+                self.overflow.remove(unit)
+                self._place(unit, machine)
+                return True
+            # Make room by relocating one batch to another machine with spare time
+            for machine in sorted(range(len(self.machines)), key=lambda m: (self.loads[m], m)):
+                if clock() >= deadline:
+                    return False
+                need = self.loads[machine] + self._duration(unit, machine) - self.window
+                for other in self.placed[machine]:
+                    if self._duration(other, machine) < need:
+                        continue
+                    target = self._relocation_target(other, exclude=machine)
+                    if target is not None:
+                        self._remove(other, machine)
+                        self._place(other, target)
+                        self.overflow.remove(unit)
+                        self._place(unit, machine)
+                        return True
+        return False
+
+    def _relocation_target(self, unit: _Unit, exclude: int) -> int | None:
+        best: tuple[int, int] | None = None
+        for machine in range(len(self.machines)):
+            if machine == exclude:
+                continue
+            finish = self.loads[machine] + self._duration(unit, machine)
+            if finish <= self.window and (best is None or (finish, machine) < best):
+                best = (finish, machine)
+        return best[1] if best else None
+
+    def _shave_makespan(self, deadline: float, clock: Callable[[], float]) -> bool:
+        if not self.machines:
+            return False
+        peak = max(range(len(self.machines)), key=lambda m: (self.loads[m], -m))
+        top = self.loads[peak]
+        best_move: tuple[int, int, _Unit] | None = None
+        for unit in self.placed[peak]:
+            remaining = top - self._duration(unit, peak)
+            for machine in range(len(self.machines)):
+                if machine == peak:
+                    continue
+                score = max(remaining, self.loads[machine] + self._duration(unit, machine))
+                if score < top and (best_move is None or (score, machine) < best_move[:2]):
+                    best_move = (score, machine, unit)
+        if best_move is not None:
+            _, machine, unit = best_move
+            self._remove(unit, peak)
+            self._place(unit, machine)
+            return True
+        for machine in range(len(self.machines)):
+            if machine == peak:
+                continue
+            if clock() >= deadline:
+                return False
+            for unit in self.placed[peak]:
+                for other in self.placed[machine]:
+                    peak_after = top - self._duration(unit, peak) + self._duration(other, peak)
+                    other_after = (
+                        self.loads[machine]
+                        - self._duration(other, machine)
+                        + self._duration(unit, machine)
                     )
+                    if peak_after < top and other_after < top:
+                        self._remove(unit, peak)
+                        self._remove(other, machine)
+                        self._place(other, peak)
+                        self._place(unit, machine)
+                        return True
+        return False
+
+
+def optimize_window(
+    start: datetime,
+    end: datetime,
+    jobs: Sequence[Job],
+    characters: Sequence[Character],
+    facilities: Sequence[Facility],
+    *,
+    time_budget: float = 0.2,
+    clock: Callable[[], float] = time.perf_counter,
+) -> OptimizedPlan:
+    """Plan the window balancing batches across every capable character's slots.
+
+    Unlike `plan_window`, which sends each job to its single fastest
+    character, batches may go to any character with slots for the activity
+    (on the fastest facility), aiming to fit more runs and shorten the
+    makespan. The greedy plan is returned instead when it places at least as
+    many runs with no longer makespan; both plans' metrics are reported.
+
+    The greedy pass is always computed first and is not charged against
+    `time_budget` (seconds), which bounds the search that follows. If the
+    budget runs out before the batches are placed the greedy plan is returned
+    as is; otherwise the best plan found so far is used. Search stops early
+    enough to leave time, estimated from pricing the batches, for assembling
+    the optimized result. `completed` is False whenever the budget cut the
+    search short, and `elapsed_seconds` reports the time of the whole call.
+    """
+
+    started = clock()
+    greedy = plan_window(start, end, jobs, characters, facilities)
+    greedy_metrics = plan_metrics(greedy)
+    deadline = clock() + max(0.0, time_budget)
+
+    def keep_greedy(completed: bool) -> OptimizedPlan:
+        return OptimizedPlan(
+            result=greedy,
+            greedy=greedy_metrics,
+            optimized=greedy_metrics,
+            improved=False,
+            elapsed_seconds=clock() - started,
+            completed=completed,
+        )
+
+    ordered_characters = sorted(characters, key=lambda c: c.character_id)
+    window = _micros_between(start, end)
+    units_by_activity: Dict[str, list[_Unit]] = {}
+    indexes: Dict[str, _ActivityIndex] = {}
+    tiers_by_activity: Dict[str, list[int]] = {}  # tier of each character position
+    pricing_started = clock()
+    for order, assignment in enumerate(greedy.assignments):
+        if clock() >= deadline:
+            return keep_greedy(completed=False)
+        job = assignment.job
+        index = indexes.get(job.activity)
+        if index is None:
+            index = indexes[job.activity] = _index_activity(job.activity, ordered_characters)
+        facility_multiplier = _facility_multiplier(assignment.facility)
+        per_run = _as_decimal(job.per_run_minutes)
+        tier_of = tiers_by_activity.get(job.activity)
+        if tier_of is None:
+            position_of_tier = {multiplier: i for i, (multiplier, _) in enumerate(index.tiers)}
+            tier_of = tiers_by_activity[job.activity] = [
+                position_of_tier[m] for _, m in index.characters
+            ]
+        # Batches of a job share a few sizes, and characters a few multipliers:
+        # price each (size, multiplier) once and share the lists between batches
+        timings: Dict[int, tuple[list[Decimal], list[int], list[int]]] = {}
+        for runs in job.batches():
+            timing = timings.get(runs)
+            if timing is None:
+                n = Decimal(runs)
+                tier_minutes = [
+                    (per_run * multiplier * facility_multiplier * n).quantize(_MINUTE_QUANTUM)
+                    for multiplier, _ in index.tiers
+                ]
+                if any(m <= ZERO for m in tier_minutes):
+                    raise PlanningError("Computed duration must be positive")
+                tier_micros = [_minutes_to_micros(m) for m in tier_minutes]
+                timing = timings[runs] = (
+                    [tier_minutes[t] for t in tier_of],
+                    [tier_micros[t] for t in tier_of],
+                    tier_micros,
+                )
+            units_by_activity.setdefault(job.activity, []).append(
+                _Unit(
+                    assignment=assignment,
+                    order=order,
+                    runs=runs,
+                    minutes=timing[0],
+                    micros=timing[1],
+                    tier_micros=timing[2],
                 )
-                continue
-            slot_index = min(range(len(slot_times)), key=lambda idx: (slot_times[idx], idx))
-            slot_start = slot_times[slot_index]
-            if slot_start < start:
-                slot_start = start
-            duration_minutes = assignment.effective_minutes_per_run * Decimal(runs)
-            duration_minutes = duration_minutes.quantize(Decimal("0.0001"))
-            if duration_minutes <= ZERO:
-                raise PlanningError("Computed duration must be positive")
-            slot_end = slot_start + timedelta(minutes=float(duration_minutes))
-            batch = ScheduledBatch(
-                job_id=assignment.job.job_id,
-                runs=runs,
-                start=slot_start,
-                end=slot_end,
-                slot_index=slot_index,
-                activity=activity,
-                duration_minutes=duration_minutes,
-                type_id=assignment.job.type_id,
-                structure_id=assignment.facility.structure_id if assignment.facility else None,
-                structure_name=assignment.facility.name if assignment.facility else None,
             )
-            if slot_end > end:
-                overflow.append(batch)
-            else:
-                activity_schedule.tasks.append(batch)
-                slot_times[slot_index] = slot_end
+
+    # Writing the batches out (and measuring the result) costs up to twice what
+    # pricing them did: keep that much of the budget in hand
+    search_deadline = deadline - 2 * (clock() - pricing_started)
+    schedules = _empty_schedules(characters)
+    overflow: list[ScheduledBatch] = []
+    used: Dict[int, set[int]] = {}  # assignment order -> character positions used
+    completed = True
+
+    for activity, units in units_by_activity.items():
+        index = indexes[activity]
+        packer = _SlotPacker([c.slots_for(activity) for c, _ in index.characters], window)
+        if not packer.list_schedule(units, tiers_by_activity[activity], search_deadline, clock):
+            return keep_greedy(completed=False)
+        completed = packer.improve(search_deadline, clock) and completed
+
+        for machine, (pos, slot_index) in enumerate(packer.machines):
+            character = index.characters[pos][0]
+            tasks = schedules[character.character_id].activities[activity].tasks
+            offset = 0
+            for unit in sorted(packer.placed[machine], key=lambda u: u.rank):
+                batch_start = start + timedelta(microseconds=offset)
+                offset += unit.micros[pos]
+                batch_end = start + timedelta(microseconds=offset)
+                tasks.append(
+                    _scheduled(unit, batch_start, batch_end, slot_index, unit.minutes[pos])
+                )
+                used.setdefault(unit.order, set()).add(pos)
+        for unit in sorted(packer.overflow, key=lambda u: u.rank):
+            overflow.append(_scheduled(unit, end, end, -1, Decimal("0")))
 
     for plan in schedules.values():
         for schedule in plan.activities.values():
-            schedule.tasks.sort(key=lambda t: (t.start, t.slot_index, t.job_id))
+            _sort_tasks(schedule.tasks)
 
-    return PlanResult(
+    assignments: list[Assignment] = []
+    for order, assignment in enumerate(greedy.assignments):
+        positions = used.get(order)
+        if not positions:
+            assignments.append(assignment)
+            continue
+        index = indexes[assignment.job.activity]
+        facility_multiplier = _facility_multiplier(assignment.facility)
+        per_run = _as_decimal(assignment.job.per_run_minutes)
+        for pos in sorted(positions):
+            character, multiplier = index.characters[pos]
+            assignments.append(
+                Assignment(
+                    job=assignment.job,
+                    character=character,
+                    facility=assignment.facility,
+                    effective_minutes_per_run=per_run * multiplier * facility_multiplier,
+                    effective_multiplier=multiplier * facility_multiplier,
+                )
+            )
+
+    optimized = PlanResult(
         start=start,
         end=end,
         assignments=assignments,
         characters=schedules,
         overflow=overflow,
-        unassigned=unassigned,
+        unassigned=greedy.unassigned,
+    )
+    metrics = plan_metrics(optimized)
+    improved = (metrics.runs, -metrics.makespan_minutes) > (
+        greedy_metrics.runs,
+        -greedy_metrics.makespan_minutes,
+    )
+    if not improved:
+        return keep_greedy(completed)
+    return OptimizedPlan(
+        result=optimized,
+        greedy=greedy_metrics,
+        optimized=metrics,
+        improved=True,
+        elapsed_seconds=clock() - started,
+        completed=completed,
     )
 
+
+def _scheduled(
+    unit: _Unit, start: datetime, end: datetime, slot_index: int, minutes: Decimal
+) -> ScheduledBatch:
+    job = unit.assignment.job
+    facility = unit.assignment.facility
+    return ScheduledBatch(
+        job_id=job.job_id,
+        runs=unit.runs,
+        start=start,
+        end=end,
+        slot_index=slot_index,
+        activity=job.activity,
+        duration_minutes=minutes,
+        type_id=job.type_id,
+        structure_id=facility.structure_id if facility else None,
+        structure_name=facility.name if facility else None,
+    )
+
+
+TimelineKey = tuple[int, str]  # (character_id, activity)
+
+
+def _assignment_order(assignment: Assignment) -> tuple[int, str]:
+    return assignment.job.priority, assignment.job.job_id
+
+
+class IncrementalPlanner:
+    """A `plan_window` plan kept current under job and character changes.
+
+    After construction and every `update`, `result` equals `plan_window`
+    over the current jobs and characters, but only (character, activity)
+    timelines whose assignments or slots changed are re-allocated. Timelines
+    are independent in the greedy planner: each job's batches only compete
+    for the slots of its assigned character and activity.
+
+    Job and character ids must be unique. Updates are all-or-nothing: on
+    `PlanningError` the previous plan is kept.
+    """
+
+    def __init__(
+        self,
+        start: datetime,
+        end: datetime,
+        jobs: Sequence[Job],
+        characters: Sequence[Character],
+        facilities: Sequence[Facility],
+    ) -> None:
+        if end <= start:
+            raise PlanningError("End must be after start")
+        self.start = start
+        self.end = end
+        self._facilities = list(facilities)
+        self._jobs: Dict[str, Job] = {}
+        self._characters: Dict[int, Character] = {}
+        self._assignments: Dict[str, Assignment] = {}
+        self._overflow: Dict[str, list[ScheduledBatch]] = {}
+        self._schedules: Dict[int, CharacterSchedule] = {}
+        self._timelines: Dict[TimelineKey, _TimelineState] = {}
+        self.result = PlanResult(
+            start=start, end=end, assignments=[], characters={}, overflow=[], unassigned=[]
+        )
+        self.update(upsert_jobs=jobs, upsert_characters=characters)
+
+    @property
+    def jobs(self) -> list[Job]:
+        return list(self._jobs.values())
+
+    @property
+    def characters(self) -> list[Character]:
+        return list(self._characters.values())
+
+    def update(
+        self,
+        *,
+        upsert_jobs: Sequence[Job] = (),
+        remove_jobs: Sequence[str] = (),
+        upsert_characters: Sequence[Character] = (),
+        remove_characters: Sequence[int] = (),
+    ) -> set[TimelineKey]:
+        """Apply a diff and return the (character_id, activity) timelines re-planned.
+
+        Upserting an existing id replaces it in place; new ids are appended.
+        Removing an unknown id, or listing an id twice, raises `PlanningError`.
+        """
+
+        jobs = dict(self._jobs)
+        for job_id in remove_jobs:
+            if jobs.pop(job_id, None) is None:
+                raise PlanningError(f"Unknown job_id {job_id}")
+        _check_unique([job.job_id for job in upsert_jobs], "job_id")
+        jobs.update((job.job_id, job) for job in upsert_jobs)
+
+        characters = dict(self._characters)
+        changed_characters: set[int] = set()
+        for character_id in remove_characters:
+            if characters.pop(character_id, None) is None:
+                raise PlanningError(f"Unknown character_id {character_id}")
+            changed_characters.add(character_id)
+        _check_unique([c.character_id for c in upsert_characters], "character_id")
+        for character in upsert_characters:
+            if characters.get(character.character_id) != character:
+                characters[character.character_id] = character
+                changed_characters.add(character.character_id)
+
+        # A job's assignment depends only on the job, characters and facilities
+        if changed_characters:
+            rescored = list(jobs.values())
+        else:
+            rescored = [job for job in upsert_jobs if self._jobs.get(job.job_id) != job]
+        fresh, _ = recommend_assignments(rescored, list(characters.values()), self._facilities)
+        assignments = {job_id: a for job_id, a in self._assignments.items() if job_id in jobs}
+        for job in rescored:
+            assignments.pop(job.job_id, None)
+        assignments.update((a.job.job_id, a) for a in fresh)
+
+        affected: set[TimelineKey] = set()
+        for job_id in set(self._assignments) | set(assignments):
+            before = self._assignments.get(job_id)
+            after = assignments.get(job_id)
+            if before != after:
+                affected.update(_timeline(a) for a in (before, after) if a is not None)
+        members: Dict[TimelineKey, list[Assignment]] = {}
+        for assignment in sorted(assignments.values(), key=_assignment_order):
+            members.setdefault(_timeline(assignment), []).append(assignment)
+        affected.update(key for key in members if key[0] in changed_characters)
+
+        # Fresh schedules for changed characters and re-planned timelines; the rest is reused
+        schedules: Dict[int, CharacterSchedule] = {}
+        for character_id, character in characters.items():
+            previous = self._schedules.get(character_id)
+            if previous is None or character_id in changed_characters:
+                schedules[character_id] = _empty_schedules([character])[character_id]
+                continue
+            activities = dict(previous.activities)
+            for activity, schedule in previous.activities.items():
+                if (character_id, activity) in affected:
+                    activities[activity] = ActivitySchedule(slots=schedule.slots)
+            schedules[character_id] = CharacterSchedule(character=character, activities=activities)
+
+        overflow = {
+            job_id: batches for job_id, batches in self._overflow.items() if job_id in assignments
+        }
+        timelines = {
+            key: state
+            for key, state in self._timelines.items()
+            if key in members and key not in affected
+        }
+        for key in affected:
+            if key not in members:
+                continue
+            character_id, activity = key
+            schedule = schedules[character_id].activities.get(activity)
+            previous = None if character_id in changed_characters else self._timelines.get(key)
+            state = timelines[key] = self._replan(schedule, previous, members[key], overflow)
+            if schedule is not None:
+                schedule.tasks = [batch for batches in state.placed for batch in batches]
+                _sort_tasks(schedule.tasks)
+
+        ordered = sorted(assignments.values(), key=_assignment_order)
+        self._jobs = jobs
+        self._characters = characters
+        self._assignments = assignments
+        self._overflow = overflow
+        self._schedules = schedules
+        self._timelines = timelines
+        self.result = PlanResult(
+            start=self.start,
+            end=self.end,
+            assignments=ordered,
+            characters=schedules,
+            overflow=[batch for a in ordered for batch in overflow.get(a.job.job_id, ())],
+            unassigned=sorted(
+                (job for job in jobs.values() if job.job_id not in assignments),
+                key=lambda j: (j.priority, j.job_id),
+            ),
+        )
+        return affected
+
+    def _replan(
+        self,
+        schedule: ActivitySchedule | None,
+        previous: _TimelineState | None,
+        members: list[Assignment],
+        overflow: Dict[str, list[ScheduledBatch]],
+    ) -> _TimelineState:
+        # Members run in (priority, job_id) order, so a diff usually leaves a prefix
+        # untouched: resume from the slot heap checkpointed after that prefix
+        common = 0
+        if previous is not None:
+            limit = min(len(previous.members), len(members))
+            while common < limit and previous.members[common] == members[common]:
+                common += 1
+        heaps = previous.heaps[:common] if previous is not None else []
+        placed = previous.placed[:common] if previous is not None else []
+        slot_heap = list(heaps[-1]) if heaps else _free_slots(schedule)
+        for assignment in members[common:]:
+            batches, spilled = _place_batches(self.start, self.end, schedule, slot_heap, assignment)
+            heaps.append(list(slot_heap))
+            placed.append(batches)
+            if spilled:
+                overflow[assignment.job.job_id] = spilled
+            else:
+                overflow.pop(assignment.job.job_id, None)
+        return _TimelineState(members=members, heaps=heaps, placed=placed)
+
+
+@dataclass
+class _TimelineState:
+    """One timeline's allocation, checkpointed after each member job."""
+
+    members: list[Assignment]  # in allocation order
+    heaps: list[list[tuple[int, int]]]  # slot heap after each member
+    placed: list[list[ScheduledBatch]]  # batches each member fitted in the window
+
+
+def _timeline(assignment: Assignment) -> TimelineKey:
+    return assignment.character.character_id, assignment.job.activity
+
+
+def _check_unique(ids: Sequence[Hashable], label: str) -> None:
+    seen: set[Hashable] = set()
+    for item in ids:
+        if item in seen:
+            raise PlanningError(f"Duplicate {label} {item}")
+        seen.add(item)
@@ -4,9 +4,11 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import ROUND_HALF_UP, Decimal
 from typing import Callable, Mapping, Sequence
 
+import numpy as np
+
 ZERO = Decimal("0")
 ONE = Decimal("1")
 
@@ -39,6 +41,21 @@ class SPPResult:
     diagnostics: SPPDiagnostics
 
 
+@dataclass(frozen=True)
+class SPPGrid:
+    """SPP⁺ over every (lead time, horizon) pair; 2-D arrays are indexed [lead, horizon]."""
+
+    lead_time_days: np.ndarray
+    horizon_days: np.ndarray
+    spp: np.ndarray
+    recommended_batch: np.ndarray
+    queue_at_listing: np.ndarray
+    demand_over_horizon: np.ndarray
+    drift_adjustment: np.ndarray
+    spread_adjustment: np.ndarray
+    volatility_adjustment: np.ndarray
+
+
 BatchOptions = Sequence[int]
 ForecastFunc = Callable[[datetime], DepthForecast]
 
@@ -68,7 +85,30 @@ def spp_lead_time_aware(
 
     now = clock() if clock else datetime.utcnow()
     forecast = dv_forecast_fn(now + timedelta(days=float(lead_time_days)))
+    return _spp_from_forecast(
+        forecast,
+        depth_ahead_now,
+        lead_time_days,
+        horizon_days,
+        drift_rate,
+        price_policy,
+        spread_at_list,
+        vol_stdev_at_list,
+        batch_options,
+    )
+
 
+def _spp_from_forecast(
+    forecast: DepthForecast,
+    depth_ahead_now: int,
+    lead_time_days: Decimal,
+    horizon_days: Decimal,
+    drift_rate: Decimal,
+    price_policy: PricePolicy,
+    spread_at_list: Decimal,
+    vol_stdev_at_list: Decimal,
+    batch_options: BatchOptions,
+) -> SPPResult:
     depth_now = Decimal(depth_ahead_now)
     demand_until_listing = forecast.expected_daily_demand * lead_time_days
     projected_new_listings = forecast.expected_new_listings * lead_time_days
@@ -86,12 +126,9 @@ def spp_lead_time_aware(
     if drift_adjustment < Decimal("0.1"):
         drift_adjustment = Decimal("0.1")
 
-    spread_delta = spread_at_list - price_policy.minimum_spread
-    spread_adjustment = _clamp(ONE - (spread_delta * Decimal("0.5")), Decimal("0.1"), ONE)
-    if spread_adjustment > ONE:
-        spread_adjustment = ONE
-
-    volatility_adjustment = _clamp(ONE - (vol_stdev_at_list * Decimal("0.3")), Decimal("0.2"), ONE)
+    spread_adjustment, volatility_adjustment = _market_adjustments(
+        price_policy, spread_at_list, vol_stdev_at_list
+    )
 
     spp_value = _clamp(base_probability * drift_adjustment * spread_adjustment * volatility_adjustment)
     spp_value = _quantize(spp_value)
@@ -109,6 +146,138 @@ def spp_lead_time_aware(
     return SPPResult(spp=spp_value, recommended_batch=batch, diagnostics=diagnostics)
 
 
+def _market_adjustments(
+    price_policy: PricePolicy, spread_at_list: Decimal, vol_stdev_at_list: Decimal
+) -> tuple[Decimal, Decimal]:
+    spread_delta = spread_at_list - price_policy.minimum_spread
+    spread_adjustment = _clamp(ONE - (spread_delta * Decimal("0.5")), Decimal("0.1"), ONE)
+    volatility_adjustment = _clamp(ONE - (vol_stdev_at_list * Decimal("0.3")), Decimal("0.2"), ONE)
+    return spread_adjustment, volatility_adjustment
+
+
+def spp_grid(
+    depth_ahead_now: int,
+    dv_forecast_fn: ForecastFunc,
+    lead_time_days: Sequence[Decimal | float],
+    horizon_days: Sequence[Decimal | float],
+    drift_rate: Decimal,
+    price_policy: PricePolicy,
+    spread_at_list: Decimal,
+    vol_stdev_at_list: Decimal,
+    batch_options: BatchOptions,
+    clock: Callable[[], datetime] | None = None,
+) -> SPPGrid:
+    """Evaluate `spp_lead_time_aware` for every lead time x horizon pair at once.
+
+    The forecast is sampled once per lead time and the whole grid, including
+    the batch choice over `batch_options`, is computed as float64 arrays.
+    Values are rounded half-up to four places like the Decimal version. Cells
+    where float error could land on the wrong side of a rounding tie (or of a
+    batch option) are recomputed in Decimal, so every cell reads the same as
+    `spp_lead_time_aware`.
+    """
+
+    if not batch_options:
+        raise ValueError("batch_options must contain at least one value")
+    now = clock() if clock else datetime.utcnow()
+    lead_decimals = [_as_decimal(v) for v in lead_time_days]
+    horizon_decimals = [_as_decimal(v) for v in horizon_days]
+    leads = np.asarray([float(v) for v in lead_decimals], dtype=np.float64)
+    horizons = np.asarray([float(v) for v in horizon_decimals], dtype=np.float64)
+    forecasts = [dv_forecast_fn(now + timedelta(days=lead)) for lead in leads.tolist()]
+    demand = np.asarray([float(f.expected_daily_demand) for f in forecasts])[:, None]
+    listings = np.asarray([float(f.expected_new_listings) for f in forecasts])[:, None]
+    lead_col = leads[:, None]
+
+    queue = np.maximum(float(depth_ahead_now) + (listings - demand) * lead_col, 0.0)
+    queue = np.broadcast_to(queue, (leads.size, horizons.size))
+    demand_over_horizon = demand * horizons[None, :]
+    has_demand = demand_over_horizon > 0.0
+    base = np.ones_like(demand_over_horizon)
+    np.divide(demand_over_horizon, demand_over_horizon + queue, out=base, where=has_demand)
+
+    drift = np.maximum(1.0 + float(drift_rate) * horizons, 0.1)[None, :]
+    spread_dec, vol_dec = _market_adjustments(price_policy, spread_at_list, vol_stdev_at_list)
+    spread_adj, vol_adj = float(spread_dec), float(vol_dec)
+
+    raw_spp = np.clip(base * drift * spread_adj * vol_adj, 0.0, 1.0)
+    spp = _round4(raw_spp)
+
+    # Same rule as recommend_batch_size: first option with the strictly highest
+    # positive expected fills, otherwise the first option
+    options = np.asarray(batch_options, dtype=np.float64)
+    fills = np.minimum(options[None, None, :], demand_over_horizon[:, :, None]) * spp[:, :, None]
+    best = np.argmax(fills, axis=2)
+    best[np.take_along_axis(fills, best[:, :, None], axis=2)[:, :, 0] <= 0.0] = 0
+    batch = np.asarray(batch_options, dtype=np.int64)[best]
+
+    shape = spp.shape
+    drift = np.broadcast_to(drift, shape)
+    queue_scale = float(depth_ahead_now) + (np.abs(listings) + np.abs(demand)) * lead_col
+    suspect = (
+        _near_tie(raw_spp)
+        | _near_tie(queue, np.broadcast_to(queue_scale, shape))
+        | _near_tie(demand_over_horizon)
+        | _near_tie(drift, 1.0 + np.abs(float(drift_rate) * horizons)[None, :])
+        | np.any(
+            np.abs(demand_over_horizon[:, :, None] - options[None, None, :])
+            <= 1e-9 * np.maximum(np.abs(demand_over_horizon[:, :, None]), 1.0),
+            axis=2,
+        )
+    )
+    grid = SPPGrid(
+        lead_time_days=leads,
+        horizon_days=horizons,
+        spp=spp,
+        recommended_batch=batch,
+        queue_at_listing=_round4(queue),
+        demand_over_horizon=_round4(demand_over_horizon),
+        drift_adjustment=_round4(drift),
+        spread_adjustment=np.full(shape, float(_quantize(spread_dec))),
+        volatility_adjustment=np.full(shape, float(_quantize(vol_dec))),
+    )
+    for i, j in zip(*np.nonzero(suspect), strict=True):
+        exact = _spp_from_forecast(
+            forecasts[i],
+            depth_ahead_now,
+            lead_decimals[i],
+            horizon_decimals[j],
+            drift_rate,
+            price_policy,
+            spread_at_list,
+            vol_stdev_at_list,
+            batch_options,
+        )
+        diag = exact.diagnostics
+        grid.spp[i, j] = float(exact.spp)
+        grid.recommended_batch[i, j] = exact.recommended_batch
+        grid.queue_at_listing[i, j] = float(diag.queue_at_listing)
+        grid.demand_over_horizon[i, j] = float(diag.demand_over_horizon)
+        grid.drift_adjustment[i, j] = float(diag.drift_adjustment)
+    return grid
+
+
+def _as_decimal(value: Decimal | float) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(repr(float(value)))
+
+
+def _round4(values: np.ndarray) -> np.ndarray:
+    # ROUND_HALF_UP (away from zero) to 0.0001, matching _quantize away from ties
+    return np.sign(values) * np.floor(np.abs(values) * 10_000 + 0.5) / 10_000
+
+
+def _near_tie(values: np.ndarray, magnitude: np.ndarray | float | None = None) -> np.ndarray:
+    """Cells whose float value may round differently from the exact Decimal value.
+
+    `magnitude` bounds the terms the value was computed from; float error scales
+    with it, which matters where large terms cancel (e.g. queue at listing).
+    """
+
+    scaled = np.abs(values) * 10_000
+    bound = scaled if magnitude is None else np.abs(magnitude) * 10_000
+    return np.abs(scaled - np.floor(scaled) - 0.5) <= 1e-4 + bound * 1e-12
+
+
 def recommend_batch_size(
     batch_options: BatchOptions,
     spp_value: Decimal,
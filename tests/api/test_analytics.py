@@ -26,3 +26,67 @@ def test_spp_plus_endpoint_ok() -> None:
     data = resp.json()
     assert "spp" in data and "recommended_batch" in data
 
+
+def test_indicators_endpoint_history(monkeypatch) -> None:
+    from decimal import Decimal
+
+    from app.services import analytics as svc
+
+    prices = [Decimal(str(v)) for v in [100, 102, 101, 103, 104, 106]]
+    monkeypatch.setattr(svc, "_fetch_price_series", lambda conn, r, t, limit: prices[-limit:])
+    monkeypatch.setattr(
+        svc, "_get_engine", lambda *_: type("E", (), {"connect": lambda self: _NullConn()})()
+    )
+    resp = client.get(
+        "/analytics/indicators",
+        params={"type_id": 34, "region_id": 10000002, "window": 3, "history": 4},
+    )
+    assert resp.status_code == 200
+    hist = resp.json()["history"]
+    assert hist["price"] == [101.0, 103.0, 104.0, 106.0]
+    assert abs(hist["ma"][-1] - 313 / 3) < 1e-9
+    assert all(v is not None for v in hist["upper"])
+
+
+class _NullConn:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):  # noqa: ANN002
+        return False
+
+
+def test_spp_plus_grid_endpoint_matches_single_calls() -> None:
+    payload = {
+        "type_id": 603,
+        "region_id": 10000002,
+        "lead_time_days": [0, 1, 4],
+        "horizon_days": [0.5, 3],
+        "batch_options": [1, 5, 50],
+    }
+    resp = client.post("/analytics/spp_plus/grid", json=payload)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["lead_time_days"] == ["0", "1", "4"] and data["horizon_days"] == ["0.5", "3"]
+    assert len(data["spp"]) == 3 and all(len(row) == 2 for row in data["spp"])
+    assert set(data["diagnostics"]) >= {"queue_at_listing", "demand_over_horizon"}
+    for i, lead in enumerate(payload["lead_time_days"]):
+        for j, horizon in enumerate(payload["horizon_days"]):
+            single = client.post(
+                "/analytics/spp_plus",
+                json={**payload, "lead_time_days": lead, "horizon_days": horizon},
+            ).json()
+            assert data["spp"][i][j] == single["spp"]
+            assert data["recommended_batch"][i][j] == single["recommended_batch"]
+
+
+def test_spp_plus_grid_endpoint_rejects_bad_grids() -> None:
+    base = {"type_id": 603, "region_id": 10000002, "lead_time_days": [1], "horizon_days": [1]}
+
+    def status_of(**overrides) -> int:  # noqa: ANN003
+        return client.post("/analytics/spp_plus/grid", json={**base, **overrides}).status_code
+
+    assert status_of(horizon_days=[]) == 422
+    assert status_of(lead_time_days=["x"]) == 422
+    assert status_of(lead_time_days=["NaN"]) == 422
+    assert status_of(lead_time_days=list(range(101)), horizon_days=list(range(100))) == 422
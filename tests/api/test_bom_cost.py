@@ -24,3 +24,74 @@ def test_bom_cost_monkeypatched(monkeypatch):
     body = resp.json()
     assert body["total_cost"] == 50.0
 
+
+
+def test_bom_cost_batch_streams_ndjson(monkeypatch):
+    import json
+    from decimal import Decimal
+
+    from app.services import costing_service as svc
+
+    seen = {}
+
+    class FakeBatch:
+        def __init__(self, items):  # noqa: ANN001
+            self.requests = tuple(items)
+
+        def summarize(self, index):  # noqa: ANN001
+            req = self.requests[index]
+            if req.product_id == 999:
+                return None
+            if req.product_id == 666:
+                raise ArithmeticError("bad quote")
+            line = svc.CostLine(
+                type_id=34, qty=10 * req.runs, unit_price=Decimal("5"), cost=Decimal(50 * req.runs)
+            )
+            return svc.CostSummary(
+                product_id=req.product_id, runs=req.runs, lines=[line], total_cost=line.cost
+            )
+
+    def fake_prepare(items, region_id, owner_scope=None):  # noqa: ANN001
+        seen["items"] = list(items)
+        seen["region_id"] = region_id
+        return FakeBatch(items)
+
+    monkeypatch.setattr(svc, "prepare_cost_batch", fake_prepare)
+    resp = client.post(
+        "/bom/cost/batch",
+        json={
+            "region_id": 10000043,
+            "items": [
+                {"product_id": 2, "runs": 2, "me_bonus": 0.1},
+                {"product_id": 666},
+                {"product_id": 999},
+            ],
+        },
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert rows[0]["product_id"] == 2 and rows[0]["total_cost"] == 100.0
+    # A failing item becomes an error line; later items still stream
+    assert rows[1] == {"product_id": 666, "error": "Costing failed"}
+    assert rows[2] == {"product_id": 999, "error": "Blueprint not found for product"}
+    assert seen["region_id"] == 10000043
+    assert seen["items"][0] == svc.CostRequest(product_id=2, runs=2, me_bonus=0.1)
+
+
+def test_bom_cost_batch_rejects_empty_items():
+    resp = client.post("/bom/cost/batch", json={"items": []})
+    assert resp.status_code == 422
+
+
+def test_bom_cost_batch_shared_failure_is_an_error_status(monkeypatch):
+    from app.services import costing_service as svc
+
+    def failing_prepare(items, region_id, owner_scope=None):  # noqa: ANN001
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(svc, "prepare_cost_batch", failing_prepare)
+    resp = TestClient(app, raise_server_exceptions=False).post(
+        "/bom/cost/batch", json={"items": [{"product_id": 2}]}
+    )
+    assert resp.status_code == 500
@@ -54,3 +54,67 @@ def test_plan_recommend_endpoint_returns_assignments() -> None:
     data = resp.json()
     assert data["assignments"][0]["character_id"] == 2
 
+
+def test_plan_next_window_optimize_mode_reports_gain() -> None:
+    payload = {
+        "start": "2024-04-01T00:00:00",
+        "duration_hours": 3,
+        "mode": "optimize",
+        "time_budget_ms": 100,
+        "characters": [
+            {
+                "character_id": 1,
+                "activity_slots": {"Manufacturing": 1},
+                "time_multipliers": {"Manufacturing": "0.8"},
+            },
+            {"character_id": 2, "activity_slots": {"Manufacturing": 2}},
+        ],
+        "jobs": [{"job_id": "hull", "runs": 8, "per_run_minutes": "60"}],
+    }
+    resp = client.post("/plan/next-window", json=payload)
+    assert resp.status_code == 200
+    optimization = resp.json()["optimization"]
+    assert optimization["improved"] is True
+    assert optimization["completed"] is True
+    assert optimization["greedy"]["runs"] == 3
+    assert optimization["optimized"]["runs"] == 8
+    assert optimization["runs_gain"] == 5
+    assert optimization["elapsed_ms"] >= 0
+
+    resp = client.post("/plan/next-window", json={**payload, "mode": "fastest"})
+    assert resp.status_code == 422
+
+
+def test_plan_session_applies_job_diffs_incrementally() -> None:
+    payload = {
+        "start": "2024-04-01T00:00:00",
+        "duration_hours": 24,
+        "characters": [
+            {"character_id": 1, "activity_slots": {"Manufacturing": 1}},
+            {"character_id": 2, "activity_slots": {"Reaction": 1}},
+        ],
+        "jobs": [{"job_id": "hull", "runs": 2, "per_run_minutes": "60"}],
+    }
+    created = client.post("/plan/sessions", json=payload)
+    assert created.status_code == 200
+    plan_id = created.json()["plan_id"]
+
+    diff = {
+        "jobs": {
+            "upsert": [
+                {"job_id": "fuel", "activity": "Reaction", "runs": 1, "per_run_minutes": "30"}
+            ]
+        }
+    }
+    updated = client.patch(f"/plan/sessions/{plan_id}", json=diff)
+    assert updated.status_code == 200
+    body = updated.json()
+    assert body["replanned"] == [{"character_id": 2, "activity": "Reaction"}]
+    assert {a["job_id"] for a in body["assignments"]} == {"hull", "fuel"}
+    assert client.get(f"/plan/sessions/{plan_id}").json()["summary"] == body["summary"]
+
+    bad = client.patch(f"/plan/sessions/{plan_id}", json={"jobs": {"remove": ["nope"]}})
+    assert bad.status_code == 422
+
+    assert client.delete(f"/plan/sessions/{plan_id}").status_code == 204
+    assert client.get(f"/plan/sessions/{plan_id}").status_code == 404
@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import fakeredis
+
+from app.cache import CacheClient
+from app.cache_codec import BinarySerializer, Envelope, JSONSerializer, loads_any, serializer_for
+
+NOW = datetime(2024, 4, 15, 12, 0, tzinfo=timezone.utc)
+
+
+def test_binary_envelope_round_trips_native_types() -> None:
+    value = {
+        "ma": Decimal("1253033333.5833"),
+        "whole": Decimal("15"),
+        "sci": Decimal("-1E+3"),
+        "nan": Decimal("NaN"),
+        "ratio": 0.0512,
+        "tiny": 1e-7,
+        "count": 3,
+        "flags": [True, False, None],
+        "name": "Jita IV - Moon 4 é",
+        "nested": {"k": (1, 2)},
+    }
+    raw = BinarySerializer().dumps(Envelope(stored_at=NOW, ttl=3600, value=value))
+
+    env = loads_any(raw)
+    assert env.stored_at == NOW and env.ttl == 3600
+    out = env.value
+    assert out["ma"] == Decimal("1253033333.5833") and isinstance(out["ma"], Decimal)
+    assert isinstance(out["whole"], Decimal) and out["whole"] == 15
+    assert str(out["sci"]) == "-1E+3"
+    assert out["nan"] == "NaN"  # non-finite Decimals fall back to str, as with JSON
+    assert isinstance(out["ratio"], float) and out["ratio"] == 0.0512
+    assert out["tiny"] == 1e-7 and out["count"] == 3
+    assert out["flags"] == [True, False, None]
+    assert out["name"] == value["name"]
+    assert out["nested"] == {"k": [1, 2]}
+
+
+def test_binary_envelope_is_smaller_than_json() -> None:
+    value = {
+        "bollinger": {
+            "middle": Decimal("101.4000"),
+            "upper": Decimal("103.0000"),
+            "lower": Decimal("99.8000"),
+        }
+    }
+    env = Envelope(stored_at=NOW, ttl=3600, value=value)
+    assert len(BinarySerializer().dumps(env)) < len(JSONSerializer().dumps(env).encode())
+
+
+def test_writer_format_follows_client_and_legacy_json_still_reads() -> None:
+    raw_client = fakeredis.FakeRedis()
+    assert isinstance(serializer_for(raw_client), BinarySerializer)
+    assert isinstance(serializer_for(fakeredis.FakeRedis(decode_responses=True)), JSONSerializer)
+
+    # Entry written by an older (JSON) build under the same key
+    legacy = CacheClient(raw_client, clock=lambda: NOW, serializer=JSONSerializer())
+    legacy.set_indicator(10000002, 34, 5, {"ma": Decimal("101.4")})
+    cache = CacheClient(raw_client, clock=lambda: NOW)
+    assert cache.get_indicator(10000002, 34, 5).value == {"ma": "101.4"}
+
+    cache.set_indicator(10000002, 34, 5, {"ma": Decimal("101.4")})
+    assert raw_client.get("indicator:10000002:34:5")[0] == 0xC1
+    assert cache.get_indicator(10000002, 34, 5).value == {"ma": Decimal("101.4")}
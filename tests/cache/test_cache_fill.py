@@ -0,0 +1,230 @@
+import threading
+import time
+
+import fakeredis
+
+from app.cache import CacheClient, CacheRecord
+from app.cache_fill import Revalidator, SingleFlight, coalesced_fill, read_through
+
+
+def _accessors(cache: CacheClient):
+    read = lambda: cache.get_indicator(1, 34, 5)  # noqa: E731
+    write = lambda payload: cache.set_indicator(1, 34, 5, payload)  # noqa: E731
+    return read, write
+
+
+def test_concurrent_misses_compute_once() -> None:
+    cache = CacheClient(fakeredis.FakeRedis())
+    read, write = _accessors(cache)
+    flights = SingleFlight()
+    calls = []
+    gate = threading.Event()
+
+    def compute():
+        calls.append(1)
+        gate.wait(1.0)
+        return {"ma": 7}
+
+    results = []
+
+    def worker():
+        results.append(
+            coalesced_fill(
+                cache, "indicator:1:34:5", compute=compute, read=read, write=write, flights=flights
+            )
+        )
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [{"ma": 7}] * 8
+    assert cache.get_indicator(1, 34, 5).value == {"ma": 7}
+    assert not cache.fill_locked("indicator:1:34:5")
+
+
+def test_peer_lock_serves_last_good_without_computing() -> None:
+    redis_client = fakeredis.FakeRedis()
+    cache = CacheClient(redis_client)
+    read, write = _accessors(cache)
+    cache.set_indicator(1, 34, 5, {"ma": 5})
+    redis_client.delete("indicator:1:34:5")
+    stale = read()
+    assert stale is not None and stale.stale
+
+    # Another worker is mid-fill
+    assert cache.try_fill_lock("indicator:1:34:5", 10_000) is not None
+
+    def compute():
+        raise AssertionError("should not compute while a peer holds the lock")
+
+    out = coalesced_fill(
+        cache, "indicator:1:34:5", compute=compute, read=read, write=write, stale=stale
+    )
+    assert out == {"ma": 5}
+
+
+def test_waits_for_peer_fill_then_reads_it() -> None:
+    cache = CacheClient(fakeredis.FakeRedis())
+    read, write = _accessors(cache)
+    token = cache.try_fill_lock("indicator:1:34:5", 10_000)
+
+    def peer():
+        time.sleep(0.1)
+        write({"ma": 9})
+        cache.release_fill_lock("indicator:1:34:5", token)
+
+    t = threading.Thread(target=peer)
+    t.start()
+    out = coalesced_fill(
+        cache,
+        "indicator:1:34:5",
+        compute=lambda: {"ma": -1},
+        read=read,
+        write=write,
+        poll_interval=0.01,
+    )
+    t.join()
+    assert out == {"ma": 9}
+
+
+def test_release_leaves_a_lock_taken_over_by_a_peer() -> None:
+    cache = CacheClient(fakeredis.FakeRedis())
+    token = cache.try_fill_lock("spp:1", 10_000)
+    assert cache.try_fill_lock("spp:1", 10_000) is None
+
+    cache.release_fill_lock("spp:1", "someone-else")
+    assert cache.fill_locked("spp:1")
+    cache.release_fill_lock("spp:1", token)
+    assert not cache.fill_locked("spp:1")
+
+
+def test_read_through_serves_stale_and_refreshes_once_in_background() -> None:
+    cache = CacheClient(fakeredis.FakeRedis())
+    read, write = _accessors(cache)
+    stale = CacheRecord(value={"ma": 1}, stale=True, age_seconds=4000, ttl=3600)
+    revalidator = Revalidator(max_workers=2)
+    gate = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        gate.wait(1.0)
+        return {"ma": 2}
+
+    outs = [
+        read_through(
+            cache,
+            "indicator:1:34:5",
+            stale,
+            compute=compute,
+            read=read,
+            write=write,
+            revalidator=revalidator,
+        )
+        for _ in range(5)
+    ]
+    gate.set()
+    revalidator.drain(timeout=2.0)
+    revalidator.shutdown()
+
+    assert outs == [{"ma": 1}] * 5
+    assert len(calls) == 1
+    assert read().value == {"ma": 2}
+
+
+def test_read_through_refreshes_ahead_of_expiry() -> None:
+    cache = CacheClient(fakeredis.FakeRedis())
+    read, write = _accessors(cache)
+    revalidator = Revalidator(max_workers=1)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"ma": 2}
+
+    early = CacheRecord(value={"ma": 1}, stale=False, age_seconds=100, ttl=3600)
+    late = CacheRecord(value={"ma": 1}, stale=False, age_seconds=3300, ttl=3600)
+    kwargs = dict(
+        compute=compute, read=read, write=write, refresh_ahead=0.1, revalidator=revalidator
+    )
+    assert read_through(cache, "indicator:1:34:5", early, **kwargs) == {"ma": 1}
+    revalidator.drain(timeout=2.0)
+    assert calls == []
+
+    assert read_through(cache, "indicator:1:34:5", late, **kwargs) == {"ma": 1}
+    revalidator.drain(timeout=2.0)
+    revalidator.shutdown()
+    assert calls == [1]
+
+
+def test_read_through_recomputes_inline_when_too_stale_or_missing() -> None:
+    cache = CacheClient(fakeredis.FakeRedis())
+    read, write = _accessors(cache)
+    revalidator = Revalidator(max_workers=1)
+    ancient = CacheRecord(value={"ma": 1}, stale=True, age_seconds=80_000, ttl=3600)
+    kwargs = dict(
+        compute=lambda: {"ma": 3},
+        read=read,
+        write=write,
+        serve_stale_for=600,
+        revalidator=revalidator,
+    )
+
+    assert read_through(cache, "indicator:1:34:5", ancient, **kwargs) == {"ma": 3}
+    assert read_through(cache, "indicator:1:35:5", None, **kwargs) == {"ma": 3}
+    revalidator.shutdown()
+
+
+def test_read_through_does_not_hand_losers_a_record_past_the_stale_window() -> None:
+    cache = CacheClient(fakeredis.FakeRedis())
+    read, write = _accessors(cache)
+    ancient = CacheRecord(value={"ma": 1}, stale=True, age_seconds=80_000, ttl=3600)
+    # A peer process holds the fill lock and writes the fresh value shortly
+    token = cache.try_fill_lock("indicator:1:34:5", 10_000)
+
+    def peer():
+        time.sleep(0.1)
+        write({"ma": 4})
+        cache.release_fill_lock("indicator:1:34:5", token)
+
+    t = threading.Thread(target=peer)
+    t.start()
+    out = read_through(
+        cache,
+        "indicator:1:34:5",
+        ancient,
+        compute=lambda: {"ma": -1},
+        read=read,
+        write=write,
+        serve_stale_for=600,
+    )
+    t.join()
+    assert out == {"ma": 4}
+
+
+def test_follower_stops_waiting_on_a_stuck_leader_after_the_lock_ttl() -> None:
+    flights = SingleFlight()
+    future, leader = flights.join("spp:1")
+    assert leader  # never completed, like a hung compute
+    written = []
+
+    started = time.monotonic()
+    out = coalesced_fill(
+        None,
+        "spp:1",
+        compute=lambda: {"spp": 1},
+        read=lambda: None,
+        write=written.append,
+        lock_ttl=0.1,
+        flights=flights,
+    )
+
+    assert out == {"spp": 1} and written == [{"spp": 1}]
+    assert time.monotonic() - started < 1.0
+    assert not future.done()
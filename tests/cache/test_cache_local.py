@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta, timezone
+
+import fakeredis
+
+from app.cache import CacheClient, CachePolicy
+from app.cache_local import CacheStats, InvalidationListener, LocalCache, encode_invalidation
+
+
+class ManualClock:
+    def __init__(self, start: float = 0.0) -> None:
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingRedis(fakeredis.FakeRedis):
+    mget_calls = 0
+
+    def mget(self, keys, *args):
+        self.mget_calls += 1
+        return super().mget(keys, *args)
+
+
+def test_local_cache_evicts_least_recently_used() -> None:
+    local = LocalCache(max_entries=2, max_age=60)
+    local.put("a", 1, 60)
+    local.put("b", 2, 60)
+    assert local.get("a") == 1  # "b" is now the oldest
+    local.put("c", 3, 60)
+
+    assert local.get("b") is None
+    assert local.get("a") == 1
+    assert local.get("c") == 3
+    assert local.metrics()["evictions"] == 1
+
+
+def test_local_cache_expires_at_remaining_ttl_or_max_age() -> None:
+    clock = ManualClock()
+    local = LocalCache(max_entries=10, max_age=30, clock=clock)
+    local.put("short", "x", 5)
+    local.put("long", "y", 600)
+
+    clock.now = 6
+    assert local.get("short") is None
+    assert local.get("long") == "y"
+    clock.now = 31
+    assert local.get("long") is None
+
+
+def test_client_serves_repeat_reads_from_local_tier() -> None:
+    redis_client = CountingRedis()
+    stats = CacheStats()
+    cache = CacheClient(redis_client, local=LocalCache(), stats=stats)
+
+    cache.set_indicator(10000002, 34, 5, {"ma": 101})
+    first = cache.get_indicator(10000002, 34, 5)
+    second = cache.get_indicator(10000002, 34, 5)
+
+    assert first is not None and second is not None
+    assert second.value == first.value and second.stale is False
+    assert redis_client.mget_calls == 1
+    assert cache.get_indicator(10000002, 35, 5) is None
+    assert stats.snapshot()["indicator"] == {
+        "local_hits": 1,
+        "redis_hits": 1,
+        "stale_hits": 0,
+        "misses": 1,
+    }
+
+
+def test_local_tier_honours_policy_ttl() -> None:
+    redis_client = fakeredis.FakeRedis()
+    now = datetime(2024, 4, 15, 12, 0, tzinfo=timezone.utc)
+    policy = CachePolicy(indicator_ttl=60)
+    local = LocalCache()
+    writer = CacheClient(redis_client, policy=policy, clock=lambda: now, local=local)
+    writer.set_indicator(10000002, 34, 5, {"ma": 101})
+    assert writer.get_indicator(10000002, 34, 5) is not None
+
+    # Expired by the client clock: the local copy is ignored and Redis decides
+    later = CacheClient(
+        redis_client, policy=policy, clock=lambda: now + timedelta(seconds=120), local=local
+    )
+    record = later.get_indicator(10000002, 34, 5)
+    assert record is not None and record.stale is True
+
+
+def test_writes_invalidate_local_and_peer_tiers() -> None:
+    server = fakeredis.FakeServer()
+    ours, theirs = LocalCache(), LocalCache()
+    cache = CacheClient(fakeredis.FakeRedis(server=server), local=ours)
+    peer = CacheClient(fakeredis.FakeRedis(server=server), local=theirs)
+    cache.set_spp(34, 10000002, "h", {"spp": 1})
+    assert peer.get_spp(34, 10000002, "h").value["spp"] == 1
+
+    pubsub = fakeredis.FakeRedis(server=server).pubsub()
+    pubsub.subscribe("cache:invalidate")
+    assert pubsub.get_message(timeout=1.0)["type"] == "subscribe"
+    cache.set_spp(34, 10000002, "h", {"spp": 2})
+    message = pubsub.get_message(timeout=1.0)
+    assert message is not None
+
+    # Our own message is ignored; a peer process drops the key
+    assert cache.get_spp(34, 10000002, "h").value["spp"] == 2
+    assert theirs.get("spp:34:10000002:h") is not None
+    listener = InvalidationListener(lambda: None, theirs)
+    assert message["data"] == encode_invalidation(["spp:34:10000002:h"]).encode()
+    listener.handle(message["data"])
+    assert theirs.get("spp:34:10000002:h") is not None
+
+    listener.handle(b"peer:1\nspp:34:10000002:h")
+    assert theirs.get("spp:34:10000002:h") is None
+    assert peer.get_spp(34, 10000002, "h").value["spp"] == 2
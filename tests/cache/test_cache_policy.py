@@ -54,9 +54,66 @@ def test_cache_ttl_configuration() -> None:
     now = datetime(2024, 4, 15, 12, 0, tzinfo=timezone.utc)
     cache = CacheClient(redis_client, policy=policy, clock=fixed_clock(now))
 
-    cache.set_indicator(10000002, 34, {"ma": 101})
-    ttl = redis_client.ttl("indicator:10000002:34")
-    last_good_ttl = redis_client.ttl("indicator:10000002:34:last_good")
+    cache.set_indicator(10000002, 34, 5, {"ma": 101})
+    ttl = redis_client.ttl("indicator:10000002:34:5")
+    last_good_ttl = redis_client.ttl("indicator:10000002:34:5:last_good")
 
     assert 0 < ttl <= policy.indicator_ttl
     assert 0 < last_good_ttl <= policy.last_good_ttl
+
+
+class CountingRedis(fakeredis.FakeRedis):
+    """FakeRedis that counts client round trips (single commands and pipeline flushes)."""
+
+    round_trips = 0
+
+    def execute_command(self, *args, **kwargs):
+        type(self).round_trips += 1
+        return super().execute_command(*args, **kwargs)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        pipe = super().pipeline(transaction=transaction, shard_hint=shard_hint)
+        execute = pipe.execute
+
+        def counted(*a, **kw):
+            type(self).round_trips += 1
+            return execute(*a, **kw)
+
+        pipe.execute = counted
+        return pipe
+
+
+def test_price_board_uses_one_round_trip_each_way() -> None:
+    redis_client = CountingRedis(decode_responses=True)
+    now = datetime(2024, 4, 15, 12, 0, tzinfo=timezone.utc)
+    cache = CacheClient(redis_client, clock=fixed_clock(now))
+
+    CountingRedis.round_trips = 0
+    cache.set_prices("adam4eve", 10000002, {t: {"bid": t} for t in range(500)})
+    assert CountingRedis.round_trips == 1
+    assert redis_client.get("price:adam4eve:10000002:499:last_good") is not None
+
+    # One entry only survives as last-good; one never existed
+    redis_client.delete("price:adam4eve:10000002:7")
+    CountingRedis.round_trips = 0
+    records = cache.get_prices("adam4eve", 10000002, [*range(500), 9999])
+    assert CountingRedis.round_trips == 1
+    assert len(records) == 500 and 9999 not in records
+    assert records[3].value["bid"] == 3 and records[3].stale is False
+    assert records[7].stale is True and records[7].value["bid"] == 7
+
+
+def test_indicator_and_index_multi_ops() -> None:
+    redis_client = fakeredis.FakeRedis(decode_responses=True)
+    now = datetime(2024, 4, 15, 12, 0, tzinfo=timezone.utc)
+    cache = CacheClient(redis_client, clock=fixed_clock(now))
+
+    cache.set_indicators({(10000002, 34): {"ma": 1}, (10000043, 35): {"ma": 2}}, 5)
+    cache.set_indices({(30000142, "manufacturing"): {"index": 0.05}})
+
+    assert cache.get_indicator(10000043, 35, 5).value == {"ma": 2}
+    got = cache.get_indicators([(10000002, 34), (10000002, 99)], 5)
+    assert list(got) == [(10000002, 34)]
+    idx = cache.get_indices([(30000142, "manufacturing")])
+    assert idx[(30000142, "manufacturing")].value == {"index": 0.05}
+    assert cache.get_prices("adam4eve", 10000002, []) == {}
@@ -41,3 +41,171 @@ def test_ratelimiter_blocks_until_refilled() -> None:
     m = rl.metrics(key)
     assert m["delayed"] >= 1
 
+
+def test_ratelimiter_acquire_awaits_refill() -> None:
+    import asyncio
+
+    clk = FakeClock()
+
+    async def async_sleep(s: float) -> None:
+        clk.sleep(s)
+
+    rl = RateLimiter(
+        capacity=1, refill_rate_per_sec=4.0, now=clk.now, sleep=clk.sleep, async_sleep=async_sleep
+    )
+    key = "adam4eve:/market/type"
+
+    async def run() -> None:
+        await rl.acquire(key)
+        await rl.acquire(key)
+
+    asyncio.run(run())
+    assert sum(clk.sleeps) >= 0.25
+    assert rl.metrics(key)["allowed"] == 2
+
+
+def _async_clock(clk: FakeClock):
+    import asyncio
+
+    async def async_sleep(s: float) -> None:
+        clk.sleep(s)
+        await asyncio.sleep(0)
+
+    return async_sleep
+
+
+def test_acquire_serves_interactive_before_background_waiters() -> None:
+    import asyncio
+
+    from core.ratelimiter import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+
+    clk = FakeClock()
+    rl = RateLimiter(
+        capacity=1,
+        refill_rate_per_sec=1.0,
+        now=clk.now,
+        sleep=clk.sleep,
+        async_sleep=_async_clock(clk),
+    )
+    key = "esi:/markets"
+    assert rl.try_acquire(key) is True
+    order: list[str] = []
+
+    async def client(name: str, priority: int) -> None:
+        await rl.acquire(key, priority=priority)
+        order.append(name)
+
+    async def run() -> None:
+        await asyncio.gather(
+            client("backfill-1", PRIORITY_BACKGROUND),
+            client("backfill-2", PRIORITY_BACKGROUND),
+            client("interactive", PRIORITY_INTERACTIVE),
+        )
+
+    asyncio.run(run())
+    assert order == ["interactive", "backfill-1", "backfill-2"]
+    assert rl.metrics(key)["allowed"] == 4
+
+
+def test_acquire_many_waits_for_enough_tokens() -> None:
+    import asyncio
+
+    import pytest
+
+    clk = FakeClock()
+    rl = RateLimiter(
+        capacity=5,
+        refill_rate_per_sec=2.0,
+        now=clk.now,
+        sleep=clk.sleep,
+        async_sleep=_async_clock(clk),
+    )
+    key = "fuzzwork:/orders/type"
+
+    async def run() -> None:
+        await rl.acquire_many(key, 5)
+        await rl.acquire_many(key, 4)
+
+    asyncio.run(run())
+    assert sum(clk.sleeps) == pytest.approx(2.0)
+    with pytest.raises(ValueError):
+        asyncio.run(rl.acquire_many(key, 6))
+
+
+def test_cancelled_waiter_leaves_the_queue() -> None:
+    import asyncio
+
+    clk = FakeClock()
+
+    async def slow_sleep(s: float) -> None:
+        await asyncio.sleep(0.01)
+
+    rl = RateLimiter(
+        capacity=1, refill_rate_per_sec=0.001, now=clk.now, sleep=clk.sleep, async_sleep=slow_sleep
+    )
+    key = "k"
+    rl.try_acquire(key)
+
+    async def run() -> None:
+        head = asyncio.create_task(rl.acquire(key))
+        queued = asyncio.create_task(rl.acquire(key))
+        await asyncio.sleep(0.02)
+        assert rl._waiters.waiting(key) == 2
+        queued.cancel()
+        head.cancel()
+        await asyncio.gather(head, queued, return_exceptions=True)
+        assert rl._waiters.waiting(key) == 0
+
+    asyncio.run(run())
+
+
+def test_buckets_are_thread_safe() -> None:
+    import threading
+
+    clk = FakeClock()
+    rl = RateLimiter(capacity=100, refill_rate_per_sec=0.001, now=clk.now, sleep=clk.sleep)
+    results: list[bool] = []
+
+    def worker() -> None:
+        for _ in range(50):
+            results.append(rl.try_acquire("shared"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results.count(True) == 100
+    assert rl.metrics("shared") == {"allowed": 100, "denied": 300, "delayed": 0}
+
+
+def test_blocking_take_runs_outside_the_queue_lock() -> None:
+    import asyncio
+    import threading
+
+    from core.ratelimiter import PRIORITY_DEFAULT, _FairQueue
+
+    queue = _FairQueue()
+    in_take = threading.Event()
+    release = threading.Event()
+
+    def slow_take():
+        in_take.set()
+        assert release.wait(5)
+        return True, 0.0
+
+    async def run() -> None:
+        slow = asyncio.create_task(
+            queue.acquire("a", slow_take, PRIORITY_DEFAULT, asyncio.sleep, offload=True)
+        )
+        await asyncio.to_thread(in_take.wait, 5)
+        # Another key (and the event loop) proceed while "a" is mid round trip
+        await asyncio.wait_for(
+            queue.acquire("b", lambda: (True, 0.0), PRIORITY_DEFAULT, asyncio.sleep), 1
+        )
+        assert queue.waiting("a") == 1 and queue.waiting("b") == 0
+        release.set()
+        await slow
+        assert queue.waiting("a") == 0
+
+    asyncio.run(run())
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from typing import List
+
+import fakeredis
+import pytest
+
+from core.ratelimiter import RedisRateLimiter
+
+pytest.importorskip("lupa")  # fakeredis needs it to run the Lua bucket script
+
+
+class FakeClock:
+    def __init__(self, start: float = 1_000.0) -> None:
+        self.t = start
+        self.sleeps: List[float] = []
+
+    def now(self) -> float:
+        return self.t
+
+    def sleep(self, s: float) -> None:
+        self.sleeps.append(s)
+        self.t += s
+
+
+def _limiter(
+    server: fakeredis.FakeServer, clk: FakeClock, capacity: float = 2, rate: float = 1.0
+) -> RedisRateLimiter:
+    return RedisRateLimiter(
+        redis=fakeredis.FakeRedis(server=server),
+        capacity=capacity,
+        refill_rate_per_sec=rate,
+        now=clk.now,
+        sleep=clk.sleep,
+    )
+
+
+def test_budget_is_shared_between_limiters() -> None:
+    server = fakeredis.FakeServer()
+    clk = FakeClock()
+    worker_a, worker_b = _limiter(server, clk), _limiter(server, clk)
+    key = "esi:/industry/jobs"
+
+    assert worker_a.try_acquire(key) is True
+    assert worker_b.try_acquire(key) is True
+    assert worker_a.try_acquire(key) is False
+    assert worker_b.try_acquire(key) is False
+
+    clk.t += 1.0  # one token refilled, for everyone
+    assert worker_b.try_acquire(key) is True
+    assert worker_a.try_acquire(key) is False
+
+    assert worker_a.metrics(key) == {"allowed": 3, "denied": 3, "delayed": 0}
+    assert worker_b.metrics_by_key() == {key: {"allowed": 3, "denied": 3, "delayed": 0}}
+
+
+def test_block_until_allowed_sleeps_for_shared_refill() -> None:
+    server = fakeredis.FakeServer()
+    clk = FakeClock()
+    worker_a = _limiter(server, clk, capacity=1, rate=2.0)
+    worker_b = _limiter(server, clk, capacity=1, rate=2.0)
+    key = "adam4eve:/market/type"
+
+    worker_a.block_until_allowed(key)
+    worker_b.block_until_allowed(key)
+
+    assert clk.sleeps == [pytest.approx(0.5)]
+    assert worker_a.metrics(key) == {"allowed": 2, "denied": 0, "delayed": 1}
+
+
+def test_falls_back_to_local_bucket_when_redis_is_down() -> None:
+    server = fakeredis.FakeServer()
+    clk = FakeClock()
+    rl = _limiter(server, clk, capacity=1)
+    server.connected = False
+
+    assert rl.try_acquire("k") is True
+    assert rl.try_acquire("k") is False
+    assert rl.metrics("k") == {"allowed": 1, "denied": 1, "delayed": 0}
@@ -4,11 +4,13 @@ import pytest
 
 from indy_math.costing import (
     CostContext,
+    CostEvaluator,
     CostingError,
     InventoryEntry,
     MaterialRequirement,
     Recipe,
     cost_item,
+    cost_items,
 )
 
 
@@ -76,3 +78,92 @@ def test_cost_item_deterministic(base_context: CostContext) -> None:
 def test_cost_item_missing_recipe_raises(base_context: CostContext) -> None:
     with pytest.raises(CostingError):
         cost_item(999, Decimal("1"), base_context)
+
+
+@pytest.fixture
+def shared_component_context() -> CostContext:
+    # 300 consumes 200 twice (directly and via 250); 200 consumes 100
+    recipes = {
+        200: Recipe(
+            type_id=200,
+            output_qty=Decimal("2"),
+            batch_size=1,
+            materials=(MaterialRequirement(type_id=100, quantity=Decimal("3")),),
+            job_fee=Decimal("1.5"),
+        ),
+        250: Recipe(
+            type_id=250,
+            output_qty=Decimal("1"),
+            batch_size=1,
+            materials=(MaterialRequirement(type_id=200, quantity=Decimal("1")),),
+        ),
+        300: Recipe(
+            type_id=300,
+            output_qty=Decimal("1"),
+            batch_size=1,
+            materials=(
+                MaterialRequirement(type_id=200, quantity=Decimal("1")),
+                MaterialRequirement(type_id=250, quantity=Decimal("1")),
+            ),
+            job_fee=Decimal("4"),
+        ),
+    }
+    inventory = {
+        100: InventoryEntry(type_id=100, available_qty=Decimal("2"), avg_cost=Decimal("5"))
+    }
+    return CostContext(inventory=inventory, recipes=recipes, acquisition_costs={100: Decimal("6")})
+
+
+def test_memoized_cost_matches_reference(shared_component_context: CostContext) -> None:
+    reference = cost_item(300, Decimal("3"), shared_component_context)
+    memoized = cost_item(300, Decimal("3"), shared_component_context, memoize=True)
+    assert memoized == reference
+    assert [e.type_id for e in memoized.trace.entries] == [
+        e.type_id for e in reference.trace.entries
+    ]
+
+
+def test_untraced_cost_skips_trace(shared_component_context: CostContext) -> None:
+    reference = cost_item(300, Decimal("3"), shared_component_context)
+    fast = cost_item(300, Decimal("3"), shared_component_context, trace=False)
+    assert fast.trace.entries == ()
+    assert fast.consumed_cost == reference.consumed_cost
+    assert fast.excess_to_inventory == reference.excess_to_inventory
+    assert fast.fee_split == reference.fee_split
+
+
+def test_evaluator_shares_memo_across_items(shared_component_context: CostContext) -> None:
+    results = cost_items([(300, 1), (250, 2), (300, 1)], shared_component_context)
+    assert results[0] == results[2]
+    assert results[1].consumed_cost == cost_item(250, 2, shared_component_context).consumed_cost
+
+
+def test_evaluator_detects_cycles() -> None:
+    recipes = {
+        1: Recipe(
+            type_id=1,
+            output_qty=Decimal("1"),
+            batch_size=1,
+            materials=(MaterialRequirement(2, Decimal("1")),),
+        ),
+        2: Recipe(
+            type_id=2,
+            output_qty=Decimal("1"),
+            batch_size=1,
+            materials=(MaterialRequirement(1, Decimal("1")),),
+        ),
+    }
+    evaluator = CostEvaluator(CostContext(inventory={}, recipes=recipes, acquisition_costs={}))
+    with pytest.raises(CostingError):
+        evaluator.cost(1, Decimal("1"))
+
+
+@pytest.mark.parametrize("memoize", [False, True])
+def test_cost_item_honours_caller_stack(
+    shared_component_context: CostContext, memoize: bool
+) -> None:
+    with pytest.raises(CostingError):
+        cost_item(300, Decimal("1"), shared_component_context, (100, 300), memoize=memoize)
+    # 100 is a leaf of 300, so a caller already costing 100 makes 300 cyclic too
+    with pytest.raises(CostingError):
+        cost_item(300, Decimal("1"), shared_component_context, (100,), memoize=memoize, trace=False)
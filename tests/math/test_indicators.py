@@ -1,5 +1,6 @@
 from decimal import Decimal
 
+import numpy as np
 import pytest
 
 from indy_math.indicators import (
@@ -8,6 +9,8 @@ from indy_math.indicators import (
     DepthSummary,
     bollinger_bands,
     moving_average,
+    rolling_indicators,
+    rolling_indicators_many,
     shallow_depth_metrics,
     simple_volatility,
 )
@@ -51,3 +54,40 @@ def test_indicator_validation_errors(price_series: list[Decimal]) -> None:
         shallow_depth_metrics([])
     with pytest.raises(ValueError):
         simple_volatility(price_series[:2], 5)
+
+
+def test_rolling_indicators_match_decimal_reference() -> None:
+    series = [
+        Decimal(str(v))
+        for v in [
+            1_250_000_000.5,
+            1_260_100_000,
+            1_249_000_000.25,
+            1_270_000_000,
+            1_255_500_000,
+            1_262_000_000,
+        ]
+    ]
+    window = 3
+    rolled = rolling_indicators(series, window, k=2.0)
+    assert np.isnan(rolled.ma[: window - 1]).all()
+    for end in range(window, len(series) + 1):
+        ref = bollinger_bands(series[:end], window, Decimal("2"))
+        vol = simple_volatility(series[:end], window)
+        i = end - 1
+        assert rolled.ma[i] == pytest.approx(float(ref.middle), abs=1e-3)
+        assert rolled.stdev[i] == pytest.approx(float(vol), abs=1e-3)
+        assert rolled.upper[i] == pytest.approx(float(ref.upper), abs=1e-3)
+        assert rolled.lower[i] == pytest.approx(float(ref.lower), abs=1e-3)
+
+
+def test_rolling_indicators_many_handles_ragged_series() -> None:
+    out = rolling_indicators_many({(34, 1): [1, 2, 3, 4], (35, 1): [5, 5], (36, 1): []}, window=3)
+    assert out[(34, 1)].ma[2:].tolist() == pytest.approx([2.0, 3.0])
+    assert len(out[(35, 1)].ma) == 2 and np.isnan(out[(35, 1)].ma).all()
+    assert len(out[(36, 1)].ma) == 0
+
+
+def test_rolling_indicators_rejects_bad_window() -> None:
+    with pytest.raises(ValueError):
+        rolling_indicators([1, 2, 3], 1)
@@ -8,13 +8,15 @@ import pytest
 from indy_math.planner import (
     Character,
     Facility,
+    IncrementalPlanner,
     Job,
     PlanningError,
+    optimize_window,
+    plan_metrics,
     plan_window,
     recommend_assignments,
 )
 
-
 START = datetime(2024, 4, 1, 0, 0, 0)
 
 
@@ -88,3 +90,299 @@ def test_plan_window_validates_end_before_start() -> None:
     with pytest.raises(PlanningError):
         plan_window(START, START, jobs, characters, [])
 
+
+def test_plan_window_fills_earliest_slot_with_lowest_index_on_ties() -> None:
+    jobs = [
+        Job(
+            job_id="a",
+            activity="Manufacturing",
+            runs=5,
+            per_run_minutes=Decimal("10.26"),
+            batch_size=1,
+        ),
+        Job(
+            job_id="b",
+            activity="Manufacturing",
+            runs=1,
+            per_run_minutes=Decimal("600"),
+            batch_size=1,
+            priority=1,
+        ),
+        Job(
+            job_id="c",
+            activity="Manufacturing",
+            runs=1,
+            per_run_minutes=Decimal("5"),
+            batch_size=1,
+            priority=2,
+        ),
+    ]
+    characters = [Character(character_id=1, name="A", activity_slots={"Manufacturing": 3})]
+    end = START + timedelta(hours=1)
+
+    result = plan_window(START, end, jobs, characters, [])
+
+    tasks = result.characters[1].activities["Manufacturing"].tasks
+    placed = [
+        (t.job_id, t.slot_index, t.start)
+        for t in sorted(tasks, key=lambda t: (t.job_id, t.start, t.slot_index))
+    ]
+    batch = timedelta(minutes=10, seconds=15, milliseconds=600)
+    assert placed == [
+        ("a", 0, START),
+        ("a", 1, START),
+        ("a", 2, START),
+        ("a", 0, START + batch),
+        ("a", 1, START + batch),
+        ("c", 2, START + batch),
+    ]
+    # "b" does not fit; its slot stays free for "c"
+    assert [(o.job_id, o.slot_index) for o in result.overflow] == [("b", 2)]
+
+
+def test_recommend_assignments_breaks_ties_by_character_id_then_facility_order() -> None:
+    jobs = [Job(job_id="t", activity="Manufacturing", runs=1, per_run_minutes=Decimal("10"))]
+    characters = [
+        Character(
+            character_id=9,
+            name="Late",
+            activity_slots={"Manufacturing": 1},
+            time_multipliers={"Manufacturing": Decimal("0.9")},
+        ),
+        Character(
+            character_id=3,
+            name="Early",
+            activity_slots={"Manufacturing": 1},
+            time_multipliers={"Manufacturing": Decimal("0.90")},
+        ),
+        Character(
+            character_id=1,
+            name="Idle",
+            activity_slots={"Reaction": 1},
+            time_multipliers={"Manufacturing": Decimal("0.5")},
+        ),
+    ]
+    facilities = [
+        Facility(
+            structure_id="b",
+            name="Bravo",
+            activity="manufacturing",
+            time_multiplier=Decimal("0.95"),
+        ),
+        Facility(
+            structure_id="a",
+            name="Alpha",
+            activity="Manufacturing",
+            time_multiplier=Decimal("0.95"),
+        ),
+    ]
+
+    (assignment,), unassigned = recommend_assignments(jobs, characters, facilities)
+
+    assert not unassigned
+    assert assignment.character.character_id == 3
+    assert assignment.facility and assignment.facility.structure_id == "a"
+    assert str(assignment.effective_minutes_per_run) == "8.5500"
+
+
+def test_optimize_window_spreads_batches_over_idle_characters() -> None:
+    jobs = [
+        Job(
+            job_id="hull",
+            activity="Manufacturing",
+            runs=8,
+            per_run_minutes=Decimal("60"),
+            batch_size=1,
+        )
+    ]
+    characters = [
+        Character(
+            character_id=1,
+            name="Fast",
+            activity_slots={"Manufacturing": 1},
+            time_multipliers={"Manufacturing": Decimal("0.8")},
+        ),
+        Character(
+            character_id=2,
+            name="Slow",
+            activity_slots={"Manufacturing": 2},
+            time_multipliers={"Manufacturing": Decimal("1.0")},
+        ),
+    ]
+    end = START + timedelta(hours=3)
+
+    greedy = plan_window(START, end, jobs, characters, [])
+    optimized = optimize_window(START, end, jobs, characters, [], time_budget=1.0)
+
+    # Greedy stacks every batch on the fastest character: 3 x 48 min fit in 3 hours
+    assert plan_metrics(greedy).runs == 3
+    assert optimized.improved
+    assert optimized.greedy.runs == 3
+    # All 8 fit: 3 on the fast slot, the other 5 across the slow character's two slots
+    assert optimized.optimized.runs == 8
+    assert optimized.runs_gain == 5
+    assert optimized.utilization_gain > 0
+    for schedule in optimized.result.characters.values():
+        for tasks in schedule.activities.values():
+            assert all(task.end <= end for task in tasks.tasks)
+    assert {a.character.character_id for a in optimized.result.assignments} == {1, 2}
+
+
+def test_optimize_window_keeps_greedy_plan_when_it_cannot_improve() -> None:
+    jobs = [Job(job_id="x", activity="Manufacturing", runs=2, per_run_minutes=Decimal("30"))]
+    characters = [Character(character_id=1, name="A", activity_slots={"Manufacturing": 2})]
+
+    optimized = optimize_window(
+        START, START + timedelta(hours=1), jobs, characters, [], time_budget=1.0
+    )
+
+    assert not optimized.improved
+    assert optimized.optimized == optimized.greedy
+    assert optimized.result.characters[1].activities["Manufacturing"].tasks
+
+
+def test_optimize_window_reports_an_exhausted_budget() -> None:
+    jobs = [
+        Job(
+            job_id="hull",
+            activity="Manufacturing",
+            runs=8,
+            per_run_minutes=Decimal("60"),
+            batch_size=1,
+        )
+    ]
+    characters = [
+        Character(
+            character_id=1,
+            name="Fast",
+            activity_slots={"Manufacturing": 1},
+            time_multipliers={"Manufacturing": Decimal("0.8")},
+        ),
+        Character(
+            character_id=2,
+            name="Slow",
+            activity_slots={"Manufacturing": 2},
+            time_multipliers={"Manufacturing": Decimal("1.0")},
+        ),
+    ]
+    end = START + timedelta(hours=3)
+    readings: list[float] = []
+
+    def clock() -> float:
+        # Each reading is one second later, so the budget is gone before any batch is priced
+        readings.append(float(len(readings)))
+        return readings[-1]
+
+    optimized = optimize_window(START, end, jobs, characters, [], time_budget=0.5, clock=clock)
+
+    assert not optimized.improved and not optimized.completed
+    assert optimized.result == plan_window(START, end, jobs, characters, [])
+    assert optimized.elapsed_seconds == readings[-1] - readings[0]
+    roomy = optimize_window(START, end, jobs, characters, [], time_budget=1.0)
+    assert roomy.improved and roomy.completed and roomy.elapsed_seconds > 0
+
+
+def _plan_view(result):  # noqa: ANN001, ANN202
+    tasks = [
+        (cid, activity, t.job_id, t.runs, t.slot_index, t.start, t.end)
+        for cid, schedule in result.characters.items()
+        for activity, plan in schedule.activities.items()
+        for t in plan.tasks
+    ]
+    overflow = [(t.job_id, t.runs, t.slot_index) for t in result.overflow]
+    assigned = [(a.job.job_id, a.character.character_id) for a in result.assignments]
+    return tasks, overflow, assigned, [j.job_id for j in result.unassigned]
+
+
+def test_incremental_planner_matches_full_replan_after_diffs() -> None:
+    characters = [
+        Character(
+            character_id=1,
+            name="A",
+            activity_slots={"Manufacturing": 2},
+            time_multipliers={"Manufacturing": Decimal("0.9")},
+        ),
+        Character(character_id=2, name="B", activity_slots={"Manufacturing": 1, "Reaction": 1}),
+    ]
+    jobs = [
+        Job(
+            job_id="a",
+            activity="Manufacturing",
+            runs=6,
+            per_run_minutes=Decimal("30"),
+            batch_size=2,
+        ),
+        Job(
+            job_id="b",
+            activity="Reaction",
+            runs=4,
+            per_run_minutes=Decimal("60"),
+            batch_size=1,
+            priority=1,
+        ),
+        Job(
+            job_id="c", activity="Manufacturing", runs=3, per_run_minutes=Decimal("45"), priority=2
+        ),
+    ]
+    end = START + timedelta(hours=4)
+    planner = IncrementalPlanner(START, end, jobs, characters, [])
+
+    def assert_matches_full() -> None:
+        full = plan_window(START, end, planner.jobs, planner.characters, [])
+        assert _plan_view(planner.result) == _plan_view(full)
+
+    assert_matches_full()
+    replanned = planner.update(
+        upsert_jobs=[
+            Job(job_id="d", activity="Reaction", runs=2, per_run_minutes=Decimal("20"), priority=3)
+        ]
+    )
+    assert replanned == {(2, "Reaction")}  # Manufacturing timelines untouched
+    assert_matches_full()
+
+    replanned = planner.update(remove_jobs=["a"])
+    assert replanned == {(1, "Manufacturing")}
+    assert_matches_full()
+
+    # Character 2 becomes the fastest builder: every timeline of both characters moves
+    planner.update(
+        upsert_characters=[
+            Character(
+                character_id=2,
+                name="B",
+                activity_slots={"Manufacturing": 3, "Reaction": 1},
+                time_multipliers={"Manufacturing": Decimal("0.5")},
+            )
+        ]
+    )
+    assignments = planner.result.assignments
+    builders = {a.character.character_id for a in assignments if a.job.activity == "Manufacturing"}
+    assert builders == {2}
+    assert_matches_full()
+
+    planner.update(remove_characters=[2])
+    assert [j.job_id for j in planner.result.unassigned] == ["b", "d"]
+    assert_matches_full()
+
+
+def test_incremental_planner_keeps_previous_plan_on_error() -> None:
+    planner = IncrementalPlanner(
+        START,
+        START + timedelta(hours=1),
+        [Job(job_id="x", activity="Manufacturing", runs=1, per_run_minutes=Decimal("10"))],
+        [Character(character_id=1, name="A", activity_slots={"Manufacturing": 1})],
+        [],
+    )
+    before = _plan_view(planner.result)
+
+    with pytest.raises(PlanningError):
+        planner.update(remove_jobs=["missing"])
+    with pytest.raises(PlanningError):
+        planner.update(
+            upsert_jobs=[
+                Job(job_id="y", activity="Manufacturing", runs=1, per_run_minutes=Decimal("-1"))
+            ]
+        )
+
+    assert _plan_view(planner.result) == before
+    assert [j.job_id for j in planner.jobs] == ["x"]
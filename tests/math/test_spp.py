@@ -7,6 +7,7 @@ from indy_math.spp import (
     DepthForecast,
     PricePolicy,
     recommend_batch_size,
+    spp_grid,
     spp_lead_time_aware,
 )
 
@@ -96,3 +97,127 @@ def test_spp_deterministic_results() -> None:
 def test_recommend_batch_requires_options() -> None:
     with pytest.raises(ValueError):
         recommend_batch_size([], Decimal("0.5"), Decimal("5"))
+
+
+def test_spp_grid_matches_scalar_evaluation() -> None:
+    policy = PricePolicy(listing_markup=Decimal("0.02"), minimum_spread=Decimal("0.03"))
+    clock = lambda: datetime(2024, 1, 1)  # noqa: E731
+    leads = [Decimal("0"), Decimal("0.5"), Decimal("2"), Decimal("7")]
+    horizons = [Decimal("0.25"), Decimal("1"), Decimal("3"), Decimal("10")]
+    common = dict(
+        depth_ahead_now=25,
+        dv_forecast_fn=lambda when: DepthForecast(
+            expected_daily_demand=Decimal("4") + when.day, expected_new_listings=Decimal("6")
+        ),
+        drift_rate=Decimal("-0.04"),
+        price_policy=policy,
+        spread_at_list=Decimal("0.07"),
+        vol_stdev_at_list=Decimal("0.12"),
+        batch_options=[5, 1, 20, 10],
+        clock=clock,
+    )
+    grid = spp_grid(lead_time_days=leads, horizon_days=horizons, **common)
+
+    assert grid.spp.shape == (len(leads), len(horizons))
+    for i, lead in enumerate(leads):
+        for j, horizon in enumerate(horizons):
+            ref = spp_lead_time_aware(
+                lead_time_days=lead, horizon_days=horizon, price_best_now=Decimal("100"), **common
+            )
+            assert Decimal(f"{grid.spp[i, j]:.4f}") == ref.spp
+            assert grid.recommended_batch[i, j] == ref.recommended_batch
+            diag = ref.diagnostics
+            assert Decimal(f"{grid.queue_at_listing[i, j]:.4f}") == diag.queue_at_listing
+            assert Decimal(f"{grid.demand_over_horizon[i, j]:.4f}") == diag.demand_over_horizon
+            assert Decimal(f"{grid.drift_adjustment[i, j]:.4f}") == diag.drift_adjustment
+
+
+def test_spp_grid_defaults_to_first_option_without_demand() -> None:
+    policy = PricePolicy(listing_markup=Decimal("0.02"), minimum_spread=Decimal("0.03"))
+    grid = spp_grid(
+        depth_ahead_now=0,
+        dv_forecast_fn=lambda _: DepthForecast(
+            expected_daily_demand=Decimal("0"), expected_new_listings=Decimal("1")
+        ),
+        lead_time_days=[Decimal("1")],
+        horizon_days=[Decimal("1"), Decimal("5")],
+        drift_rate=Decimal("0"),
+        price_policy=policy,
+        spread_at_list=Decimal("0.03"),
+        vol_stdev_at_list=Decimal("0"),
+        batch_options=[3, 1, 2],
+    )
+    assert grid.spp.tolist() == [[1.0, 1.0]]
+    assert grid.recommended_batch.tolist() == [[3, 3]]
+    with pytest.raises(ValueError):
+        spp_grid(0, lambda _: None, [1], [1], Decimal("0"), policy, Decimal("0"), Decimal("0"), [])
+
+
+def test_spp_grid_agrees_with_decimal_path_on_sampled_scenarios() -> None:
+    import random
+
+    rng = random.Random(7)
+    clock = lambda: datetime(2024, 1, 1)  # noqa: E731
+    for _ in range(40):
+        demand = Decimal(str(round(rng.uniform(-1, 30), 2)))
+        listings = Decimal(str(round(rng.uniform(0, 20), 2)))
+        common = dict(
+            depth_ahead_now=rng.randint(0, 200),
+            dv_forecast_fn=lambda _, d=demand, n=listings: DepthForecast(d, n),
+            drift_rate=Decimal(str(round(rng.uniform(-0.5, 0.2), 3))),
+            price_policy=PricePolicy(Decimal("0.02"), Decimal(str(round(rng.uniform(0, 0.1), 3)))),
+            spread_at_list=Decimal(str(round(rng.uniform(0, 2), 3))),
+            vol_stdev_at_list=Decimal(str(round(rng.uniform(0, 4), 3))),
+            batch_options=[rng.randint(1, 60) for _ in range(3)],
+            clock=clock,
+        )
+        leads = [Decimal(str(round(rng.uniform(0, 10), 2))) for _ in range(4)]
+        horizons = [Decimal(str(round(rng.uniform(0, 10), 2))) for _ in range(4)]
+        grid = spp_grid(lead_time_days=leads, horizon_days=horizons, **common)
+        for i, lead in enumerate(leads):
+            for j, horizon in enumerate(horizons):
+                ref = spp_lead_time_aware(
+                    lead_time_days=lead,
+                    horizon_days=horizon,
+                    price_best_now=Decimal("100"),
+                    **common,
+                )
+                diag = ref.diagnostics
+                assert f"{grid.spp[i, j]:.4f}" == str(ref.spp)
+                assert grid.recommended_batch[i, j] == ref.recommended_batch
+                assert f"{grid.drift_adjustment[i, j]:.4f}" == str(diag.drift_adjustment)
+                assert f"{grid.volatility_adjustment[i, j]:.4f}" == str(diag.volatility_adjustment)
+
+
+def test_spp_grid_matches_decimal_path_next_to_rounding_ties() -> None:
+    import random
+
+    rng = random.Random(3)
+    clock = lambda: datetime(2024, 1, 1)  # noqa: E731
+    policy = PricePolicy(Decimal("0.02"), Decimal("0.03"))
+    forecast = lambda _: DepthForecast(Decimal("1"), Decimal("0"))  # noqa: E731
+    depth = 754358
+    # Horizons whose SPP lands within float error of x.xxxx5, on either side
+    horizons: list[Decimal | float] = [Decimal("817384.889884362954")]
+    for _ in range(200):
+        tie = (rng.randint(1, 9998) + 0.5) / 10_000
+        horizons.append(tie * depth / (1 - tie))
+    common = dict(
+        depth_ahead_now=depth,
+        dv_forecast_fn=forecast,
+        drift_rate=Decimal("0"),
+        price_policy=policy,
+        spread_at_list=Decimal("0.03"),
+        vol_stdev_at_list=Decimal("0"),
+        batch_options=[1],
+        clock=clock,
+    )
+    grid = spp_grid(lead_time_days=[Decimal("0")], horizon_days=horizons, **common)
+    for j, horizon in enumerate(horizons):
+        exact = horizon if isinstance(horizon, Decimal) else Decimal(repr(horizon))
+        ref = spp_lead_time_aware(
+            lead_time_days=Decimal("0"), horizon_days=exact, price_best_now=Decimal("100"), **common
+        )
+        assert f"{grid.spp[0, j]:.4f}" == str(ref.spp)
+        assert f"{grid.demand_over_horizon[0, j]:.4f}" == str(ref.diagnostics.demand_over_horizon)
+    assert f"{grid.spp[0, 0]:.4f}" == "0.5200"
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from app import db
+from app.config import Settings
+
+
+def test_engine_registry_reuses_engine_per_url() -> None:
+    db.dispose_engines()
+    s = Settings(database_url="sqlite://")
+    first = db.get_engine(s)
+    second = db.get_engine(Settings(database_url="sqlite://"))
+    assert first is second
+
+    other = db.get_engine(Settings(database_url="sqlite:///:memory:"))
+    assert other is not first
+    db.dispose_engines()
+
+
+def test_pool_metrics_and_dispose() -> None:
+    db.dispose_engines()
+    engine = db.get_engine(Settings(database_url="sqlite://"))
+    with engine.connect():
+        pass
+    metrics = db.pool_metrics()
+    assert "sqlite://" in metrics
+    assert "status" in metrics["sqlite://"]
+
+    db.dispose_engines()
+    assert db.pool_metrics() == {}
+    assert db.get_engine(Settings(database_url="sqlite://")) is not engine
+    db.dispose_engines()
+
+
+def test_metrics_endpoint_includes_db_pool() -> None:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    resp = TestClient(app).get("/metrics")
+    assert resp.status_code == 200
+    assert "db_pool" in resp.json()
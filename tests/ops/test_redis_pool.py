@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import fakeredis
+
+from app import redis_pool
+from app.config import Settings
+
+
+def test_get_redis_shares_one_pool_per_url() -> None:
+    redis_pool.close_redis_pools()
+    s = Settings(
+        redis_url="redis://localhost:6390/0", redis_max_connections=7, redis_socket_timeout=0.5
+    )
+    a = redis_pool.get_redis(s)
+    b = redis_pool.get_redis(Settings(redis_url="redis://localhost:6390/0"))
+    c = redis_pool.get_redis(Settings(redis_url="redis://localhost:6390/1"))
+
+    assert a.connection_pool is b.connection_pool
+    assert c.connection_pool is not a.connection_pool
+    kwargs = a.connection_pool.connection_kwargs
+    assert kwargs["socket_timeout"] == 0.5
+    assert kwargs["decode_responses"] is True
+    assert kwargs["health_check_interval"] == s.redis_health_check_interval
+    redis_pool.close_redis_pools()
+
+
+def test_redis_pool_metrics_report_in_use_and_idle() -> None:
+    redis_pool.close_redis_pools()
+    server = fakeredis.FakeServer()
+    s = Settings(redis_url="redis://:secret@localhost:6391/0")
+    pool = redis_pool._pool_for(s)
+    pool.connection_class = fakeredis.FakeConnection
+    pool.connection_kwargs["server"] = server
+    pool.connection_kwargs.pop("password", None)  # fake server has no auth
+
+    client = redis_pool.get_redis(s)
+    client.set("k", "v")
+    held = pool.get_connection("GET")
+    metrics = redis_pool.redis_pool_metrics()
+
+    key = "redis://:***@localhost:6391/0"
+    # The connection used by SET was returned and then checked out again
+    assert metrics[key]["in_use"] == 1
+    assert metrics[key]["idle"] == 0
+    assert metrics[key]["created"] == 1
+    assert metrics[key]["max"] == s.redis_max_connections
+    pool.release(held)
+    assert redis_pool.redis_pool_metrics()[key]["idle"] == 1
+
+    redis_pool.close_redis_pools()
+    assert redis_pool.redis_pool_metrics() == {}
+
+
+def test_metrics_endpoint_includes_redis_pool() -> None:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    resp = TestClient(app).get("/metrics")
+    assert resp.status_code == 200
+    assert "redis_pool" in resp.json()
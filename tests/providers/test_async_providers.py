@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+from decimal import Decimal
+
+import httpx
+import pytest
+
+from app.providers import AsyncAdam4EVEProvider, AsyncFuzzworkProvider, CircuitBreakerOpen
+from app.providers.base import AsyncHTTPPriceProvider, CircuitBreaker
+
+A4E_PAYLOAD = {
+    "bid": "5.10",
+    "ask": "5.90",
+    "volatility": "0.12",
+    "depth": {"qty_1pct": "1000", "qty_5pct": "3500"},
+    "updated": "2024-04-01T00:00:00",
+}
+
+
+class CountingLimiter:
+    def __init__(self) -> None:
+        self.keys: list[str] = []
+
+    async def acquire(self, key: str) -> None:
+        self.keys.append(key)
+
+
+def test_async_adam4eve_fans_out_with_bounded_concurrency() -> None:
+    in_flight = {"now": 0, "peak": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        if request.url.path.startswith("/market/type/36/"):
+            return httpx.Response(404, json={"error": "unknown type"})
+        return httpx.Response(200, json=A4E_PAYLOAD)
+
+    limiter = CountingLimiter()
+
+    async def run():
+        provider = AsyncAdam4EVEProvider(
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            base_url="https://example.com",
+            breaker=CircuitBreaker(max_failures=10),
+            rate_limiter=limiter,
+            max_concurrency=3,
+            max_attempts=1,
+        )
+        try:
+            return await provider.get_many([(t, 10000002) for t in range(30, 40)])
+        finally:
+            await provider.aclose()
+
+    results = asyncio.run(run())
+
+    ok = [r.type_id for r in results if not isinstance(r, Exception)]
+    assert ok == [30, 31, 32, 33, 34, 35, 37, 38, 39]
+    assert isinstance(results[6], httpx.HTTPStatusError)
+    assert results[0].mid == Decimal("5.50") and results[0].provider == "adam4eve"
+    assert 1 < in_flight["peak"] <= 3
+    assert limiter.keys == ["adam4eve:/market/type"] * 10
+
+
+def test_async_fuzzwork_success_and_circuit_breaker() -> None:
+    payload = {
+        "buy": {"price": "4.95", "volume": "1200"},
+        "sell": {"price": "5.40", "volume": "800"},
+        "generated": "2024-04-01T00:00:00",
+        "depth": {"qty_1pct": "600", "qty_5pct": "2500"},
+    }
+    status = {"code": 200}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/orders/type/34/region/10000002"
+        return httpx.Response(status["code"], json=payload)
+
+    async def run():
+        provider = AsyncFuzzworkProvider(
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            base_url="https://example.com",
+            breaker=CircuitBreaker(max_failures=1),
+            max_attempts=1,
+        )
+        quote = await provider.get(34, 10000002)
+        status["code"] = 503
+        with pytest.raises(httpx.HTTPStatusError):
+            await provider.get(34, 10000002)
+        with pytest.raises(CircuitBreakerOpen):
+            await provider.get(34, 10000002)
+        await provider.aclose()
+        return quote
+
+    quote = asyncio.run(run())
+    assert quote.provider == "fuzzwork"
+    assert quote.ask == Decimal("5.40")
+    assert quote.volatility == Decimal("0.1")
+
+
+def test_get_many_counts_a_partly_failed_batch_against_the_breaker() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.startswith("/market/type/36/"):
+            return httpx.Response(503, json={"error": "busy"})
+        return httpx.Response(200, json=A4E_PAYLOAD)
+
+    breaker = CircuitBreaker(max_failures=2)
+
+    async def run():
+        provider = AsyncAdam4EVEProvider(
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            base_url="https://example.com",
+            breaker=breaker,
+            max_attempts=1,
+        )
+        try:
+            batches = [
+                await provider.get_many([(t, 10000002) for t in range(30, 40)]) for _ in range(3)
+            ]
+        finally:
+            await provider.aclose()
+        return batches
+
+    first, second, third = asyncio.run(run())
+
+    # Successes in the same fan-out do not reset the failure from type 36
+    assert sum(isinstance(r, Exception) for r in first) == 1
+    assert breaker.failure_count == 2
+    assert sum(isinstance(r, Exception) for r in second) == 1
+    assert all(isinstance(r, CircuitBreakerOpen) for r in third)
+
+
+def test_async_http_provider_requires_path_and_parse() -> None:
+    with pytest.raises(TypeError):
+        AsyncHTTPPriceProvider(client=None, base_url="https://example.com")  # type: ignore[abstract]
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone
+
+import fakeredis
+import httpx
+
+from app.providers.esi import ESIClient
+from app.providers.esi_cache import MemoryESICache, RedisESICache
+
+JOB = {
+    "job_id": 1,
+    "blueprint_type_id": 1234,
+    "runs": 10,
+    "activity_id": 1,
+    "status": "active",
+    "start_date": "2024-04-10T10:00:00Z",
+    "installer_id": 42,
+    "location_id": 60003760,
+}
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = datetime(2024, 4, 10, 12, 0, tzinfo=timezone.utc)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+def _esi_server(seen: list[httpx.Request]):
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        headers = {
+            "ETag": '"v1"',
+            "Date": "Wed, 10 Apr 2024 12:00:00 GMT",
+            "Expires": "Wed, 10 Apr 2024 12:05:00 GMT",
+        }
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers=headers)
+        return httpx.Response(200, json=[JOB], headers=headers)
+
+    return handler
+
+
+def test_cached_until_expires_then_revalidated_with_etag() -> None:
+    seen: list[httpx.Request] = []
+    clock = Clock()
+    esi = ESIClient(
+        client=httpx.Client(transport=httpx.MockTransport(_esi_server(seen))),
+        base_url="https://esi.test",
+        token_provider=None,
+        clock=clock,
+    )
+
+    first = esi.list_industry_jobs("corp")
+    again = esi.list_industry_jobs("corp")
+    assert len(seen) == 1  # still before Expires
+    assert again.data == first.data
+
+    clock.now += timedelta(minutes=6)
+    revalidated = esi.list_industry_jobs("corp")
+    assert len(seen) == 2
+    assert seen[1].headers["If-None-Match"] == '"v1"'
+    # 304: the stored body is reused and not validated again
+    assert revalidated.data is first.data
+    assert revalidated.expires == datetime(2024, 4, 10, 12, 5, tzinfo=timezone.utc)
+
+
+def test_expiry_follows_server_date_not_local_clock() -> None:
+    seen: list[httpx.Request] = []
+    clock = Clock()
+    clock.now += timedelta(hours=1)  # local clock runs an hour ahead of ESI
+    esi = ESIClient(
+        client=httpx.Client(transport=httpx.MockTransport(_esi_server(seen))),
+        base_url="https://esi.test",
+        token_provider=None,
+        clock=clock,
+        http_cache=MemoryESICache(),
+    )
+    esi.list_industry_jobs("corp")
+    clock.now += timedelta(minutes=4)
+    esi.list_industry_jobs("corp")
+    assert len(seen) == 1
+
+
+def test_redis_cache_is_shared_between_clients() -> None:
+    seen: list[httpx.Request] = []
+    clock = Clock()
+    redis_client = fakeredis.FakeRedis(decode_responses=True)
+
+    def client() -> ESIClient:
+        return ESIClient(
+            client=httpx.Client(transport=httpx.MockTransport(_esi_server(seen))),
+            base_url="https://esi.test",
+            token_provider=None,
+            clock=clock,
+            http_cache=RedisESICache(redis_client),
+        )
+
+    client().list_industry_jobs("corp")
+    other = client()
+    assert other.list_industry_jobs("corp").data[0].job_id == 1
+    assert len(seen) == 1
+
+    clock.now += timedelta(minutes=10)
+    assert other.list_industry_jobs("corp").data[0].job_id == 1
+    assert seen[-1].headers["If-None-Match"] == '"v1"'
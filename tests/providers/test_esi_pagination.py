@@ -0,0 +1,127 @@
+import threading
+import time
+
+import httpx
+
+from app.providers.esi import ESIClient
+
+
+def _asset(item_id: int) -> dict:
+    return {
+        "item_id": item_id,
+        "type_id": 34,
+        "quantity": 1,
+        "location_id": 60003760,
+        "is_singleton": False,
+    }
+
+
+def _job(job_id: int) -> dict:
+    return {
+        "job_id": job_id,
+        "blueprint_type_id": 1234,
+        "runs": 1,
+        "activity_id": 1,
+        "status": "active",
+        "start_date": "2024-04-10T10:00:00Z",
+        "installer_id": 42,
+        "location_id": 60003760,
+    }
+
+
+class PagedAssets:
+    """Serves 4 pages of 2 assets; later pages answer faster than earlier ones."""
+
+    def __init__(self) -> None:
+        self.pages_requested: list[int] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params.get("page", "1"))
+        with self._lock:
+            self.pages_requested.append(page)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.02 * (5 - page) if page > 1 else 0)
+        with self._lock:
+            self.in_flight -= 1
+        return httpx.Response(
+            200, json=[_asset(page * 10), _asset(page * 10 + 1)], headers={"X-Pages": "4"}
+        )
+
+
+class CountingLimiter:
+    def __init__(self) -> None:
+        self.keys: list[str] = []
+        self._lock = threading.Lock()
+
+    def block_until_allowed(self, key: str) -> None:
+        with self._lock:
+            self.keys.append(key)
+
+
+def _client(server: PagedAssets, limiter: CountingLimiter | None = None) -> ESIClient:
+    return ESIClient(
+        client=httpx.Client(transport=httpx.MockTransport(server)),
+        base_url="https://esi.test",
+        token_provider=None,
+        rate_limiter=limiter,  # type: ignore[arg-type]
+        page_concurrency=3,
+    )
+
+
+def test_list_assets_fetches_every_page_in_order() -> None:
+    server = PagedAssets()
+    limiter = CountingLimiter()
+    assets = _client(server, limiter).list_assets("corp")
+
+    assert [a.item_id for a in assets.data] == [10, 11, 20, 21, 30, 31, 40, 41]
+    assert sorted(server.pages_requested) == [1, 2, 3, 4]
+    assert server.max_in_flight > 1  # pages 2..4 overlapped
+    assert limiter.keys == ["esi:/assets/corp"] * 4
+
+
+def test_iter_industry_jobs_streams_pages_as_they_arrive() -> None:
+    last_page_seen = threading.Event()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params.get("page", "1"))
+        if page in (2, 3):
+            # Held until the caller has consumed page 4, which only streaming allows
+            assert last_page_seen.wait(5)
+        return httpx.Response(
+            200, json=[_job(page * 10), _job(page * 10 + 1)], headers={"X-Pages": "4"}
+        )
+
+    esi = ESIClient(
+        client=httpx.Client(transport=httpx.MockTransport(handler)),
+        base_url="https://esi.test",
+        token_provider=None,
+        page_concurrency=3,
+    )
+    ids = []
+    for job in esi.iter_industry_jobs("corp"):
+        ids.append(job.job_id)
+        if job.job_id == 41:
+            last_page_seen.set()
+
+    assert ids[:4] == [10, 11, 40, 41]
+    assert sorted(ids) == [10, 11, 20, 21, 30, 31, 40, 41]
+
+
+def test_single_page_route_makes_one_request() -> None:
+    server = PagedAssets()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        server.pages_requested.append(1)
+        return httpx.Response(200, json=[_job(1)])
+
+    esi = ESIClient(
+        client=httpx.Client(transport=httpx.MockTransport(handler)),
+        base_url="https://esi.test",
+        token_provider=None,
+    )
+    assert [j.job_id for j in esi.iter_industry_jobs("char")] == [1]
+    assert server.pages_requested == [1]
@@ -16,3 +16,17 @@ def test_make_esi_public() -> None:
     esi = make_esi(s)
     assert esi is not None
 
+
+
+def test_make_async_price_providers() -> None:
+    import asyncio
+
+    from app.providers import AsyncAdam4EVEProvider, AsyncFuzzworkProvider
+    from app.providers.factory import make_async_price_provider
+
+    s = Settings()
+    a4e = make_async_price_provider("adam4eve", s)
+    fw = make_async_price_provider("fuzzwork", s)
+    assert isinstance(a4e, AsyncAdam4EVEProvider) and isinstance(fw, AsyncFuzzworkProvider)
+    asyncio.run(a4e.aclose())
+    asyncio.run(fw.aclose())
@@ -28,3 +28,9 @@ def test_limiter_configuration_from_settings(monkeypatch) -> None:
     assert a4e.try_acquire(key) is True
     assert fw.try_acquire(key) is True
 
+
+def test_limiter_is_shared_per_provider() -> None:
+    s = Settings(esi_capacity=3.0, esi_refill_rate=1.0)
+    assert limiter_for_provider("esi", s) is limiter_for_provider("ESI", s)
+    reconfigured = limiter_for_provider("esi", Settings(esi_capacity=4.0))
+    assert reconfigured is not limiter_for_provider("esi", s)
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.repos import Job, JobState, job_state
+from app.repos.pg_industry import PgInventoryRepo, PgJobsRepo
+
+
+def _job(job_id: int, status: str = "active", location_id: int | None = 60003760) -> Job:
+    return Job(
+        job_id=job_id,
+        owner_scope="corp",
+        char_id=123,
+        type_id=603,
+        activity="manufacturing",
+        runs=2,
+        start_time=datetime(2024, 4, 1, tzinfo=timezone.utc),
+        end_time=None,
+        status=status,
+        location_id=location_id,
+        facility_id=None,
+        fees_isk=Decimal("0"),
+    )
+
+
+class FakeResult:
+    def __init__(self, rows: list[tuple]) -> None:
+        self._rows = rows
+
+    def fetchall(self) -> list[tuple]:
+        return self._rows
+
+
+class FakeConn:
+    def __init__(self, rows: list[tuple] | None = None) -> None:
+        self.calls: list[tuple[str, dict]] = []
+        self._rows = rows or []
+
+    def execute(self, sql, params):  # noqa: ANN001
+        self.calls.append((str(sql), params))
+        return FakeResult(self._rows)
+
+
+def test_upsert_is_one_statement_with_stored_statuses() -> None:
+    conn = FakeConn()
+
+    PgJobsRepo(conn).upsert_jobs(
+        "corp", [_job(i, "ready" if i == 3 else "active") for i in range(1, 6)]
+    )
+
+    assert len(conn.calls) == 1
+    sql, params = conn.calls[0]
+    assert "unnest(" in sql and "ON CONFLICT (job_id)" in sql
+    assert params["job_id"] == [1, 2, 3, 4, 5]
+    assert params["status"] == ["active"] * 5
+
+
+def test_get_job_states_locks_then_reads_once() -> None:
+    end = datetime(2024, 4, 2, tzinfo=timezone.utc)
+    conn = FakeConn(
+        rows=[
+            (1, "active", 2, None, 60003760, None, Decimal("0")),
+            (2, "delivered", 1, end, None, 7, None),
+        ]
+    )
+
+    states = PgJobsRepo(conn).get_job_states("corp", [1, 2, 3])
+
+    assert states == {
+        1: JobState("active", 2, None, 60003760, None, Decimal("0")),
+        2: JobState("delivered", 1, end, None, 7, None),
+    }
+    lock_sql, read_sql = conn.calls[0][0], conn.calls[1][0]
+    assert "pg_advisory_xact_lock" in lock_sql and "FOR UPDATE" in read_sql
+    assert conn.calls[1][1] == {"owner": "corp", "ids": [1, 2, 3]}
+    assert PgJobsRepo(conn).get_job_states("corp", []) == {}
+    assert len(conn.calls) == 2
+
+
+def test_inventory_bulk_statements_skip_unlocated_jobs() -> None:
+    conn = FakeConn()
+    repo = PgInventoryRepo(conn)
+    jobs = [_job(1), _job(2), _job(3, location_id=None)]
+
+    repo.reserve_for_jobs(jobs)
+    repo.release_for_jobs(jobs)
+    repo.settle_outputs(jobs)
+    repo.reserve_for_jobs([_job(4, location_id=None)])
+
+    # reserve, release, settle into inventory and inventory_by_loc; nothing for the last call
+    assert len(conn.calls) == 4
+    reserve_sql, params = conn.calls[0]
+    assert "qty_reserved = inventory_by_loc.qty_reserved + EXCLUDED.qty_reserved" in reserve_sql
+    assert params["type_id"] == [603, 603]
+    assert params["location_id"] == [60003760, 60003760]
+    assert "greatest(0, i.qty_reserved - d.qty)" in conn.calls[1][0]
+    assert "INSERT INTO inventory (" in conn.calls[2][0]
+    assert "INSERT INTO inventory_by_loc" in conn.calls[3][0]
+
+
+# Integration tests: use the `pg_engine` / `pg_conn` fixtures from tests/conftest.py
+
+_OWNER = "test:pg-industry"  # keeps clear of rows already in the database
+
+
+def _qty(conn, table: str, column: str, type_id: int) -> Decimal | None:  # noqa: ANN001
+    return conn.execute(
+        text(f"SELECT {column} FROM {table} WHERE owner_scope = :o AND type_id = :t"),
+        {"o": _OWNER, "t": type_id},
+    ).scalar()
+
+
+def test_bulk_statements_against_postgres(pg_conn) -> None:  # noqa: ANN001
+    pg_conn.execute(
+        text(
+            """
+            INSERT INTO blueprints (type_id, product_id, activity, materials, output_qty)
+            VALUES (603, 604, 'manufacturing', CAST(:materials AS json), 3)
+            ON CONFLICT (type_id, product_id, activity)
+            DO UPDATE SET materials = EXCLUDED.materials, output_qty = EXCLUDED.output_qty
+            """
+        ),
+        {"materials": '[{"type_id": 34, "qty": 10}, {"typeID": 35, "quantity": 2}]'},
+    )
+    jobs_repo = PgJobsRepo(pg_conn)
+    inv_repo = PgInventoryRepo(pg_conn)
+    located = replace(_job(9_000_001), owner_scope=_OWNER)
+    unlocated = replace(_job(9_000_002, location_id=None), owner_scope=_OWNER)
+
+    jobs_repo.upsert_jobs(_OWNER, [located, unlocated])
+    states = jobs_repo.get_job_states(_OWNER, [9_000_001, 9_000_002, 9_000_003])
+    assert states == {9_000_001: job_state(located), 9_000_002: job_state(unlocated)}
+
+    # runs=2: 20 x type 34 and 4 x type 35 per reservation; unlocated jobs hold nothing
+    inv_repo.reserve_for_jobs([located, unlocated])
+    inv_repo.reserve_for_jobs([located])
+    assert _qty(pg_conn, "inventory_by_loc", "qty_reserved", 34) == Decimal("40")
+    assert _qty(pg_conn, "inventory_by_loc", "qty_reserved", 35) == Decimal("8")
+    inv_repo.release_for_jobs([located])
+    assert _qty(pg_conn, "inventory_by_loc", "qty_reserved", 34) == Decimal("20")
+    inv_repo.release_for_jobs([located, located])
+    assert _qty(pg_conn, "inventory_by_loc", "qty_reserved", 34) == Decimal("0")
+
+    delivered = replace(located, status="delivered")
+    jobs_repo.upsert_jobs(_OWNER, [delivered])
+    assert jobs_repo.get_job_states(_OWNER, [9_000_001])[9_000_001].status == "delivered"
+    inv_repo.settle_outputs([delivered])
+    assert _qty(pg_conn, "inventory", "qty_on_hand", 604) == Decimal("6")
+    assert _qty(pg_conn, "inventory_by_loc", "qty_on_hand", 604) == Decimal("6")
+
+
+def test_state_read_locks_out_an_overlapping_sync(pg_engine) -> None:  # noqa: ANN001
+    with pg_engine.connect() as first, pg_engine.connect() as second:
+        tx_first, tx_second = first.begin(), second.begin()
+        try:
+            PgJobsRepo(first).get_job_states(_OWNER, [9_000_001])
+            second.execute(text("SET LOCAL lock_timeout = '200ms'"))
+            with pytest.raises(OperationalError):
+                PgJobsRepo(second).get_job_states(_OWNER, [9_000_001])
+        finally:
+            tx_second.rollback()
+            tx_first.rollback()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import random
 from decimal import Decimal
 
 import fakeredis
@@ -52,3 +53,145 @@ def test_spp_plus_batch_options_affect_recommendation(monkeypatch) -> None:
     assert res_alt["recommended_batch"] == 10
     assert res_default["recommended_batch"] != res_alt["recommended_batch"]
 
+
+def test_precompute_indicators_makes_api_path_a_cache_read(monkeypatch) -> None:
+    r = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(svc, "_get_redis", lambda *_: r)
+    series = {
+        (10000002, 34): [Decimal(v) for v in ("5.12", "5.18", "5.09", "5.21", "5.30", "5.27")],
+        (10000043, 35): [Decimal(v) for v in ("1250000000.5", "1260100000", "1249000000.25")],
+        (10000002, 36): [Decimal("9")],  # too short for a volatility window
+    }
+    queries: list[str] = []
+
+    class Conn:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):  # noqa: ANN002
+            return False
+
+        def execute(self, sql, params):  # noqa: ANN001
+            queries.append(str(sql))
+            lim = params["lim"]
+            return [(reg, t, px) for (reg, t), pts in series.items() for px in pts[-lim:]]
+
+    monkeypatch.setattr(
+        svc, "_get_engine", lambda *_: type("E", (), {"connect": lambda self: Conn()})()
+    )
+
+    assert svc.precompute_indicators(window=5) == 2
+    assert len(queries) == 1 and "row_number()" in queries[0]
+
+    # Reference values from the Decimal path, computed on demand
+    r.flushall()
+    expected = {}
+    for (region_id, type_id), pts in series.items():
+        if len(pts) < 2:
+            continue
+        monkeypatch.setattr(
+            svc, "_fetch_price_series", lambda conn, reg, t, lim, pts=pts: pts[-lim:]
+        )
+        expected[(region_id, type_id)] = svc.indicators(
+            type_id=type_id, region_id=region_id, window=5
+        )
+
+    def no_db(*_args):  # noqa: ANN002
+        raise AssertionError("API path should be served from cache")
+
+    r.flushall()
+    assert svc.precompute_indicators(window=5) == 2
+    monkeypatch.setattr(svc, "_fetch_price_series", no_db)
+    for (region_id, type_id), ref in expected.items():
+        assert svc.indicators(type_id=type_id, region_id=region_id, window=5) == ref
+    assert r.get("indicator:10000002:36:5") is None
+
+
+def test_indicators_cache_hit_with_binary_envelope(monkeypatch) -> None:
+    r = fakeredis.FakeRedis()  # raw bytes, like the shared analytics client
+    monkeypatch.setattr(svc, "_get_redis", lambda *_: r)
+
+    class Conn:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):  # noqa: ANN002
+            return False
+
+    monkeypatch.setattr(
+        svc, "_get_engine", lambda *_: type("E", (), {"connect": lambda self: Conn()})()
+    )
+    series = [Decimal("200.5"), Decimal("201"), Decimal("199.25"), Decimal("204"), Decimal("203")]
+    monkeypatch.setattr(svc, "_fetch_price_series", lambda *_: series)
+
+    fresh = svc.indicators(type_id=34, region_id=10000002, window=5)
+    assert r.get("indicator:10000002:34:5")[0] == 0xC1
+
+    def no_db(*_args):  # noqa: ANN002
+        raise RuntimeError("DB unavailable")
+
+    monkeypatch.setattr(svc, "_fetch_price_series", no_db)
+    cached = svc.indicators(type_id=34, region_id=10000002, window=5)
+    assert cached == fresh
+    assert isinstance(cached.bollinger.upper, Decimal)
+
+
+def test_indicators_cache_is_keyed_by_window(monkeypatch) -> None:
+    r = fakeredis.FakeRedis()
+    monkeypatch.setattr(svc, "_get_redis", lambda *_: r)
+    pts = [Decimal(v) for v in ("100", "104", "98", "107", "101", "110", "96", "112")]
+    series = {(10000002, 34): pts}
+
+    class Conn:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):  # noqa: ANN002
+            return False
+
+        def execute(self, sql, params):  # noqa: ANN001
+            return [(reg, t, px) for (reg, t), p in series.items() for px in p[-params["lim"] :]]
+
+    monkeypatch.setattr(
+        svc, "_get_engine", lambda *_: type("E", (), {"connect": lambda self: Conn()})()
+    )
+    monkeypatch.setattr(svc, "_fetch_price_series", lambda conn, reg, t, lim: pts[-lim:])
+    assert svc.precompute_indicators(window=5) == 1
+
+    wide = svc.indicators(type_id=34, region_id=10000002, window=8)
+    assert wide.ma == sum(pts) / 8
+    assert r.get("indicator:10000002:34:8") is not None
+    # The window-8 fill leaves the precomputed window-5 entry untouched
+    monkeypatch.setattr(
+        svc, "_fetch_price_series", lambda *_: (_ for _ in ()).throw(RuntimeError("no DB"))
+    )
+    assert svc.indicators(type_id=34, region_id=10000002, window=5).ma == sum(pts[-5:]) / 5
+    assert svc.indicators(type_id=34, region_id=10000002, window=8) == wide
+
+
+def test_bulk_indicators_match_decimal_path_at_rounding_ties() -> None:
+    # Prices on a 0.0001 grid: 4-point means land exactly on x.xxxx5 often, and
+    # the rolling float sums leave them a hair either side of the tie
+    rng = random.Random(1)
+    series_by_key = {
+        (10000002, t): [Decimal(rng.randint(1, 100_000)) / 10_000 for _ in range(10)]
+        for t in range(3000)
+    }
+    bulk = svc.compute_indicators_bulk(series_by_key, 4)
+    for key, series in series_by_key.items():
+        assert bulk[key] == svc._indicator_from_series(series, 4)
+
+
+def test_spp_plus_grid_cache_key_ignores_decimal_spelling(monkeypatch) -> None:
+    r = fakeredis.FakeRedis()
+    monkeypatch.setattr(svc, "_get_redis", lambda *_: r)
+    calls = []
+    compute = svc._compute_spp_grid
+    monkeypatch.setattr(svc, "_compute_spp_grid", lambda *a: calls.append(a) or compute(*a))
+
+    first = svc.spp_plus_grid(603, 10000002, [Decimal("1"), Decimal("10")], [Decimal("0.5")])
+    again = svc.spp_plus_grid(603, 10000002, [Decimal("1.0"), Decimal("1E+1")], [Decimal("0.50")])
+
+    assert len(calls) == 1
+    assert again == first
+    assert first["lead_time_days"] == ["1", "10"] and first["horizon_days"] == ["0.5"]
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from app.dependencies import get_settings
+from app.services import blueprint_graph as bg
+from app.services import bom as bom_service
+
+
+def _rows():
+    return [
+        # type_id, product_id, activity, materials, output_qty
+        (1001, 1000, "manufacturing", [{"type_id": 2000, "qty": 2}, {"type_id": 34, "qty": 10}], 1),
+        (
+            2001,
+            2000,
+            "reaction",
+            [{"type_id": 3000, "quantity": 5}, {"type_id": 35, "qty": 1}],
+            200,
+        ),
+        (3001, 3000, "reaction", [{"type_id": 36, "qty": 100}], 1),
+    ]
+
+
+class FakeConn:
+    def __init__(self, rows) -> None:  # noqa: ANN001
+        self.rows = rows
+        self.calls = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):  # noqa: ANN002
+        return False
+
+    def execute(self, sql):  # noqa: ANN001
+        self.calls += 1
+        return iter(self.rows)
+
+
+def test_graph_records_and_topological_order() -> None:
+    graph = bg.load_blueprint_graph(FakeConn(_rows()))
+    assert len(graph) == 3
+    rec = graph.get(2000)
+    assert rec is not None
+    assert rec.output_qty == 200
+    assert rec.activity == "reaction"
+    assert rec.materials == [{"type_id": 3000, "qty": 5}, {"type_id": 35, "qty": 1}]
+    order = list(graph.topo_order)
+    assert order.index(3000) < order.index(2000) < order.index(1000)
+
+
+def test_graph_tolerates_cycles() -> None:
+    rows = [
+        (11, 10, "manufacturing", [{"type_id": 20, "qty": 1}], 1),
+        (21, 20, "manufacturing", [{"type_id": 10, "qty": 1}], 1),
+    ]
+    graph = bg.load_blueprint_graph(FakeConn(rows))
+    assert sorted(graph.topo_order) == [10, 20]
+
+
+def test_build_bom_tree_runs_in_memory(monkeypatch) -> None:
+    graph = bg.load_blueprint_graph(FakeConn(_rows()))
+    monkeypatch.setattr(bom_service, "get_blueprint_graph", lambda: graph)
+
+    tree = bom_service.build_bom_tree(1000, max_depth=4)
+    assert tree is not None
+    assert tree.type_id == 1001
+    assert [c.product_id for c in tree.children] == [2000]
+    assert tree.children[0].children[0].product_id == 3000
+    assert bom_service.build_bom_tree(999) is None
+
+    shallow = bom_service.build_bom_tree(1000, max_depth=1)
+    assert shallow is not None
+    assert shallow.children[0].children == []
+
+
+def test_graph_reloads_when_manifest_changes(monkeypatch, tmp_path: Path) -> None:
+    from utils import manage_sde
+
+    manifest = tmp_path / "manifest.json"
+    monkeypatch.setattr(manage_sde, "MANIFEST", manifest)
+    settings = get_settings()
+    monkeypatch.setattr(settings, "sde_manifest_path", str(manifest))
+    monkeypatch.setattr(settings, "sde_manifest_check_seconds", 0.0)
+    conn = FakeConn(_rows())
+    monkeypatch.setattr(bg, "_engine", lambda: type("E", (), {"connect": lambda self: conn})())
+    bg.invalidate_blueprint_graph()
+
+    first = bg.get_blueprint_graph()
+    assert bg.get_blueprint_graph() is first
+    assert conn.calls == 1
+
+    manifest.write_text('{"version": "v2", "checksum": "abc"}')
+    second = bg.get_blueprint_graph()
+    assert second is not first
+    assert conn.calls == 2
+
+    manage_sde.save_manifest(manage_sde.SDEVersion(version="v3", checksum="def"))
+    assert bg.get_blueprint_graph() is not second
+    assert conn.calls == 3
+    bg.invalidate_blueprint_graph()
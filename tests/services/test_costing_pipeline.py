@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from app.services import costing_service as svc
+from app.services.blueprint_graph import BlueprintGraph, BlueprintRecord
+
+GRAPH = BlueprintGraph(
+    [
+        BlueprintRecord.from_row(
+            101, 100, "manufacturing", [{"type_id": 200, "qty": 2}, {"type_id": 34, "qty": 10}], 1
+        ),
+        BlueprintRecord.from_row(
+            201, 200, "manufacturing", [{"type_id": 34, "qty": 5}, {"type_id": 35, "qty": 3}], 2
+        ),
+    ]
+)
+PRICES = {34: (Decimal("4"), Decimal("6")), 35: (Decimal("9"), Decimal("11"))}
+
+
+class FakeConn:
+    def __init__(self) -> None:
+        self.queries: list[str] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):  # noqa: ANN002
+        return False
+
+    def execute(self, sql, params):  # noqa: ANN001
+        q = str(sql)
+        self.queries.append(q)
+
+        class Result(list):
+            def fetchall(self):
+                return list(self)
+
+        rows = Result()
+        for t in params["ids"]:
+            if t in PRICES:
+                rows.append((t, "bid", PRICES[t][0]))
+                rows.append((t, "ask", PRICES[t][1]))
+        return rows
+
+
+def _patch(monkeypatch, conn: FakeConn) -> None:
+    monkeypatch.setattr(svc, "get_blueprint_graph", lambda: GRAPH)
+    monkeypatch.setattr(svc, "_engine", lambda: type("E", (), {"connect": lambda self: conn})())
+
+
+def test_cost_product_expands_in_memory_with_one_quote_query(monkeypatch) -> None:
+    conn = FakeConn()
+    _patch(monkeypatch, conn)
+
+    res = svc.cost_product(100, region_id=10000002, runs=3)
+
+    assert res is not None
+    # 200 x6 needed -> 3 runs of output 2 -> 15x34 + 9x35; then 30x34 at top level
+    assert [(line.type_id, line.qty, line.unit_price) for line in res.lines] == [
+        (34, 15, Decimal("5")),
+        (35, 9, Decimal("10")),
+        (34, 30, Decimal("5")),
+    ]
+    assert res.total_cost == Decimal("315")
+    # Blueprints come from the in-memory graph; leaves are priced in one query
+    assert len(conn.queries) == 1
+    assert "orderbook_snapshots" in conn.queries[0]
+
+
+def test_cost_product_uses_on_hand_in_depth_first_order(monkeypatch) -> None:
+    conn = FakeConn()
+    _patch(monkeypatch, conn)
+    monkeypatch.setattr(
+        svc,
+        "get_on_hand",
+        lambda owner, ids: {34: {"qty": Decimal("20"), "avg_cost": Decimal("1")}},
+    )
+
+    res = svc.cost_product(100, region_id=10000002, runs=3, owner_scope="corp")
+
+    assert res is not None
+    assert [(line.type_id, line.qty, line.unit_price) for line in res.lines] == [
+        (34, 15, Decimal("1")),
+        (35, 9, Decimal("10")),
+        (34, 5, Decimal("1")),
+        (34, 25, Decimal("5")),
+    ]
+
+
+def test_cost_product_missing_blueprint_returns_none(monkeypatch) -> None:
+    conn = FakeConn()
+    _patch(monkeypatch, conn)
+    assert svc.cost_product(999, region_id=10000002) is None
+
+
+def test_cost_products_shares_one_quote_query_and_inventory_snapshot(monkeypatch) -> None:
+    conn = FakeConn()
+    _patch(monkeypatch, conn)
+    snapshots: list[str] = []
+
+    def fake_on_hand(owner, ids):  # noqa: ANN001
+        snapshots.append(owner)
+        return {34: {"qty": Decimal("20"), "avg_cost": Decimal("1")}}
+
+    monkeypatch.setattr(svc, "get_on_hand", fake_on_hand)
+    reqs = [
+        svc.CostRequest(100, runs=3),
+        svc.CostRequest(999),
+        svc.CostRequest(200, runs=2, me_bonus=0.1),
+        svc.CostRequest(100, runs=3),
+    ]
+
+    results = list(svc.cost_products(reqs, region_id=10000002, owner_scope="corp"))
+
+    assert [req for req, _ in results] == reqs
+    assert results[1][1] is None
+    assert len(conn.queries) == 1
+    assert snapshots == ["corp"]
+    # Every product sees the full snapshot, exactly as if costed on its own
+    for req, res in results:
+        if res is None:
+            continue
+        single = svc.cost_product(
+            req.product_id,
+            region_id=10000002,
+            runs=req.runs,
+            me_bonus=req.me_bonus,
+            owner_scope="corp",
+        )
+        assert res == single
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.plan import PlanSession, PlanSessionNotFound, PlanSessionStore
+from indy_math.planner import IncrementalPlanner
+
+START = datetime(2024, 4, 1)
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _session() -> PlanSession:
+    return PlanSession(
+        planner=IncrementalPlanner(START, START + timedelta(hours=1), [], [], []), duration_hours=1
+    )
+
+
+def test_sessions_expire_when_idle_and_evict_least_recently_used() -> None:
+    clock = Clock()
+    store = PlanSessionStore(max_sessions=2, ttl=60, clock=clock)
+    first = store.create(_session())
+    second = store.create(_session())
+
+    clock.now = 50
+    store.get(first)  # touching extends its idle deadline and LRU position
+    third = store.create(_session())
+    with pytest.raises(PlanSessionNotFound):
+        store.get(second)
+
+    clock.now = 100
+    assert store.get(first).duration_hours == 1
+    clock.now = 200
+    with pytest.raises(PlanSessionNotFound):
+        store.get(third)
+    assert len(store) == 1
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import text
+
+from app.providers.base import PriceQuote
+from app.services.snapshots import SnapshotWriter, write_snapshots
+
+
+def _quote(type_id: int, region_id: int = 10000002) -> PriceQuote:
+    return PriceQuote(
+        type_id=type_id,
+        region_id=region_id,
+        bid=Decimal("4"),
+        ask=Decimal("6"),
+        mid=Decimal("5"),
+        depth_qty_1pct=Decimal("10"),
+        depth_qty_5pct=Decimal("50"),
+        volatility=Decimal("0.1"),
+        ts=datetime(2024, 4, 1, tzinfo=timezone.utc),
+        provider="fake",
+    )
+
+
+class FakeConn:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, dict]] = []
+
+    def execute(self, sql, params):  # noqa: ANN001
+        self.calls.append((str(sql), params))
+
+
+def test_write_snapshots_batches_both_tables() -> None:
+    conn = FakeConn()
+
+    submitted = write_snapshots(conn, [_quote(t) for t in range(30, 35)], batch_size=2)
+
+    assert submitted == 10
+    # 3 batches (2 + 2 + 1 quotes), one orderbook and one market statement each
+    assert len(conn.calls) == 6
+    orderbook = [p for sql, p in conn.calls if "orderbook_snapshots" in sql]
+    market = [p for sql, p in conn.calls if "market_snapshots" in sql]
+    assert all(
+        "ON CONFLICT (region_id, type_id, side, ts) DO NOTHING" in sql
+        for sql, _ in conn.calls
+        if "orderbook_snapshots" in sql
+    )
+    assert orderbook[0]["type_id"] == [30, 30, 31, 31]
+    assert orderbook[0]["side"] == ["bid", "ask", "bid", "ask"]
+    assert orderbook[0]["best_px"] == [Decimal("4"), Decimal("6"), Decimal("4"), Decimal("6")]
+    assert [p["type_id"] for p in market] == [[30, 31], [32, 33], [34]]
+    assert market[0]["mid"] == [Decimal("5"), Decimal("5")]
+
+
+def test_snapshot_writer_orderbook_only_and_no_flush_on_error() -> None:
+    conn = FakeConn()
+    with SnapshotWriter(conn, market_history=False) as writer:
+        writer.add(_quote(34, region_id=10000043))
+    assert len(conn.calls) == 1
+    assert conn.calls[0][1]["region_id"] == [10000043, 10000043]
+
+    conn = FakeConn()
+    try:
+        with SnapshotWriter(conn) as writer:
+            writer.add(_quote(34))
+            raise RuntimeError("abort")
+    except RuntimeError:
+        pass
+    assert conn.calls == []
+
+
+def test_unnest_inserts_against_postgres(pg_conn) -> None:  # noqa: ANN001
+    region = 99_000_001  # keeps clear of rows already in the database
+    quotes = [_quote(34, region), _quote(35, region)]
+
+    assert write_snapshots(pg_conn, quotes) == 4
+    # The same (region, type, side, ts) again is skipped, not an error
+    write_snapshots(pg_conn, quotes[:1], market_history=False)
+
+    rows = pg_conn.execute(
+        text(
+            """
+            SELECT type_id, CAST(side AS text), best_px, depth_qty_5pct, stdev_pct
+            FROM orderbook_snapshots WHERE region_id = :r
+            ORDER BY type_id, CAST(side AS text)
+            """
+        ),
+        {"r": region},
+    ).fetchall()
+    assert [tuple(row) for row in rows] == [
+        (type_id, side, px, Decimal("50"), Decimal("0.1"))
+        for type_id in (34, 35)
+        for side, px in (("ask", Decimal("6")), ("bid", Decimal("4")))
+    ]
+    market = pg_conn.execute(
+        text("SELECT count(*), min(mid), max(mid) FROM market_snapshots WHERE region_id = :r"),
+        {"r": region},
+    ).one()
+    assert tuple(market) == (2, Decimal("5"), Decimal("5"))
@@ -46,7 +46,17 @@ def test_load_local_parses_and_calls_upsert(tmp_path, monkeypatch):
     from app import config as cfg
     monkeypatch.setattr(cfg, "Settings", lambda: type("S", (), {"database_url": "postgresql+psycopg2://test"})())
 
+    # Keep generated JSON out of the real data/sde directory
+    monkeypatch.setattr(sde, "DATA_ROOT", tmp_path / "data/sde")
+    monkeypatch.setattr(sde, "MANIFEST", tmp_path / "data/sde/manifest.json")
+
     sde.load_local(Args())
+    assert (tmp_path / "data/sde/blueprints.json").exists()
+    # The manifest records the drop so autoload skips it and API processes reload
+    from app.sde_autoload import SDEFiles, compute_drop_checksum
+
+    drop = SDEFiles(type_file=root / "typeIDs.yaml", bp_file=root / "industryBlueprints.yaml")
+    assert sde.load_manifest()["checksum"] == compute_drop_checksum(drop)
     # Second pass should remain idempotent (no duplicate work beyond normal SQL upserts)
     sde.load_local(Args())
     assert called["upsert"] == 2
@@ -1,12 +1,11 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
 from datetime import datetime, timezone
 from decimal import Decimal
 from typing import List, Sequence
 
-from app.providers.esi import ESIClient, IndustryJob
-from app.repos import InventoryRepo, Job, JobsRepo
+from app.providers.esi import IndustryJob
+from app.repos import Job, JobState, job_state
 from app.workers.esi_sync import sync_industry_jobs
 
 
@@ -14,16 +13,8 @@ class FakeESI:
     def __init__(self, jobs: Sequence[IndustryJob]) -> None:
         self._jobs = jobs
 
-    def list_industry_jobs(self, owner_scope: str):  # type: ignore[override]
-        # Mimic ESIResponse
-        from dataclasses import dataclass
-
-        @dataclass
-        class Resp:
-            data: Sequence[IndustryJob]
-            expires: None = None
-
-        return Resp(self._jobs)
+    def iter_industry_jobs(self, owner_scope: str):  # type: ignore[override]
+        return iter(self._jobs)
 
 
 class FakeJobsRepo:
@@ -90,3 +81,96 @@ def test_sync_industry_jobs_idempotent_paths() -> None:
     activities = {job.job_id: job.activity for job in jrepo.upserts}
     assert activities == {1: "manufacturing", 2: "reaction"}
 
+
+def _job(job_id: int, status: str, runs: int = 1) -> IndustryJob:
+    return IndustryJob(
+        job_id=job_id,
+        blueprint_type_id=603,
+        runs=runs,
+        activity_id=1,
+        status=status,
+        start_date=datetime(2024, 4, 1, tzinfo=timezone.utc),
+        installer_id=123,
+        location_id=60003760,
+    )
+
+
+def _state(status: str, runs: int = 1) -> JobState:
+    # What upserting `_job(..., status, runs)` stores
+    return JobState(
+        status=status,
+        runs=runs,
+        end_time=None,
+        location_id=60003760,
+        facility_id=None,
+        fees_isk=Decimal("0"),
+    )
+
+
+class StatefulJobsRepo(FakeJobsRepo):
+    def __init__(self, stored: dict[int, JobState]) -> None:
+        super().__init__()
+        self.stored = dict(stored)
+
+    def get_job_states(self, owner_scope: str, job_ids: Sequence[int]) -> dict[int, JobState]:
+        return {job_id: self.stored[job_id] for job_id in job_ids if job_id in self.stored}
+
+    def upsert_jobs(self, owner_scope: str, jobs: Sequence[Job]) -> None:
+        super().upsert_jobs(owner_scope, jobs)
+        self.stored.update({job.job_id: job_state(job) for job in jobs})
+
+
+class BulkInvRepo:
+    def __init__(self) -> None:
+        self.calls: List[tuple[str, List[int]]] = []
+
+    def reserve_for_jobs(self, jobs: Sequence[Job]) -> None:
+        self.calls.append(("reserve", [j.job_id for j in jobs]))
+
+    def release_for_jobs(self, jobs: Sequence[Job]) -> None:
+        self.calls.append(("release", [j.job_id for j in jobs]))
+
+    def settle_outputs(self, jobs: Sequence[Job]) -> None:
+        self.calls.append(("settle", [j.job_id for j in jobs]))
+
+
+def test_sync_only_acts_on_status_changes_with_bulk_calls() -> None:
+    jrepo = StatefulJobsRepo(
+        {1: _state("active"), 2: _state("active"), 3: _state("delivered"), 4: _state("active")}
+    )
+    irepo = BulkInvRepo()
+    esi = FakeESI(
+        [
+            _job(1, "active"),  # unchanged
+            _job(2, "delivered"),  # finished since last sync
+            _job(3, "delivered"),  # already settled
+            _job(4, "cancelled"),
+            _job(5, "active"),  # new
+            _job(6, "ready"),  # new, stored as active
+        ]
+    )
+
+    sync_industry_jobs("corp", esi, jrepo, irepo)
+
+    assert [j.job_id for j in jrepo.upserts] == [2, 4, 5, 6]
+    assert irepo.calls == [("reserve", [5, 6]), ("release", [2, 4]), ("settle", [2])]
+
+    # A second identical sync finds nothing to do
+    jrepo.upserts.clear()
+    irepo.calls.clear()
+    sync_industry_jobs("corp", esi, jrepo, irepo)
+    assert jrepo.upserts == []
+    assert irepo.calls == []
+
+
+def test_sync_upserts_non_status_changes_without_touching_inventory() -> None:
+    jrepo = StatefulJobsRepo({1: _state("active"), 2: _state("active")})
+    irepo = BulkInvRepo()
+
+    sync_industry_jobs(
+        "corp", FakeESI([_job(1, "active", runs=5), _job(2, "active")]), jrepo, irepo
+    )
+
+    assert [(j.job_id, j.runs) for j in jrepo.upserts] == [(1, 5)]
+    assert jrepo.stored[1] == _state("active", runs=5)
+    assert irepo.calls == []
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import tasks
+from app.providers.base import PriceQuote
+
+
+class FakeAsyncProvider:
+    def __init__(self) -> None:
+        self.pairs: list[tuple[int, int]] = []
+        self.closed = False
+
+    async def get_many(self, pairs):  # noqa: ANN001
+        self.pairs = list(pairs)
+        out: list = []
+        for type_id, region_id in self.pairs:
+            if type_id == 35:
+                out.append(RuntimeError("provider down"))
+                continue
+            out.append(
+                PriceQuote(
+                    type_id=type_id,
+                    region_id=region_id,
+                    bid=Decimal("4"),
+                    ask=Decimal("6"),
+                    mid=Decimal("5"),
+                    depth_qty_1pct=Decimal("1"),
+                    depth_qty_5pct=Decimal("2"),
+                    volatility=Decimal("0.1"),
+                    ts=datetime(2024, 4, 1, tzinfo=timezone.utc),
+                    provider="fake",
+                )
+            )
+        return out
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class FakeConn:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):  # noqa: ANN002
+        return False
+
+
+def test_price_refresh_fans_out_and_skips_failed_types(monkeypatch) -> None:
+    provider = FakeAsyncProvider()
+    conn = FakeConn()
+    written: list[list[int]] = []
+    monkeypatch.setenv("PRICE_TYPE_IDS", "34,35,36")
+    monkeypatch.setattr(tasks, "make_async_price_provider", lambda name, settings: provider)
+    monkeypatch.setattr(
+        tasks, "get_engine", lambda settings: type("E", (), {"begin": lambda self: conn})()
+    )
+
+    def fake_write(c, quotes):  # noqa: ANN001
+        assert c is conn
+        written.append([q.type_id for q in quotes])
+        return 2 * len(quotes)
+
+    monkeypatch.setattr(tasks, "write_snapshots", fake_write)
+
+    msg = tasks.price_refresh()
+
+    assert provider.pairs == [(34, 10000002), (35, 10000002), (36, 10000002)]
+    assert provider.closed
+    assert written == [[34, 36]]
+    assert msg == "Inserted 4 snapshots (1 types failed)"
@@ -7,37 +7,12 @@ Usage:
 from __future__ import annotations
 
 import argparse
-from datetime import datetime, timezone
-from decimal import Decimal
 
 import sqlalchemy as sa
-from sqlalchemy import text
 
 from app.config import Settings
 from app.providers.factory import make_price_provider
-
-
-def insert_snapshot(conn, *, region_id: int, type_id: int, side: str, px: Decimal, depth1: Decimal, depth5: Decimal, vol: Decimal, ts: datetime) -> None:
-    conn.execute(
-        text(
-            """
-            INSERT INTO orderbook_snapshots
-            (id, ts, region_id, type_id, side, best_px, best_qty, depth_qty_1pct, depth_qty_5pct, stdev_pct)
-            VALUES (gen_random_uuid(), :ts, :region_id, :type_id, :side, :best_px, 0, :d1, :d5, :stdev)
-            ON CONFLICT (region_id, type_id, side, ts) DO NOTHING
-            """
-        ),
-        {
-            "ts": ts,
-            "region_id": region_id,
-            "type_id": type_id,
-            "side": side,
-            "best_px": px,
-            "d1": depth1,
-            "d5": depth5,
-            "stdev": vol,
-        },
-    )
+from app.services.snapshots import SnapshotWriter
 
 
 def main() -> None:
@@ -51,11 +26,9 @@ def main() -> None:
     settings = Settings()
     provider = make_price_provider(args.provider, settings)
     engine = sa.create_engine(settings.database_url)
-    with engine.begin() as conn:
+    with engine.begin() as conn, SnapshotWriter(conn, market_history=False) as writer:
         for t in types:
-            q = provider.get(type_id=t, region_id=args.region)  # type: ignore[attr-defined]
-            insert_snapshot(conn, region_id=args.region, type_id=t, side="bid", px=q.bid, depth1=q.depth_qty_1pct, depth5=q.depth_qty_5pct, vol=q.volatility, ts=q.ts)
-            insert_snapshot(conn, region_id=args.region, type_id=t, side="ask", px=q.ask, depth1=q.depth_qty_1pct, depth5=q.depth_qty_5pct, vol=q.volatility, ts=q.ts)
+            writer.add(provider.get(type_id=t, region_id=args.region))  # type: ignore[attr-defined]
     print("Backfill complete")
 
 
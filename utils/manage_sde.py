@@ -51,6 +51,19 @@ def load_manifest() -> Mapping[str, str] | None:
 
 def save_manifest(version: SDEVersion) -> None:
     MANIFEST.write_text(json.dumps({"version": version.version, "checksum": version.checksum}))
+    invalidate_blueprint_cache()
+
+
+def invalidate_blueprint_cache() -> None:
+    """Drop the in-process blueprint graph so the next BOM request reloads it.
+
+    Other processes notice the new manifest on their own (mtime/size change).
+    """
+    try:
+        from app.services.blueprint_graph import invalidate_blueprint_graph
+    except Exception:
+        return
+    invalidate_blueprint_graph()
 
 
 def _ccp_style_blueprints(doc: Mapping) -> bool:
@@ -419,6 +432,13 @@ def load_local(args: argparse.Namespace) -> None:
                         ON CONFLICT (id) DO UPDATE SET name=EXCLUDED.name, kind=EXCLUDED.kind, parent_id=EXCLUDED.parent_id
                         """
                     ), {"id": _id, "name": name, "kind": kind, "parent": parent_id})
+    # Same combined checksum as app.sde_autoload, so this drop is not reloaded;
+    # the rewrite also makes every API process reload its blueprint graph.
+    drop_checksum = hashlib.sha256(
+        (compute_checksum(type_file) + compute_checksum(bp_file)).encode()
+    ).hexdigest()
+    version = getattr(args, "version", None) or "local"
+    save_manifest(SDEVersion(version=version, checksum=drop_checksum))
     print("SDE load-local completed")
 
 